@@ -9,11 +9,19 @@ Usage:
     python main.py screen <addr> # Screen address
     python main.py risk <addr>  # Risk assessment
     python main.py refresh      # Refresh sanctions cache
+    python main.py ingest-graph <files> -b <chain>  # Build a transaction graph
+    python main.py bench-serialization  # Time batch response encoders
+    python main.py bench-refresh  # Time SDN list parsing (speed, max RSS)
+    python main.py bench-lookup  # Time single-address lookups by list size
+    python main.py bench-search  # Time search and fuzzy name matching
+    python main.py bench-batch-screen  # Time batch screening paths
 """
 
 import asyncio
 import argparse
+import json
 import sys
+import time
 from datetime import datetime
 
 import structlog
@@ -82,7 +90,7 @@ async def cmd_screen(args):
         print(f"\n{status_icon} Sanctioned: {result.is_sanctioned}")
         print(f"📊 Risk Level: {result.risk_level.value.upper()}")
         print(f"📈 Risk Score: {result.risk_score}/100")
-        print(f"⏱️  Response Time: {result.response_time_ms}ms")
+        print(f"⏱️  Response Time: {result.response_time_ms:.3f}ms")
         
         if result.matches:
             print(f"\n🔍 Matches Found:")
@@ -157,15 +165,475 @@ async def cmd_refresh(args):
     screener = get_screener()
     
     try:
+        # Continue from the snapshot workers map: its generation sequence
+        # and the validators for a conditional fetch
+        screener.load_snapshot(search_indexes=False)
+        previous = screener.index
+        
         print("Refreshing sanctions cache...")
-        await screener.refresh_sanctions_cache()
-        print("✅ Sanctions cache refreshed successfully")
+        index = await screener.refresh_sanctions_cache()
+        if index is None:
+            print("❌ Error refreshing cache: see log for details")
+            return
+        if index is previous:
+            print(f"✅ Sanctions list not modified (generation {index.generation})")
+            return
+        print(f"✅ Sanctions cache refreshed successfully (generation {index.generation}, {len(index)} addresses)")
+        
+        path = screener.write_snapshot()
+        print(f"💾 Snapshot written to {path}")
+        
+        if screener.settings.sanctions_persist_database:
+            counts = await screener.persist_to_database()
+            print(f"🗄️  Database updated: {counts['upserted']} upserted, {counts['deactivated']} deactivated")
     except Exception as e:
         print(f"❌ Error refreshing cache: {e}")
     finally:
         await screener.close()
 
 
+async def cmd_ingest_graph(args):
+    """Build a chain's transaction graph from CSV/Parquet edge lists."""
+    from src.services.graph import build_graph
+    
+    try:
+        blockchain = BlockchainType(args.blockchain)
+    except ValueError:
+        print(f"Error: Invalid blockchain '{args.blockchain}'")
+        sys.exit(1)
+    
+    print(f"Building {blockchain.value} transaction graph from {len(args.paths)} file(s)...")
+    start = time.perf_counter()
+    meta = await asyncio.to_thread(
+        build_graph, args.paths, blockchain,
+        from_column=args.from_column, to_column=args.to_column
+    )
+    print(f"✅ Graph {meta['version']} published in {time.perf_counter() - start:.1f}s")
+    print(f"   Rows:  {meta['rows']}")
+    print(f"   Nodes: {meta['nodes']}")
+    print(f"   Edges: {meta['edges']}")
+
+
+async def cmd_bench_serialization(args):
+    """Time the encoders of /v1/batch-screen responses on synthetic results."""
+    from pydantic import BaseModel, TypeAdapter
+    
+    from src.models import RiskLevel
+    from src.serialization import encode_batch_screen
+    from src.services.screening import ScreeningResult
+    
+    class BatchItem(BaseModel):
+        address: str
+        is_sanctioned: bool
+        risk_level: RiskLevel
+        risk_score: float
+    
+    items_adapter = TypeAdapter(list[BatchItem])
+    
+    def stdlib_json(results):
+        return json.dumps({
+            "total": len(results),
+            "sanctioned_count": len([r for r in results if r.is_sanctioned]),
+            "results": [
+                {
+                    "address": r.address,
+                    "is_sanctioned": r.is_sanctioned,
+                    "risk_level": r.risk_level.value,
+                    "risk_score": r.risk_score
+                }
+                for r in results
+            ]
+        }).encode()
+    
+    def pydantic_adapter(results):
+        return items_adapter.dump_json([
+            BatchItem(
+                address=r.address,
+                is_sanctioned=r.is_sanctioned,
+                risk_level=r.risk_level,
+                risk_score=r.risk_score
+            )
+            for r in results
+        ])
+    
+    encoders = {
+        "json (stdlib)": stdlib_json,
+        "pydantic TypeAdapter": pydantic_adapter,
+        "orjson precompiled": encode_batch_screen,
+    }
+    
+    print(f"\n{'Results':>8}  {'Encoder':<22} {'Mean':>10} {'Best':>10} {'Bytes':>10}")
+    print("=" * 66)
+    for size in args.sizes:
+        # One in a hundred sanctioned, as in a typical batch
+        results = [
+            ScreeningResult(
+                address=f"0x{i:040x}",
+                blockchain=BlockchainType.ETHEREUM,
+                is_sanctioned=i % 100 == 0,
+                risk_level=RiskLevel.PROHIBITED if i % 100 == 0 else RiskLevel.LOW,
+                risk_score=100.0 if i % 100 == 0 else 10.0
+            )
+            for i in range(size)
+        ]
+        for name, encoder in encoders.items():
+            encoder(results)
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                body = encoder(results)
+                timings.append(time.perf_counter() - start)
+            mean = sum(timings) / len(timings) * 1000
+            print(f"{size:>8}  {name:<22} {mean:>8.2f}ms {min(timings) * 1000:>8.2f}ms {len(body):>10}")
+
+
+def _synthetic_sdn(path: str, entries: int) -> None:
+    """Write an SDN-shaped XML list; one entry in twenty lists addresses."""
+    id_types = [
+        ("Digital Currency Address - ETH", lambda i: f"0x{i:040x}"),
+        ("Digital Currency Address - XBT", lambda i: f"1{i:033d}"),
+        ("Digital Currency Address - TRX", lambda i: f"T{i:033d}"),
+    ]
+    
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" standalone="yes"?>\n<sdnList>\n')
+        for i in range(entries):
+            ids = (
+                "<id><uid>{0}1</uid><idType>Passport</idType><idNumber>P{0:08d}</idNumber>"
+                "<idCountry>Cyprus</idCountry></id>"
+            ).format(i)
+            if i % 20 == 0:
+                id_type, address = id_types[i // 20 % len(id_types)]
+                ids += (
+                    f"<id><uid>{i}2</uid><idType>{id_type}</idType>"
+                    f"<idNumber>{address(i)}</idNumber></id>"
+                )
+            f.write(
+                f"<sdnEntry><uid>{i}</uid><firstName>Ivan</firstName>"
+                f"<lastName>ENTITY NUMBER {i} TRADING LIMITED</lastName>"
+                f"<sdnType>Entity</sdnType><programList><program>CYBER2</program>"
+                f"<program>RUSSIA-EO14024</program></programList>"
+                f"<idList>{ids}</idList>"
+                f"<akaList><aka><uid>{i}3</uid><type>a.k.a.</type><category>strong</category>"
+                f"<lastName>ENTITY {i} LLC</lastName></aka><aka><uid>{i}4</uid><type>f.k.a.</type>"
+                f"<category>weak</category><lastName>OOO ENTITY {i}</lastName></aka></akaList>"
+                f"<addressList><address><uid>{i}5</uid><address1>Office {i % 400}, 12 Example Street</address1>"
+                f"<city>Limassol</city><postalCode>{i % 9000 + 1000}</postalCode><country>Cyprus</country>"
+                f"</address></addressList>"
+                f"<dateOfBirthList><dateOfBirthItem><uid>{i}6</uid><dateOfBirth>01 Jan 1970</dateOfBirth>"
+                f"<mainEntry>true</mainEntry></dateOfBirthItem></dateOfBirthList></sdnEntry>\n"
+            )
+        f.write("</sdnList>\n")
+
+
+def _parse_sdn_file(path: str, method: str) -> tuple[float, int, int]:
+    """Parse ``path`` in this process; returns seconds, addresses and RSS growth in KiB."""
+    import resource
+    import xml.etree.ElementTree as ET
+    
+    from src.services.sdn import SDNStreamParser
+    from src.services.sources import OFACAdapter
+    
+    # Imports are already resident; only growth past this is the parse's
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    addresses = 0
+    if method == "ET.fromstring":
+        # The refresh before streaming: whole body decoded, then one tree
+        with open(path, "rb") as f:
+            root = ET.fromstring(f.read().decode())
+        for entry in root.findall(".//sdnEntry"):
+            id_list = entry.find("idList")
+            if id_list is None:
+                continue
+            for id_entry in id_list.findall("id"):
+                id_type = id_entry.find("idType")
+                if id_type is not None and id_type.text in OFACAdapter.CRYPTO_ID_TYPES:
+                    addresses += 1
+    else:
+        parser = SDNStreamParser(OFACAdapter.CRYPTO_ID_TYPES)
+        with open(path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                addresses += sum(1 for _ in parser.feed(chunk))
+        addresses += sum(1 for _ in parser.close())
+    
+    seconds = time.perf_counter() - start
+    return seconds, addresses, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+
+async def cmd_bench_refresh(args):
+    """Time parsing a synthetic SDN list, whole-tree against streaming."""
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+    import os
+    import tempfile
+    
+    context = multiprocessing.get_context("spawn")
+    
+    print(f"\n{'Entries':>8}  {'Parser':<16} {'MB':>6} {'Mean':>9} {'Best':>9} {'Peak RSS+':>10} {'Addresses':>10}")
+    print("=" * 75)
+    for entries in args.entries:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sdn.xml")
+            _synthetic_sdn(path, entries)
+            size_mb = os.path.getsize(path) / 1e6
+            
+            for method in ("ET.fromstring", "SDNStreamParser"):
+                timings, peak = [], 0
+                for _ in range(args.repeat):
+                    # A fresh interpreter per run, so peak RSS is this parse's own
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        seconds, addresses, rss = pool.submit(_parse_sdn_file, path, method).result()
+                    timings.append(seconds)
+                    peak = max(peak, rss)
+                mean = sum(timings) / len(timings)
+                print(
+                    f"{entries:>8}  {method:<16} {size_mb:>6.0f} {mean:>8.2f}s {min(timings):>8.2f}s "
+                    f"{peak / 1024:>8.0f}MB {addresses:>10}"
+                )
+
+
+def _synthetic_listing(count: int, per_entity: int = 20) -> list[tuple[str, dict]]:
+    """``count`` listed ETH addresses, ``per_entity`` to each synthetic entity."""
+    from hashlib import blake2b
+    import random
+    
+    syllables = ["ka", "ro", "mi", "ten", "vas", "lo", "dre", "zan", "pol", "gur", "shi", "nek", "ba", "tor", "ul", "fen"]
+    suffixes = ["LLC", "LIMITED", "TRADING", "GROUP", "EXCHANGE", "HOLDINGS"]
+    programs = ["CYBER2", "RUSSIA-EO14024", "DPRK3", "IRAN"]
+    
+    listing = []
+    for i in range(count):
+        entity = i // per_entity
+        rng = random.Random(entity)
+        words = ["".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(2)]
+        address = "0x" + blake2b(str(i).encode(), digest_size=20).hexdigest()
+        listing.append((address, {
+            "source": "OFAC",
+            "blockchain": BlockchainType.ETHEREUM.value,
+            "sdn_id": str(entity),
+            "entity_name": " ".join(words + [rng.choice(suffixes)]).upper(),
+            "program": programs[entity % len(programs)],
+            "designation_date": "2022-08-08"
+        }))
+    return listing
+
+
+async def cmd_bench_lookup(args):
+    """Time single-address sanctions lookups against list size."""
+    from hashlib import blake2b
+    import os
+    import tempfile
+    
+    from src.services.canonical import canonical_key
+    from src.services.index import SanctionsIndex
+    from src.services.screening import SanctionsScreener
+    from src.services.snapshot import MappedSnapshot, write_snapshot
+    
+    chain = BlockchainType.ETHEREUM
+    
+    def time_probes(probe, values):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter_ns()
+            for value in values:
+                probe(value)
+            best = min(best, (time.perf_counter_ns() - start) / len(values))
+        return best
+    
+    def list_rebuild(address):
+        # The check before the index: the demo list lowercased on every call
+        return address.lower() in [a.lower() for a in SanctionsScreener.KNOWN_OFAC_ADDRESSES]
+    
+    def canonicalize(address, key=canonical_key.__wrapped__):
+        return key(address, chain)
+    
+    misses = ["0x" + blake2b(f"miss{i}".encode(), digest_size=20).hexdigest() for i in range(args.probes)]
+    miss_keys = [canonical_key.__wrapped__(address, chain) for address in misses]
+    
+    # Index columns probe canonical keys; "Key" is the uncached cost of
+    # deriving one from an address (hot addresses hit canonical_key's cache)
+    print(f"\n{'Listed':>8}  {'Lookup':<16} {'Hit':>9} {'Miss':>9} {'Key':>9}")
+    print("=" * 56)
+    hits = SanctionsScreener.KNOWN_OFAC_ADDRESSES * (args.probes // 3)
+    print(f"{3:>8}  {'list rebuild':<16} {time_probes(list_rebuild, hits):>7.0f}ns {time_probes(list_rebuild, misses):>7.0f}ns {'-':>9}")
+    
+    for size in args.sizes:
+        listing = _synthetic_listing(size)
+        hit_keys = [canonical_key.__wrapped__(listing[i % size][0], chain) for i in range(args.probes)]
+        index = SanctionsIndex.build(listing, generation=1)
+        key_ns = time_probes(canonicalize, [listing[i % size][0] for i in range(args.probes)])
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sanctions.snap")
+            write_snapshot(index, path)
+            indexes = {
+                "index": index,
+                "mapped snapshot": SanctionsIndex.from_snapshot(MappedSnapshot(path), search_indexes=False),
+            }
+            for name, probed in indexes.items():
+                def probe(key, lookup=probed.lookup):
+                    return lookup(key, chain)
+                
+                print(
+                    f"{size:>8}  {name:<16} {time_probes(probe, hit_keys):>7.0f}ns "
+                    f"{time_probes(probe, miss_keys):>7.0f}ns {key_ns:>7.0f}ns"
+                )
+            del indexes
+
+
+async def cmd_bench_search(args):
+    """Time sanctions search and fuzzy name matching on a synthetic list."""
+    import random
+    import statistics
+    
+    from src.services.index import SanctionsIndex
+    from src.services.names import normalize_name, score_candidates
+    
+    settings = get_settings()
+    rng = random.Random(args.size)
+    
+    listing = _synthetic_listing(args.size)
+    start = time.perf_counter()
+    index = SanctionsIndex.build(listing, generation=1)
+    print(f"\nBuilt {len(index)} addresses, {len(index.names)} names in {time.perf_counter() - start:.1f}s")
+    
+    def percentiles(timings):
+        timings = sorted(timings)
+        return statistics.median(timings) * 1000, timings[int(len(timings) * 0.95)] * 1000
+    
+    def scan(query, limit=50, source=None, program=None):
+        # The search before the trigram index: one pass over every record
+        results = []
+        for data in index.records():
+            if source is not None and data.get("source") != source:
+                continue
+            if program is not None and program.lower() not in data.get("program", "").lower():
+                continue
+            if query in data["address"].lower() or query in data.get("entity_name", "").lower():
+                results.append(data)
+                if len(results) >= limit:
+                    break
+        return results
+    
+    address, record = listing[args.size // 2]
+    queries = {
+        "full address": {"query": address},
+        "address fragment": {"query": address[12:22]},
+        "full name": {"query": record["entity_name"].lower()},
+        "common word": {"query": "exchange"},
+        "word + filters": {"query": "exchange", "source": "OFAC", "program": "dprk3"},
+        "no match": {"query": "qqxzj"},
+    }
+    
+    print(f"\n{'Query':<18} {'Search':<8} {'p50':>9} {'p95':>9} {'Results':>8}")
+    print("=" * 56)
+    for name, kwargs in queries.items():
+        for label, search, repeat in (
+            ("trigram", index.search.search, args.repeat),
+            ("scan", scan, args.scan_repeat),
+        ):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results = search(**kwargs)
+                timings.append(time.perf_counter() - start)
+            p50, p95 = percentiles(timings)
+            print(f"{name:<18} {label:<8} {p50:>7.2f}ms {p95:>7.2f}ms {len(results):>8}")
+    
+    # Fuzzy matching: listed names with one typo each, scored inline
+    def typo(name):
+        position = rng.randrange(len(name))
+        return name[:position] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[position + 1:]
+    
+    targets = [normalize_name(listing[rng.randrange(args.size)][1]["entity_name"]) for _ in range(args.fuzzy_queries)]
+    threshold = settings.fuzzy_match_threshold
+    all_names = index.names.names(range(len(index.names)))
+    
+    def blocked(query):
+        candidates = index.names.candidates(query, settings.fuzzy_max_candidates)
+        names = index.names.names(candidates)
+        return [names[position] for position, _ in score_candidates(query, names, threshold)]
+    
+    def brute_force(query):
+        return [all_names[position] for position, _ in score_candidates(query, all_names, threshold)]
+    
+    print(f"\n{'Fuzzy names':<18} {'Queries':>8} {'p50':>9} {'p95':>9} {'Found':>8}")
+    print("=" * 56)
+    for label, match, count in (
+        ("blocked", blocked, args.fuzzy_queries),
+        ("all names", brute_force, args.scan_repeat),
+    ):
+        timings, found = [], 0
+        for target in targets[:count]:
+            start = time.perf_counter()
+            matched = match(normalize_name(typo(target)))
+            timings.append(time.perf_counter() - start)
+            found += target in matched
+        p50, p95 = percentiles(timings)
+        print(f"{label:<18} {count:>8} {p50:>7.2f}ms {p95:>7.2f}ms {found:>8}")
+
+
+async def cmd_bench_batch_screen(args):
+    """Time batch screening, per-address coroutines against the bulk path."""
+    from hashlib import blake2b
+    import random
+    
+    from src.services.cache import ResultCache
+    from src.services.canonical import canonical_key
+    from src.services.index import SanctionsIndex
+    from src.services.screening import SanctionsScreener
+    
+    rng = random.Random(args.listed)
+    listing = _synthetic_listing(args.listed)
+    
+    screener = SanctionsScreener()
+    screener._index = SanctionsIndex.build(listing, generation=1)
+    # Time the screens themselves, not cache hits
+    screener.cache = ResultCache(maxsize=0, ttl=0)
+    
+    async def per_coroutine(items):
+        # The batch path before the bulk lookup: one screen per address
+        semaphore = asyncio.Semaphore(10)
+        
+        async def screen_one(item):
+            async with semaphore:
+                return await screener.screen_address(item["address"], BlockchainType(item["blockchain"]))
+        
+        return await asyncio.gather(*[screen_one(item) for item in items])
+    
+    paths = {
+        "per-coroutine": per_coroutine,
+        "bulk": screener.batch_screen,
+    }
+    
+    print(f"\n{'Batch':>8}  {'Path':<14} {'Mean':>10} {'Best':>10} {'Listed':>7}")
+    print("=" * 55)
+    try:
+        for size in args.sizes:
+            # One in a hundred listed
+            items = [
+                {
+                    "address": listing[rng.randrange(args.listed)][0] if i % 100 == 0
+                    else "0x" + blake2b(f"{size}:{i}".encode(), digest_size=20).hexdigest(),
+                    "blockchain": BlockchainType.ETHEREUM.value
+                }
+                for i in range(size)
+            ]
+            for name, path in paths.items():
+                timings = []
+                for _ in range(args.repeat):
+                    canonical_key.cache_clear()
+                    start = time.perf_counter()
+                    results = await path(items)
+                    timings.append(time.perf_counter() - start)
+                listed = sum(result.is_sanctioned for result in results)
+                mean = sum(timings) / len(timings) * 1000
+                print(f"{size:>8}  {name:<14} {mean:>8.2f}ms {min(timings) * 1000:>8.2f}ms {listed:>7}")
+    finally:
+        await screener.close()
+
+
 async def cmd_pricing(args):
     """Show pricing tiers."""
     
@@ -205,9 +673,45 @@ def main():
     # refresh
     subparsers.add_parser("refresh", help="Refresh sanctions cache")
     
+    # ingest-graph
+    graph_parser = subparsers.add_parser("ingest-graph", help="Build a transaction graph from edge lists")
+    graph_parser.add_argument("paths", nargs="+", help="CSV or Parquet files of transfers")
+    graph_parser.add_argument("--blockchain", "-b", default="ethereum")
+    graph_parser.add_argument("--from-column", default="from")
+    graph_parser.add_argument("--to-column", default="to")
+    
     # pricing
     subparsers.add_parser("pricing", help="Show pricing tiers")
     
+    # bench-serialization
+    bench_parser = subparsers.add_parser("bench-serialization", help="Time batch response encoders")
+    bench_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    bench_parser.add_argument("--repeat", type=int, default=20)
+    
+    # bench-refresh
+    bench_refresh_parser = subparsers.add_parser("bench-refresh", help="Time SDN list parsing")
+    bench_refresh_parser.add_argument("--entries", type=int, nargs="+", default=[18000, 180000])
+    bench_refresh_parser.add_argument("--repeat", type=int, default=1)
+    
+    # bench-lookup
+    bench_lookup_parser = subparsers.add_parser("bench-lookup", help="Time single-address lookups")
+    bench_lookup_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    bench_lookup_parser.add_argument("--probes", type=int, default=200000)
+    bench_lookup_parser.add_argument("--repeat", type=int, default=5)
+    
+    # bench-search
+    bench_search_parser = subparsers.add_parser("bench-search", help="Time search and fuzzy name matching")
+    bench_search_parser.add_argument("--size", type=int, default=1000000, help="Listed addresses (20 per name)")
+    bench_search_parser.add_argument("--repeat", type=int, default=100)
+    bench_search_parser.add_argument("--scan-repeat", type=int, default=3, help="Runs of the unindexed baselines")
+    bench_search_parser.add_argument("--fuzzy-queries", type=int, default=100)
+    
+    # bench-batch-screen
+    bench_batch_parser = subparsers.add_parser("bench-batch-screen", help="Time batch screening paths")
+    bench_batch_parser.add_argument("--listed", type=int, default=200000)
+    bench_batch_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    bench_batch_parser.add_argument("--repeat", type=int, default=5)
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -219,7 +723,13 @@ def main():
         "screen": cmd_screen,
         "risk": cmd_risk,
         "refresh": cmd_refresh,
-        "pricing": cmd_pricing
+        "ingest-graph": cmd_ingest_graph,
+        "pricing": cmd_pricing,
+        "bench-serialization": cmd_bench_serialization,
+        "bench-refresh": cmd_bench_refresh,
+        "bench-lookup": cmd_bench_lookup,
+        "bench-search": cmd_bench_search,
+        "bench-batch-screen": cmd_bench_batch_screen
     }
     
     asyncio.run(commands[args.command](args))
@@ -0,0 +1,20 @@
+-- sanctioned_addresses: one row per (address, source) instead of per address.
+--
+-- Required before upgrading a database created with the old schema
+-- (unique address): refreshes persist the consolidated lists with
+-- INSERT ... ON CONFLICT (address, source), which Postgres rejects
+-- without a unique index on exactly those columns. Idempotent; run with
+--
+--     psql "$DATABASE_URL" -f migrations/001_sanctioned_addresses_address_source.sql
+
+BEGIN;
+
+-- Old unique key on address alone (an index or, if created by hand, a constraint)
+ALTER TABLE sanctioned_addresses DROP CONSTRAINT IF EXISTS sanctioned_addresses_address_key;
+DROP INDEX IF EXISTS ix_sanctioned_addresses_address;
+CREATE INDEX ix_sanctioned_addresses_address ON sanctioned_addresses (address);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_sanctioned_address_source
+    ON sanctioned_addresses (address, source);
+
+COMMIT;
@@ -3,18 +3,30 @@
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Query, Depends, Header
+from fastapi import FastAPI, HTTPException, Query, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
+import asyncio
+import time
 import structlog
 
 from .config import get_settings, PricingTier, TIER_LIMITS
 from .models import BlockchainType, RiskLevel, SanctionsSource
+from .serialization import (
+    ORJSONResponse, encode, encode_batch_risk, encode_batch_screen, risk_result, screen_result
+)
 from .services import (
     get_screener, SanctionsScreener,
-    RiskAssessor, get_jurisdiction_risk,
-    SARGenerator, TravelRuleChecker
+    AssessmentContext, RiskAssessor, get_jurisdiction_risk, get_risk_cache,
+    watch_sanctioned_nodes,
+    SARGenerator, TravelRuleChecker,
+    singleflight_stats
 )
+from .services.jobs import JOB_FORMATS, JobManager, screen_lines
+from .services.metrics import render_metrics
+from .services.screening import SCREEN_STAGE_SECONDS
+from .services.scheduler import RefreshScheduler
 
 logger = structlog.get_logger()
 
@@ -41,7 +53,8 @@ app = FastAPI(
     """,
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -73,7 +86,8 @@ class ScreenResponse(BaseModel):
     risk_score: float
     matches: list[dict] = []
     sources_checked: list[str] = []
-    response_time_ms: int
+    generation: int = 0
+    response_time_ms: float
 
 
 class RiskScoreRequest(BaseModel):
@@ -94,6 +108,41 @@ class RiskScoreResponse(BaseModel):
     counterparty_score: float
     factors: list[dict] = []
     recommendations: list[str] = []
+    confidence: float = 1.0
+    degraded_categories: list[str] = []
+    timings_ms: dict[str, float] = {}
+
+
+class BatchRiskScoreRequest(BaseModel):
+    addresses: list[ScreenRequest] = Field(..., max_length=10000)
+    include_behavior: bool = True
+    include_counterparty: bool = True
+
+
+class BatchRiskScoreItem(BaseModel):
+    address: str
+    blockchain: str
+    risk_score: float
+    risk_level: str
+    sanctions_score: float
+    jurisdiction_score: float
+    behavior_score: float
+    counterparty_score: float
+    recommendations: list[str] = []
+
+
+class BatchRiskScoreResponse(BaseModel):
+    total: int
+    level_counts: dict[str, int]
+    confidence: float
+    degraded_categories: list[str] = []
+    timings_ms: dict[str, float] = {}
+    results: list[BatchRiskScoreItem]
+
+
+class ScreenAndScoreResponse(BaseModel):
+    screening: ScreenResponse
+    risk: RiskScoreResponse
 
 
 class JurisdictionResponse(BaseModel):
@@ -148,9 +197,22 @@ async def startup():
     """Initialize services."""
     logger.info("AML Compliance API starting...")
     
-    # Initialize screener and refresh cache
+    # Serve the persisted lists at once, follow new snapshots (and the
+    # graph nodes they list), and refresh from the network on a schedule
+    # without holding up startup
+    settings = get_settings()
     screener = get_screener()
-    # await screener.refresh_sanctions_cache()  # Uncomment in production
+    await screener.warm_start()
+    app.state.snapshot_watcher = asyncio.create_task(screener.watch_snapshot())
+    app.state.graph_watcher = asyncio.create_task(watch_sanctioned_nodes())
+    app.state.refresh_scheduler = None
+    if settings.sanctions_refresh_interval > 0:
+        app.state.refresh_scheduler = RefreshScheduler(screener, settings)
+        app.state.refresh_scheduler.start(run_now=settings.refresh_on_startup)
+    
+    # Bulk screening jobs; pick up those interrupted by a restart
+    app.state.jobs = JobManager(settings, screener)
+    await app.state.jobs.resume()
     
     logger.info("AML Compliance API started")
 
@@ -158,6 +220,13 @@ async def startup():
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup."""
+    app.state.snapshot_watcher.cancel()
+    app.state.graph_watcher.cancel()
+    if app.state.refresh_scheduler is not None:
+        app.state.refresh_scheduler.shutdown()
+    await app.state.jobs.close()
+    await get_risk_cache().close()
+    
     screener = get_screener()
     await screener.close()
     logger.info("AML Compliance API stopped")
@@ -168,7 +237,19 @@ async def shutdown():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.utcnow()}
+    status = get_screener().index_status()
+    return {
+        # Still serving, but on lists past the staleness budget
+        "status": "degraded" if status["stale"] else "healthy",
+        "timestamp": datetime.utcnow(),
+        "sanctions_index": status
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return render_metrics()
 
 
 @app.get("/v1/info")
@@ -190,8 +271,39 @@ async def api_info():
 
 # ============ Screening Endpoints ============
 
+def _screen_response(
+    content: bytes,
+    started_ns: int,
+    path: str,
+    timings: dict[str, int],
+    response_time_ms: float,
+    debug_timing: Optional[str]
+) -> Response:
+    """
+    JSON response of a screen; encoding the body since ``started_ns``
+    is recorded as its ``serialize`` stage.
+    
+    Requests sending ``X-Debug-Timing`` get the stage breakdown back in
+    a ``Server-Timing`` header (durations in milliseconds).
+    """
+    response = Response(content, media_type="application/json")
+    elapsed = time.perf_counter_ns() - started_ns
+    SCREEN_STAGE_SECONDS.observe(elapsed / 1e9, path=path, stage="serialize")
+    
+    if debug_timing and get_settings().debug_timing_header:
+        stages = {**timings, "serialize": elapsed}
+        response.headers["Server-Timing"] = ", ".join(
+            [f"{stage};dur={ns / 1e6:.3f}" for stage, ns in stages.items()]
+            + [f"total;dur={response_time_ms + elapsed / 1e6:.3f}"]
+        )
+    return response
+
+
 @app.post("/v1/screen", response_model=ScreenResponse)
-async def screen_address(request: ScreenRequest):
+async def screen_address(
+    request: ScreenRequest,
+    x_debug_timing: Optional[str] = Header(None)
+):
     """
     Screen a cryptocurrency address against sanctions lists.
     
@@ -206,20 +318,18 @@ async def screen_address(request: ScreenRequest):
     
     result = await screener.screen_address(request.address, blockchain)
     
-    return ScreenResponse(
-        address=result.address,
-        blockchain=result.blockchain.value,
-        is_sanctioned=result.is_sanctioned,
-        risk_level=result.risk_level.value,
-        risk_score=result.risk_score,
-        matches=result.matches,
-        sources_checked=result.sources_checked,
-        response_time_ms=result.response_time_ms
+    started_ns = time.perf_counter_ns()
+    content = encode(screen_result(result))
+    return _screen_response(
+        content, started_ns, "single", result.timings, result.response_time_ms, x_debug_timing
     )
 
 
 @app.post("/v1/batch-screen")
-async def batch_screen(request: BatchScreenRequest):
+async def batch_screen(
+    request: BatchScreenRequest,
+    x_debug_timing: Optional[str] = Header(None)
+):
     """
     Screen multiple addresses in batch.
     
@@ -234,28 +344,139 @@ async def batch_screen(request: BatchScreenRequest):
     
     results = await screener.batch_screen(addresses)
     
-    return {
-        "total": len(results),
-        "sanctioned_count": len([r for r in results if r.is_sanctioned]),
-        "results": [
-            {
-                "address": r.address,
-                "is_sanctioned": r.is_sanctioned,
-                "risk_level": r.risk_level.value,
-                "risk_score": r.risk_score
-            }
-            for r in results
-        ]
-    }
+    started_ns = time.perf_counter_ns()
+    content = encode_batch_screen(results)
+    # Every result of a batch carries the batch's timings
+    first = results[0] if results else None
+    return _screen_response(
+        content, started_ns, "batch",
+        first.timings if first else {}, first.response_time_ms if first else 0.0,
+        x_debug_timing
+    )
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    Streams the response while the request body is still being read.
+    
+    The stock response listens for a disconnect on ``receive`` while
+    streaming, which would consume body messages the generator needs;
+    here only the body reader receives (it raises on disconnect).
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+# Longest NDJSON request line accepted by the streaming endpoint
+_MAX_LINE_BYTES = 64 * 1024
+
+
+@app.post("/v1/batch-screen/stream")
+async def batch_screen_stream(request: Request):
+    """
+    Screen an NDJSON stream of ``{"address", "blockchain"}`` lines.
+    
+    Results stream back as NDJSON, one line per request line (in order,
+    with its 1-based ``line`` number; malformed lines get an ``error``).
+    Lines are screened in chunks as they arrive, so there is no batch
+    size limit and memory stays bounded by the chunk size; the body is
+    only read as fast as the client consumes results, so clients must
+    read results while still sending (a client that uploads the whole
+    body before reading stalls once socket buffers fill). Each chunk is
+    answered from one sanctions generation.
+    """
+    screener = get_screener()
+    chunk_size = get_settings().stream_screen_chunk_size
+    
+    async def results():
+        pending = b""
+        line_no = 1
+        
+        async for body in request.stream():
+            pending += body
+            *lines, pending = pending.split(b"\n")
+            
+            for start in range(0, len(lines), chunk_size):
+                chunk = lines[start:start + chunk_size]
+                payload, _ = await screen_lines(screener, chunk, line_no)
+                yield payload
+                line_no += len(chunk)
+            
+            if len(pending) > _MAX_LINE_BYTES:
+                yield encode({"line": line_no, "error": "Request line too long"}) + b"\n"
+                return
+        
+        if pending.strip():
+            payload, _ = await screen_lines(screener, [pending], line_no)
+            yield payload
+    
+    return _DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.post("/v1/jobs", status_code=202)
+async def create_screening_job(
+    request: Request,
+    format: Optional[str] = Query(None, description="Upload format: csv or ndjson (default from Content-Type)")
+):
+    """
+    Upload an address file (CSV with an ``address`` and optional
+    ``blockchain`` column, or NDJSON lines) for background screening.
+    
+    The body is streamed to disk, so files of millions of addresses are
+    accepted. Poll ``GET /v1/jobs/{job_id}`` for progress and fetch
+    results from ``GET /v1/jobs/{job_id}/results``.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    if format not in JOB_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+    
+    job = await app.state.jobs.create(request.stream(), format)
+    return job.progress()
+
+
+@app.get("/v1/jobs/{job_id}")
+async def get_screening_job(job_id: str):
+    """Status and progress of a bulk screening job."""
+    job = app.state.jobs.load(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.progress()
+
+
+@app.get("/v1/jobs/{job_id}/results")
+async def get_screening_job_results(job_id: str):
+    """
+    NDJSON results of a job, in input line order.
+    
+    While the job runs, the results screened so far (up to the first
+    unfinished chunk) are returned; ``X-Job-Status`` tells whether more
+    will follow.
+    """
+    jobs = app.state.jobs
+    job = jobs.load(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return StreamingResponse(
+        jobs.results(job),
+        media_type="application/x-ndjson",
+        headers={"X-Job-Status": job.status}
+    )
 
 
 @app.get("/v1/sanctions")
 async def search_sanctions(
     query: str = Query(..., min_length=3, description="Search query"),
-    source: Optional[str] = Query(None, description="Filter by source (ofac, eu, uk)"),
+    source: Optional[str] = Query(None, description="Filter by source (ofac, eu, uk, un)"),
+    program: Optional[str] = Query(None, description="Filter by sanctions program (e.g. CYBER2)"),
+    fuzzy: bool = Query(False, description="Match entity names with typo and transliteration tolerance"),
+    threshold: Optional[float] = Query(None, ge=0, le=1, description="Minimum fuzzy match score"),
     limit: int = Query(50, le=200)
 ):
-    """Search sanctions lists by name or address."""
+    """Search sanctions lists by name, alias or address."""
     screener = get_screener()
     
     source_filter = None
@@ -265,15 +486,38 @@ async def search_sanctions(
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid source: {source}")
     
-    results = await screener.search_sanctions(query, source_filter, limit)
+    results = await screener.search_sanctions(
+        query, source_filter, limit, program,
+        fuzzy=fuzzy,
+        threshold=threshold
+    )
     
     return {
         "query": query,
+        "fuzzy": fuzzy,
         "count": len(results),
         "results": results
     }
 
 
+@app.get("/v1/sanctions/changes")
+async def get_sanctions_changes(
+    since: int = Query(0, ge=0, description="Return diffs for generations after this one"),
+    limit: int = Query(100, le=1000)
+):
+    """Per-entry diffs (added, removed, changed) applied by each refresh."""
+    screener = get_screener()
+    
+    changes = screener.changelog.since(since, limit)
+    
+    return {
+        "since": since,
+        "current_generation": screener.index.generation,
+        "count": len(changes),
+        "changes": changes
+    }
+
+
 # ============ Risk Assessment Endpoints ============
 
 @app.post("/v1/risk-score", response_model=RiskScoreResponse)
@@ -289,33 +533,78 @@ async def calculate_risk_score(request: RiskScoreRequest):
         raise HTTPException(status_code=400, detail=f"Invalid blockchain: {request.blockchain}")
     
     assessor = RiskAssessor()
-    result = await assessor.assess_address(
-        request.address,
-        blockchain,
-        request.include_behavior,
-        request.include_counterparty
-    )
+    try:
+        result = await assessor.assess_address(
+            request.address,
+            blockchain,
+            request.include_behavior,
+            request.include_counterparty
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Risk assessment timed out")
     
-    return RiskScoreResponse(
-        address=result.address,
-        blockchain=result.blockchain.value,
-        risk_score=result.risk_score,
-        risk_level=result.risk_level.value,
-        sanctions_score=result.sanctions_score,
-        jurisdiction_score=result.jurisdiction_score,
-        behavior_score=result.behavior_score,
-        counterparty_score=result.counterparty_score,
-        factors=[
-            {
-                "name": f.name,
-                "category": f.category,
-                "score": f.score,
-                "severity": f.severity,
-                "description": f.description
-            }
-            for f in result.factors
-        ],
-        recommendations=result.recommendations
+    return Response(encode(risk_result(result)), media_type="application/json")
+
+
+@app.post("/v1/batch-risk-score", response_model=BatchRiskScoreResponse)
+async def batch_risk_score(request: BatchRiskScoreRequest):
+    """
+    Calculate risk scores for many addresses in one call.
+    
+    Category scores are evaluated for the whole batch and weighted as
+    one matrix; results are returned in request order.
+    """
+    items = []
+    for a in request.addresses:
+        try:
+            items.append((a.address, BlockchainType(a.blockchain)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid blockchain: {a.blockchain}")
+    
+    assessor = RiskAssessor()
+    try:
+        results = await assessor.assess_many(
+            items,
+            request.include_behavior,
+            request.include_counterparty
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Risk assessment timed out")
+    
+    return Response(encode_batch_risk(results), media_type="application/json")
+
+
+@app.post("/v1/screen-and-score", response_model=ScreenAndScoreResponse)
+async def screen_and_score(request: RiskScoreRequest):
+    """
+    Screen an address and calculate its risk score in one call.
+    
+    The risk assessment scores the very screen returned with it, so the
+    address is looked up once instead of once per endpoint.
+    """
+    try:
+        blockchain = BlockchainType(request.blockchain)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid blockchain: {request.blockchain}")
+    
+    context = AssessmentContext()
+    screening = await context.screen(request.address, blockchain)
+    
+    assessor = RiskAssessor()
+    try:
+        assessment = await assessor.assess_address(
+            request.address,
+            blockchain,
+            request.include_behavior,
+            request.include_counterparty,
+            context=context
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Risk assessment timed out")
+    
+    return Response(
+        encode({"screening": screen_result(screening), "risk": risk_result(assessment)}),
+        media_type="application/json"
     )
 
 
@@ -441,11 +730,19 @@ async def get_fatf_status():
 async def get_api_stats():
     """Get API usage statistics."""
     
+    index = get_screener().index
+    
     # In production, this would query actual usage data
     return {
         "total_screenings_today": 0,
         "total_risk_assessments_today": 0,
-        "sanctions_list_last_updated": datetime.utcnow(),
+        "sanctions_list_last_updated": index.built_at,
+        "sanctions_list_generation": index.generation,
+        "sanctions_sources": index.sources,
+        "sanctions_bloom_filter": index.bloom.stats(),
+        "request_coalescing": singleflight_stats(),
+        "result_cache": get_screener().cache.stats(),
+        "risk_cache": get_risk_cache().stats(),
         "uptime_percent": 99.9
     }
 
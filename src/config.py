@@ -53,6 +53,11 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
+    # Screening result cache: in-process LRU in front of Redis (redis_url)
+    result_cache_size: int = 100_000
+    result_cache_ttl: float = 300.0
+    result_cache_redis: bool = True
+    
     # Rate Limiting (per tier)
     rate_limit_free: int = 100        # per day
     rate_limit_starter: int = 10000   # per day
@@ -61,6 +66,9 @@ class Settings(BaseSettings):
     
     # External APIs
     ofac_sdn_url: str = "https://www.treasury.gov/ofac/downloads/sdn.xml"
+    eu_sanctions_url: str = "https://webgate.ec.europa.eu/fsd/fsf/public/files/xmlFullSanctionsList_1_1/content?token=dG9rZW4tMjAxNw"
+    uk_sanctions_url: str = "https://ofsistorage.blob.core.windows.net/publishlive/2022format/ConList.xml"
+    un_sanctions_url: str = "https://scsanctions.un.org/resources/xml/en/consolidated.xml"
     basel_aml_api_key: Optional[str] = None
     chainalysis_api_key: Optional[str] = None
     
@@ -68,6 +76,66 @@ class Settings(BaseSettings):
     etherscan_api_key: Optional[str] = None
     trongrid_api_key: Optional[str] = None
     
+    # Sanctions lists merged into the index, fetched concurrently on refresh
+    sanctions_sources: list[str] = ["ofac", "eu", "uk", "un"]
+    sanctions_source_timeout: float = 300.0
+    
+    # Lines screened per chunk by POST /v1/batch-screen/stream
+    stream_screen_chunk_size: int = 1000
+    
+    # Bulk screening jobs (POST /v1/jobs): state and results on disk,
+    # screened in chunks by a process pool mapping the snapshot
+    screening_jobs_dir: str = "data/jobs"
+    screening_job_chunk_size: int = 10000
+    screening_job_workers: int = 2
+    
+    # Fuzzy entity-name matching (GET /v1/sanctions?fuzzy=true)
+    fuzzy_match_threshold: float = 0.88
+    fuzzy_max_candidates: int = 2000
+    fuzzy_match_workers: int = 2
+    
+    # Shared sanctions snapshot (written by `main.py refresh`, mapped by workers)
+    sanctions_snapshot_path: str = "data/sanctions.snapshot"
+    sanctions_changelog_path: str = "data/sanctions.changes.jsonl"
+    snapshot_poll_seconds: float = 5.0
+    
+    # Startup: serve the persisted lists at once, then refresh from the network
+    warm_start_timeout: float = 5.0
+    refresh_on_startup: bool = True
+    
+    # Background refresh by one leader worker per node (interval 0 disables it);
+    # lists not verified within the staleness budget are reported stale
+    sanctions_refresh_interval: float = 3600.0
+    sanctions_refresh_jitter: float = 300.0
+    sanctions_max_staleness: float = 86400.0
+    
+    # Mirror each new generation into the sanctioned_addresses table
+    sanctions_persist_database: bool = True
+    
+    # Per-category time budgets of a risk assessment (seconds); categories
+    # other than sanctions that overrun are left out of a partial result
+    risk_category_timeouts: dict[str, float] = {
+        "sanctions": 1.0,
+        "jurisdiction": 2.0,
+        "behavior": 2.0,
+        "counterparty": 2.0,
+    }
+    
+    # Risk assessment cache: entries stay valid until a data version they
+    # depend on changes (the TTL only bounds memory); bump the label set
+    # version when the address labels behind behavior/counterparty change
+    risk_cache_size: int = 100_000
+    risk_cache_ttl: float = 86400.0
+    risk_label_set_version: str = "1"
+    
+    # Transaction graphs for counterparty hop analysis (`main.py ingest-graph`);
+    # exposure searches stop at the hop limit or edge budget, and do not
+    # expand through hubs (addresses with more edges than hub degree)
+    graph_dir: str = "data/graph"
+    graph_max_depth: int = 3
+    graph_max_edges: int = 1_000_000
+    graph_hub_degree: int = 10_000
+    
     # FATF Data
     fatf_data_url: str = "https://www.fatf-gafi.org/content/dam/fatf-gafi/json"
     
@@ -78,6 +146,9 @@ class Settings(BaseSettings):
     # Monitoring
     sentry_dsn: Optional[str] = None
     
+    # Answer X-Debug-Timing requests with a Server-Timing stage breakdown
+    debug_timing_header: bool = True
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -143,7 +143,7 @@ class SanctionedAddress(Base):
     __tablename__ = "sanctioned_addresses"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    address = Column(String(128), unique=True, nullable=False, index=True)
+    address = Column(String(128), nullable=False, index=True)
     blockchain = Column(SQLEnum(BlockchainType))
     
     # Source
@@ -160,11 +160,16 @@ class SanctionedAddress(Base):
     designation_date = Column(DateTime)
     is_active = Column(Boolean, default=True)
     
-    # Metadata
-    metadata = Column(JSONB, default={})
+    # Metadata (the attribute name ``metadata`` is reserved by SQLAlchemy)
+    metadata_ = Column("metadata", JSONB, default={})
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # One row per list naming an address (the same address may be on several)
+    __table_args__ = (
+        Index("ix_sanctioned_address_source", "address", "source", unique=True),
+    )
 
 
 # ============ Risk Assessment ============
@@ -225,8 +230,8 @@ class JurisdictionRisk(Base):
     is_ofac_sanctioned = Column(Boolean, default=False)
     is_eu_sanctioned = Column(Boolean, default=False)
     
-    # Metadata
-    metadata = Column(JSONB, default={})
+    # Metadata (the attribute name ``metadata`` is reserved by SQLAlchemy)
+    metadata_ = Column("metadata", JSONB, default={})
     
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
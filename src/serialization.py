@@ -0,0 +1,127 @@
+"""JSON encoding of API responses.
+
+Responses are rendered by orjson. The hot endpoints skip response
+models altogether: their results are encoded straight from the service
+dataclasses, and batch screening results, the largest responses, by a
+precompiled per-field encoder that allocates no intermediate dicts
+(building one dict per result costs more in garbage collection than
+the encoding itself at 10,000 results).
+"""
+
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+from .models import RiskLevel
+from .services.risk import RiskAssessmentResult
+from .services.screening import ScreeningResult
+
+# Fragments of the batch screening encoder
+_BOOLS = {True: b"true", False: b"false"}
+_LEVELS = {level: orjson.dumps(level.value) for level in RiskLevel}
+_BATCH_ITEM = b'{"address":%b,"is_sanctioned":%b,"risk_level":%b,"risk_score":%b}'
+_BATCH = b'{"total":%d,"sanctioned_count":%d,"results":[%b]}'
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson (the app's default response class)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def screen_result(result: ScreeningResult) -> dict:
+    """Fields of a screening result returned by ``/v1/screen``."""
+    return {
+        "address": result.address,
+        "blockchain": result.blockchain.value,
+        "is_sanctioned": result.is_sanctioned,
+        "risk_level": result.risk_level.value,
+        "risk_score": result.risk_score,
+        "matches": result.matches,
+        "sources_checked": result.sources_checked,
+        "generation": result.generation,
+        "response_time_ms": round(result.response_time_ms, 3),
+    }
+
+
+def risk_result(result: RiskAssessmentResult) -> dict:
+    """Fields of a risk assessment returned by ``/v1/risk-score``."""
+    return {
+        "address": result.address,
+        "blockchain": result.blockchain.value,
+        "risk_score": result.risk_score,
+        "risk_level": result.risk_level.value,
+        "sanctions_score": result.sanctions_score,
+        "jurisdiction_score": result.jurisdiction_score,
+        "behavior_score": result.behavior_score,
+        "counterparty_score": result.counterparty_score,
+        "factors": [
+            {
+                "name": f.name,
+                "category": f.category,
+                "score": f.score,
+                "severity": f.severity,
+                "description": f.description,
+            }
+            for f in result.factors
+        ],
+        "recommendations": result.recommendations,
+        "confidence": result.confidence,
+        "degraded_categories": result.degraded_categories,
+        "timings_ms": {category: round(ns / 1e6, 3) for category, ns in result.timings.items()},
+    }
+
+
+def encode_batch_risk(results: list[RiskAssessmentResult]) -> bytes:
+    """
+    JSON body of ``/v1/batch-risk-score``: level counts, the batch's
+    confidence and timings, and the scores of each result.
+    """
+    first = results[0] if results else None
+    level_counts: dict[str, int] = {}
+    for r in results:
+        level_counts[r.risk_level.value] = level_counts.get(r.risk_level.value, 0) + 1
+    
+    return orjson.dumps({
+        "total": len(results),
+        "level_counts": level_counts,
+        "confidence": first.confidence if first else 1.0,
+        "degraded_categories": first.degraded_categories if first else [],
+        "timings_ms": {
+            category: round(ns / 1e6, 3) for category, ns in first.timings.items()
+        } if first else {},
+        "results": [
+            {
+                "address": r.address,
+                "blockchain": r.blockchain.value,
+                "risk_score": r.risk_score,
+                "risk_level": r.risk_level.value,
+                "sanctions_score": r.sanctions_score,
+                "jurisdiction_score": r.jurisdiction_score,
+                "behavior_score": r.behavior_score,
+                "counterparty_score": r.counterparty_score,
+                "recommendations": r.recommendations,
+            }
+            for r in results
+        ],
+    })
+
+
+def encode(content: Any) -> bytes:
+    """JSON bytes of a response payload."""
+    return orjson.dumps(content)
+
+
+def encode_batch_screen(results: list[ScreeningResult]) -> bytes:
+    """JSON body of ``/v1/batch-screen``: totals and the summary of each result."""
+    dumps = orjson.dumps
+    items = b",".join([
+        _BATCH_ITEM % (
+            dumps(r.address), _BOOLS[r.is_sanctioned], _LEVELS[r.risk_level], dumps(r.risk_score)
+        )
+        for r in results
+    ])
+    sanctioned = sum(r.is_sanctioned for r in results)
+    return _BATCH % (len(results), sanctioned, items)
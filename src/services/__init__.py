@@ -1,19 +1,29 @@
 """AML Compliance API services."""
 
 from .screening import SanctionsScreener, ScreeningResult, get_screener
-from .risk import RiskAssessor, RiskAssessmentResult, RiskFactor, get_jurisdiction_risk
+from .risk import (
+    AssessmentContext, RiskAssessor, RiskAssessmentResult, RiskFactor,
+    get_jurisdiction_risk, get_risk_cache, watch_sanctioned_nodes
+)
+from .graph import get_graph_store
 from .compliance import SARGenerator, SARDraftResult, TravelRuleChecker, TravelRuleResult
+from .singleflight import singleflight_stats
 
 __all__ = [
     "SanctionsScreener",
     "ScreeningResult",
     "get_screener",
+    "AssessmentContext",
     "RiskAssessor",
     "RiskAssessmentResult",
     "RiskFactor",
     "get_jurisdiction_risk",
+    "get_risk_cache",
+    "watch_sanctioned_nodes",
+    "get_graph_store",
     "SARGenerator",
     "SARDraftResult",
     "TravelRuleChecker",
     "TravelRuleResult",
+    "singleflight_stats",
 ]
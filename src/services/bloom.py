@@ -0,0 +1,124 @@
+"""Bloom filter used as a negative fast path for sanctions lookups."""
+
+from hashlib import blake2b
+import math
+from typing import Iterable
+
+
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over canonical address keys.
+
+    A miss proves an address is not listed; a hit means it may be and
+    the exact index must be consulted. Positions come from blake2b with
+    double hashing, so a filter built in one process answers the same in
+    any other (unlike ``hash()``, which is salted per process).
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, generation: int = 0):
+        self.num_bits = max(64, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.generation = generation
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(
+        cls,
+        capacity: int,
+        error_rate: float = 0.001,
+        generation: int = 0
+    ) -> "BloomFilter":
+        """Size a filter for ``capacity`` keys at the target false-positive rate."""
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = round(num_bits / capacity * math.log(2))
+        return cls(num_bits, num_hashes, generation)
+
+    @classmethod
+    def from_keys(
+        cls,
+        keys: Iterable[bytes],
+        capacity: int,
+        error_rate: float = 0.001,
+        generation: int = 0
+    ) -> "BloomFilter":
+        """Build a filter holding ``keys``."""
+        bloom = cls.for_capacity(capacity, error_rate, generation)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer,
+        num_bits: int,
+        num_hashes: int,
+        count: int,
+        generation: int = 0
+    ) -> "BloomFilter":
+        """Read-only filter over an existing bit array (e.g. a mapped file)."""
+        bloom = cls.__new__(cls)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.generation = generation
+        bloom.count = count
+        bloom._bits = buffer
+        return bloom
+
+    def copy(self, generation: int) -> "BloomFilter":
+        """Writable copy, e.g. to add a diff's keys for the next generation."""
+        bloom = BloomFilter(self.num_bits, self.num_hashes, generation)
+        bloom._bits[:] = self._bits
+        bloom.count = self.count
+        return bloom
+
+    def to_bytes(self) -> bytes:
+        """The raw bit array, for persisting alongside a snapshot."""
+        return bytes(self._bits)
+
+    def _hashes(self, key: bytes) -> tuple[int, int]:
+        digest = int.from_bytes(blake2b(key, digest_size=16).digest(), "little")
+        # Odd step so every probe sequence visits distinct positions
+        return digest & _MASK64, (digest >> 64) | 1
+
+    def add(self, key: bytes) -> None:
+        h1, h2 = self._hashes(key)
+        bits, num_bits = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        h1, h2 = self._hashes(key)
+        bits, num_bits = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the bit array in bytes."""
+        return len(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def stats(self) -> dict:
+        """Summary for health and stats endpoints."""
+        return {
+            "generation": self.generation,
+            "entries": self.count,
+            "size_bytes": self.size_bytes,
+            "num_hashes": self.num_hashes,
+            "false_positive_rate": self.false_positive_rate,
+        }
@@ -0,0 +1,193 @@
+"""Two-tier result cache: in-process LRU in front of a shared Redis."""
+
+from collections import OrderedDict
+import json
+import time
+from typing import Any, Hashable, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+# After a Redis error, serve from the local tier alone for this long
+_L2_RETRY_SECONDS = 30.0
+
+# Redis round trips are bounded so an unhealthy L2 cannot stall screens
+_L2_TIMEOUT_SECONDS = 0.25
+
+
+class LRUCache:
+    """Bounded least-recently-used mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResultCache:
+    """
+    Screening result cache shared by all workers and nodes.
+
+    Lookups try the process-local LRU first, then Redis; Redis hits are
+    copied into the LRU. Every key carries the version of the data the
+    value was computed from, so publishing new data invalidates all
+    cached results at once (old entries age out of the LRU and expire in
+    Redis). Redis is shared by every process and node, so the version
+    must identify the data itself (e.g. the sanctions index digest),
+    never a counter kept by one process.
+
+    Values must be JSON-serializable and are returned as shared objects,
+    so callers must not mutate them. Redis is optional: when it is
+    unreachable the cache runs on the local tier alone, retrying Redis
+    every ``_L2_RETRY_SECONDS``. The first failure is logged as a
+    warning and the recovery once Redis answers again; failed retries in
+    between are not logged.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        redis_url: Optional[str] = None,
+        prefix: str = "aml:result",
+        redis=None
+    ):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local = LRUCache(maxsize, ttl)
+        self._redis = redis
+        self._redis_url = redis_url
+        self._l2_down_until = 0.0
+        self._l2_down = False
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    def _key(self, namespace: str, version: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{version}:{key}"
+
+    def _l2(self):
+        """The Redis client, or None while Redis is disabled or backing off."""
+        if self._redis is None and self._redis_url:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(
+                self._redis_url,
+                socket_timeout=_L2_TIMEOUT_SECONDS,
+                socket_connect_timeout=_L2_TIMEOUT_SECONDS
+            )
+        if self._redis is None or time.monotonic() < self._l2_down_until:
+            return None
+        return self._redis
+
+    def _l2_failed(self, error: Exception):
+        self._l2_down_until = time.monotonic() + _L2_RETRY_SECONDS
+        if not self._l2_down:
+            self._l2_down = True
+            logger.warning(f"Result cache L2 unavailable: {error!r}", retry_every=_L2_RETRY_SECONDS)
+
+    def _l2_answered(self):
+        if self._l2_down:
+            self._l2_down = False
+            logger.info("Result cache L2 available again")
+
+    async def get_many(self, namespace: str, version: str, keys: list[str]) -> dict[str, Any]:
+        """Cached values of ``keys`` (hits only), from either tier."""
+        found = {}
+        missing = []
+        for key in keys:
+            full_key = self._key(namespace, version, key)
+            value = self._local.get(full_key)
+            if value is None:
+                missing.append((key, full_key))
+            else:
+                found[key] = value
+        self.l1_hits += len(found)
+
+        redis = self._l2() if missing else None
+        if redis is not None:
+            try:
+                raw = await redis.mget([full_key for _, full_key in missing])
+            except Exception as e:  # redis.RedisError, OSError, timeouts
+                self._l2_failed(e)
+            else:
+                self._l2_answered()
+                for (key, full_key), payload in zip(missing, raw):
+                    if payload is not None:
+                        value = json.loads(payload)
+                        self._local.set(full_key, value)
+                        found[key] = value
+                        self.l2_hits += 1
+
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def get(self, namespace: str, version: str, key: str) -> Optional[Any]:
+        return (await self.get_many(namespace, version, [key])).get(key)
+
+    async def set_many(self, namespace: str, version: str, values: dict[str, Any]):
+        """Store ``values`` in both tiers."""
+        if not values:
+            return
+
+        full_keys = {key: self._key(namespace, version, key) for key in values}
+        for key, value in values.items():
+            self._local.set(full_keys[key], value)
+
+        redis = self._l2()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(full_keys[key], json.dumps(value), ex=max(1, int(self.ttl)))
+                await pipe.execute()
+        except Exception as e:
+            self._l2_failed(e)
+        else:
+            self._l2_answered()
+
+    async def set(self, namespace: str, version: str, key: str, value: Any):
+        await self.set_many(namespace, version, {key: value})
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    def stats(self) -> dict:
+        """Hit counters for the stats endpoint."""
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+            "l1_size": len(self._local),
+            "l2_enabled": self._redis is not None or bool(self._redis_url),
+        }
@@ -0,0 +1,231 @@
+"""Chain-aware address canonicalization.
+
+Every chain gets a compact binary key for its addresses, so indexes
+compare a few raw bytes instead of long mixed-case strings:
+
+- EVM chains: the 20 address bytes (hex case and checksum ignored)
+- Bitcoin: base58check payload (version + hash), or network, witness
+  version and program for bech32/bech32m addresses
+- Tron: the 21-byte base58check payload (``0x41`` + 20 bytes); the
+  hex form ``41...`` maps to the same key
+- Solana: the 32-byte public key
+
+Inputs that do not decode for their chain still get a stable key (the
+normalized text behind a ``0xff`` marker) so they can be screened, but
+they never collide with a decoded address.
+"""
+
+from functools import lru_cache
+import hashlib
+from typing import Optional
+
+from ..models import BlockchainType
+
+
+# EVM chains share one address space: a key is the same on all of them
+EVM_CHAINS = frozenset({
+    BlockchainType.ETHEREUM,
+    BlockchainType.POLYGON,
+    BlockchainType.BSC,
+})
+
+
+def chain_family(blockchain: BlockchainType) -> str:
+    """Address family of a chain; EVM chains share one."""
+    return "evm" if blockchain in EVM_CHAINS else blockchain.value
+
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {char: i for i, char in enumerate(_B58_ALPHABET)}
+
+_BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_BECH32_CONSTANTS = (1, 0x2BC830A3)  # bech32, bech32m
+
+# Marker for inputs that could not be decoded for their chain
+_RAW_MARKER = b"\xff"
+
+# Segwit keys are tagged so they can never equal a base58 payload; the
+# tag also carries the network (by human-readable part), as mainnet and
+# testnet addresses with the same witness program are different addresses
+_SEGWIT_TAGS = {"bc": 0x80, "tb": 0xA0}
+
+
+def b58decode(value: str) -> bytes:
+    """Decode a base58 string (Bitcoin alphabet)."""
+    number = 0
+    for char in value:
+        try:
+            number = number * 58 + _B58_INDEX[char]
+        except KeyError:
+            raise ValueError(f"Invalid base58 character: {char!r}") from None
+
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    leading_zeros = len(value) - len(value.lstrip("1"))
+    return b"\x00" * leading_zeros + body
+
+
+def b58check_decode(value: str) -> bytes:
+    """Decode a base58check string and return its payload."""
+    data = b58decode(value)
+    payload, checksum = data[:-4], data[-4:]
+    if len(data) < 5 or hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError("Invalid base58check checksum")
+    return payload
+
+
+def _bech32_polymod(values: list[int]) -> int:
+    generator = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1FFFFFF) << 5 ^ value
+        for i in range(5):
+            if (top >> i) & 1:
+                checksum ^= generator[i]
+    return checksum
+
+
+def _convert_bits(data: list[int], from_bits: int, to_bits: int) -> bytes:
+    """Regroup 5-bit words into bytes (no padding allowed)."""
+    acc = 0
+    bits = 0
+    out = bytearray()
+    for value in data:
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            out.append((acc >> bits) & ((1 << to_bits) - 1))
+    if bits >= from_bits or (acc << (to_bits - bits)) & ((1 << to_bits) - 1):
+        raise ValueError("Invalid bech32 padding")
+    return bytes(out)
+
+
+def segwit_decode(value: str) -> tuple[str, int, bytes]:
+    """Decode a bech32/bech32m segwit address into (hrp, version, program)."""
+    if value.lower() != value and value.upper() != value:
+        raise ValueError("Mixed-case bech32 address")
+
+    value = value.lower()
+    separator = value.rfind("1")
+    if separator < 1 or separator + 7 > len(value):
+        raise ValueError("Invalid bech32 separator position")
+
+    hrp = value[:separator]
+    data = [_BECH32_CHARSET.find(char) for char in value[separator + 1:]]
+    if -1 in data:
+        raise ValueError("Invalid bech32 character")
+
+    expanded = [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+    if _bech32_polymod(expanded + data) not in _BECH32_CONSTANTS:
+        raise ValueError("Invalid bech32 checksum")
+
+    words = data[:-6]
+    if not words:
+        raise ValueError("Empty segwit payload")
+
+    version, program = words[0], _convert_bits(words[1:], 5, 8)
+    if version > 16 or not 2 <= len(program) <= 40:
+        raise ValueError("Invalid segwit program")
+    return hrp, version, program
+
+
+def _fromhex(value: str, size: int) -> Optional[bytes]:
+    """Strict hex decode (bytes.fromhex tolerates embedded spaces)."""
+    try:
+        raw = bytes.fromhex(value)
+    except ValueError:
+        return None
+    return raw if len(raw) == size else None
+
+
+def _evm_key(address: str) -> Optional[bytes]:
+    if len(address) == 42 and address[:2] in ("0x", "0X"):
+        return _fromhex(address[2:], 20)
+    return None
+
+
+def _bitcoin_key(address: str) -> Optional[bytes]:
+    if address[:3].lower() in ("bc1", "tb1"):
+        hrp, version, program = segwit_decode(address)
+        tag = _SEGWIT_TAGS.get(hrp)
+        return bytes([tag | version]) + program if tag is not None else None
+    payload = b58check_decode(address)
+    return payload if len(payload) == 21 else None
+
+
+def _tron_key(address: str) -> Optional[bytes]:
+    if len(address) == 42 and address[:2] == "41":
+        return _fromhex(address, 21)
+    payload = b58check_decode(address)
+    return payload if len(payload) == 21 and payload[0] == 0x41 else None
+
+
+def _solana_key(address: str) -> Optional[bytes]:
+    key = b58decode(address)
+    return key if len(key) == 32 else None
+
+
+def detect_chain(address: str) -> Optional[BlockchainType]:
+    """
+    Chain of an address found in free text, when its encoding proves it.
+
+    Checksummed formats only: Solana keys carry no checksum, so any
+    base58 word of the right length would match, and are not detected.
+    """
+    address = address.strip()
+
+    if _evm_key(address) is not None:
+        return BlockchainType.ETHEREUM
+
+    for chain, decode in ((BlockchainType.TRON, _tron_key), (BlockchainType.BITCOIN, _bitcoin_key)):
+        try:
+            key = decode(address)
+        except ValueError:
+            continue
+        # Tron payloads are valid base58check too; keep them out of Bitcoin
+        if key is not None and (chain == BlockchainType.TRON or key[0] != 0x41):
+            return chain
+    return None
+
+
+@lru_cache(maxsize=65536)
+def canonical_key(address: str, blockchain: BlockchainType) -> bytes:
+    """
+    Compact canonical key for an address on a chain.
+
+    Cached, since hot addresses (exchange wallets, bridges) are screened
+    over and over.
+    """
+    address = address.strip()
+
+    try:
+        if blockchain in EVM_CHAINS:
+            key = _evm_key(address)
+        elif blockchain == BlockchainType.BITCOIN:
+            key = _bitcoin_key(address)
+        elif blockchain == BlockchainType.TRON:
+            key = _tron_key(address)
+        elif blockchain == BlockchainType.SOLANA:
+            key = _solana_key(address)
+        else:
+            key = None
+    except ValueError:
+        key = None
+
+    if key is not None:
+        return key
+    return _RAW_MARKER + normalize_address(address, blockchain).encode()
+
+
+def normalize_address(address: str, blockchain: BlockchainType) -> str:
+    """
+    Display form of an address: case-folded only where the chain's
+    encoding is case-insensitive (EVM hex, bech32), untouched otherwise.
+    """
+    address = address.strip()
+    if blockchain in EVM_CHAINS:
+        return address.lower()
+    if blockchain == BlockchainType.BITCOIN and address[:3].lower() in ("bc1", "tb1"):
+        return address.lower()
+    return address
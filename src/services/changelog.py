@@ -0,0 +1,51 @@
+"""Append-only change log of sanctions list diffs."""
+
+from datetime import datetime
+import json
+import os
+
+from .index import IndexDiff
+
+
+class SanctionsChangeLog:
+    """
+    Per-generation diffs of each source, one JSON object per line.
+
+    Downstream consumers poll ``since(generation)`` and apply deltas
+    instead of re-reading the whole list after every refresh.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, generation: int, previous_generation: int, diff: IndexDiff):
+        """Record the diff that produced ``generation``."""
+        entry = {
+            "generation": generation,
+            "previous_generation": previous_generation,
+            "source": diff.source,
+            "created_at": datetime.utcnow().isoformat(),
+            "summary": diff.summary(),
+            "added": diff.added,
+            "removed": diff.removed,
+            "changed": diff.changed,
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def since(self, generation: int, limit: int = 100) -> list[dict]:
+        """Diffs for generations after ``generation``, oldest first."""
+        if not os.path.exists(self.path):
+            return []
+
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["generation"] > generation:
+                    entries.append(entry)
+                    if len(entries) >= limit:
+                        break
+        return entries
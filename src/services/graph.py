@@ -0,0 +1,413 @@
+"""Transaction graph store for counterparty exposure analysis.
+
+A chain's graph is kept as compressed sparse row (CSR) arrays: node ids
+are positions in a sorted array of 16-byte address digests, and each
+direction (sent to, received from) is an ``indptr``/``indices`` pair.
+The arrays are plain ``.npy`` files memory-mapped at query time, so a
+graph of hundreds of millions of edges costs page cache rather than
+Python objects, and every worker shares one copy.
+
+Graphs are built offline from edge lists (CSV, or Parquet with pyarrow
+installed) by ``python main.py ingest-graph``. Each build is written to
+a new version directory and published by replacing the chain's
+``CURRENT`` file, so readers switch over on their next query.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from hashlib import blake2b
+import json
+import os
+import time
+from typing import Iterable, Iterator, Optional
+import uuid
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from ..config import get_settings
+from ..models import BlockchainType
+from .canonical import canonical_key
+from .index import SanctionsIndex
+from .snapshot import family_tag
+
+logger = structlog.get_logger()
+
+# Bytes of the address digests identifying nodes
+DIGEST_SIZE = 16
+
+_ARRAYS = ("nodes", "out_indptr", "out_indices", "in_indptr", "in_indices")
+
+# Edge-list rows read per chunk on ingest
+_INGEST_CHUNK_ROWS = 5_000_000
+
+
+def address_digest(address: str, blockchain: BlockchainType) -> bytes:
+    """Node digest of an address: a hash of its canonical key."""
+    return blake2b(canonical_key(address, blockchain), digest_size=DIGEST_SIZE).digest()
+
+
+@dataclass
+class Exposure:
+    """Sanctioned nodes reachable from an address within a hop budget."""
+    sanctioned_by_hop: list[int]  # newly reached sanctioned nodes at hop 1, 2, ...
+    nodes_visited: int
+    edges_scanned: int
+    truncated: bool  # the edge budget ran out before the hop limit
+
+    @property
+    def nearest_hop(self) -> Optional[int]:
+        """Fewest hops to a sanctioned node (None if none was reached)."""
+        for hop, count in enumerate(self.sanctioned_by_hop, 1):
+            if count:
+                return hop
+        return None
+
+    @property
+    def sanctioned(self) -> int:
+        return sum(self.sanctioned_by_hop)
+
+
+class TransactionGraph:
+    """One memory-mapped graph version of a chain."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.version: str = self.meta["version"]
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+        self.nodes = arrays["nodes"]
+        self._adjacency = {
+            "out": (arrays["out_indptr"], arrays["out_indices"]),
+            "in": (arrays["in_indptr"], arrays["in_indices"]),
+        }
+
+        # Node ids of the listed addresses, per sanctions list digest
+        self._sanctioned: tuple[Optional[str], np.ndarray] = (None, np.empty(0, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def node_ids(self, digests: np.ndarray) -> np.ndarray:
+        """Node ids of ``|S16`` digests (-1 for addresses not in the graph)."""
+        if len(self.nodes) == 0:
+            return np.full(len(digests), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.nodes, digests), len(self.nodes) - 1)
+        return np.where(self.nodes[positions] == digests, positions, -1)
+
+    def node_id(self, address: str, blockchain: BlockchainType) -> Optional[int]:
+        """Node id of an address, or None if it has no edges in the graph."""
+        digests = np.array([address_digest(address, blockchain)], dtype=f"S{DIGEST_SIZE}")
+        node = int(self.node_ids(digests)[0])
+        return node if node >= 0 else None
+
+    def known_sanctioned_nodes(self, index: SanctionsIndex) -> Optional[np.ndarray]:
+        """The sanctioned node ids for an index if already computed."""
+        digest, nodes = self._sanctioned
+        return nodes if digest == index.digest else None
+
+    def sanctioned_nodes(self, index: SanctionsIndex, blockchain: BlockchainType) -> np.ndarray:
+        """
+        Sorted node ids of the addresses an index lists on the graph's
+        chain family; computed once per list content (index digest).
+
+        Decodes every record of the index: callers on the request path
+        go through ``risk.sanctioned_nodes``, which runs it once per
+        graph version and lists, off the event loop.
+        """
+        nodes = self.known_sanctioned_nodes(index)
+        if nodes is not None:
+            return nodes
+
+        tag = family_tag(blockchain)
+        digests = set()
+        for record in index.records():
+            try:
+                chain = BlockchainType(record["blockchain"])
+            except (KeyError, ValueError):
+                continue
+            if family_tag(chain) == tag:
+                digests.add(address_digest(record["address"], chain))
+
+        ids = self.node_ids(np.array(sorted(digests), dtype=f"S{DIGEST_SIZE}"))
+        nodes = np.unique(ids[ids >= 0])
+        self._sanctioned = (index.digest, nodes)
+        return nodes
+
+    def _neighbors(
+        self,
+        frontier: np.ndarray,
+        direction: str,
+        hub_degree: Optional[int],
+        budget: int
+    ) -> tuple[np.ndarray, bool]:
+        """
+        Concatenated neighbors of the frontier nodes with at most
+        ``hub_degree`` edges in a direction, and whether the edge
+        ``budget`` cut the expansion short (at a node boundary).
+        """
+        indptr, indices = self._adjacency[direction]
+        starts = np.asarray(indptr[frontier], dtype=np.int64)
+        degrees = np.asarray(indptr[frontier + 1], dtype=np.int64) - starts
+        if hub_degree is not None:
+            expand = degrees <= hub_degree
+            starts, degrees = starts[expand], degrees[expand]
+
+        ends = np.cumsum(degrees)
+        truncated = bool(len(ends)) and int(ends[-1]) > budget
+        if truncated:
+            keep = int(np.searchsorted(ends, budget, side="right"))
+            starts, degrees, ends = starts[:keep], degrees[:keep], ends[:keep]
+        total = int(ends[-1]) if len(ends) else 0
+        if total == 0:
+            return np.empty(0, dtype=np.int64), truncated
+
+        # Positions of every neighbor in ``indices`` without a Python loop:
+        # each node's run starts at its indptr and counts up by one
+        offsets = np.repeat(starts - ends + degrees, degrees)
+        return np.asarray(indices[offsets + np.arange(total)], dtype=np.int64), truncated
+
+    def exposure(
+        self,
+        node: int,
+        sanctioned: np.ndarray,
+        max_depth: int = 3,
+        max_edges: int = 1_000_000,
+        hub_degree: int = 10_000,
+        directions: Iterable[str] = ("out", "in")
+    ) -> Exposure:
+        """
+        Breadth-first search from a node for sanctioned nodes, hop by hop.
+
+        Each hop expands the whole frontier at once in numpy. Nodes with
+        more than ``hub_degree`` edges in a direction (exchanges, bridges)
+        are reached but not expanded, unless they are the start: funds
+        passing through a hub do not taint its other counterparties. No
+        more than ``max_edges`` edges are scanned in total; a search cut
+        short by the budget is reported ``truncated``.
+        """
+        visited = np.array([node], dtype=np.int64)
+        frontier = visited
+        by_hop = []
+        scanned = 0
+        truncated = False
+
+        for hop in range(1, max_depth + 1):
+            reached = []
+            for direction in directions:
+                neighbors, cut = self._neighbors(
+                    frontier, direction, None if hop == 1 else hub_degree, max_edges - scanned
+                )
+                scanned += len(neighbors)
+                truncated = truncated or cut
+                reached.append(neighbors)
+
+            new = np.setdiff1d(np.unique(np.concatenate(reached)), visited, assume_unique=True)
+            by_hop.append(int(np.isin(new, sanctioned, assume_unique=True).sum()))
+            visited = np.union1d(visited, new)
+            frontier = new
+            if truncated or len(frontier) == 0:
+                break
+
+        return Exposure(
+            sanctioned_by_hop=by_hop,
+            nodes_visited=len(visited) - 1,
+            edges_scanned=scanned,
+            truncated=truncated
+        )
+
+
+class GraphStore:
+    """
+    Published transaction graphs, one per chain, under ``graph_dir``.
+
+    A chain's current version is opened on first use and reopened when
+    its ``CURRENT`` file changes.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or get_settings().graph_dir
+        self._graphs: dict[BlockchainType, tuple[int, Optional[TransactionGraph]]] = {}
+
+    def _current_file(self, blockchain: BlockchainType) -> str:
+        return os.path.join(self.root, blockchain.value, "CURRENT")
+
+    def get(self, blockchain: BlockchainType) -> Optional[TransactionGraph]:
+        """The chain's published graph (None if none was ingested)."""
+        current = self._current_file(blockchain)
+        try:
+            mtime = os.stat(current).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached = self._graphs.get(blockchain)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        graph = None
+        try:
+            with open(current) as f:
+                version = f.read().strip()
+            graph = TransactionGraph(os.path.join(self.root, blockchain.value, version))
+            logger.info(
+                "Transaction graph opened",
+                blockchain=blockchain.value,
+                version=graph.version,
+                nodes=len(graph),
+                edges=graph.meta["edges"]
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("Failed to open transaction graph", blockchain=blockchain.value, error=str(e))
+        self._graphs[blockchain] = (mtime, graph)
+        return graph
+
+
+_store: Optional[GraphStore] = None
+
+
+def get_graph_store() -> GraphStore:
+    """Get the process-wide graph store."""
+    global _store
+    if _store is None:
+        _store = GraphStore()
+    return _store
+
+
+def _read_edge_chunks(
+    path: str,
+    from_column: str,
+    to_column: str
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """``(from, to)`` address arrays of an edge list, chunk by chunk."""
+    if path.endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet edge lists require pyarrow (pip install pyarrow)")
+
+        parquet = pq.ParquetFile(path)
+        columns = {name.lower(): name for name in parquet.schema_arrow.names}
+        names = [columns[from_column.lower()], columns[to_column.lower()]]
+        for batch in parquet.iter_batches(batch_size=_INGEST_CHUNK_ROWS, columns=names):
+            yield (
+                batch.column(0).to_numpy(zero_copy_only=False),
+                batch.column(1).to_numpy(zero_copy_only=False)
+            )
+        return
+
+    header = pd.read_csv(path, nrows=0).columns
+    columns = {name.strip().lower(): name for name in header}
+    names = [columns[from_column.lower()], columns[to_column.lower()]]
+    for chunk in pd.read_csv(path, usecols=names, dtype=str, chunksize=_INGEST_CHUNK_ROWS):
+        chunk = chunk.dropna()
+        yield chunk[names[0]].to_numpy(), chunk[names[1]].to_numpy()
+
+
+def _digests(addresses: np.ndarray, blockchain: BlockchainType) -> np.ndarray:
+    """Digests of a chunk's addresses, hashing each distinct address once."""
+    codes, uniques = pd.factorize(addresses)
+    table = np.array(
+        [address_digest(str(address), blockchain) for address in uniques],
+        dtype=f"S{DIGEST_SIZE}"
+    )
+    return table[codes]
+
+
+def _csr(heads: np.ndarray, tails: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """``indptr`` and ``indices`` of edges ``heads -> tails`` over ``count`` nodes."""
+    order = np.argsort(heads, kind="stable")
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=count), out=indptr[1:])
+    return indptr, tails[order]
+
+
+def build_graph(
+    paths: list[str],
+    blockchain: BlockchainType,
+    root: Optional[str] = None,
+    from_column: str = "from",
+    to_column: str = "to"
+) -> dict:
+    """
+    Build a chain's graph from edge lists and publish it.
+
+    Every distinct address becomes a node and every distinct
+    ``(from, to)`` pair an edge (repeated transfers collapse into one;
+    self-transfers are dropped). The build holds the edge list in memory
+    as digests, about 40 bytes per edge; queries afterwards only map it.
+
+    Returns the published graph's metadata.
+    """
+    start_time = time.perf_counter()
+    root = root or get_settings().graph_dir
+
+    sources, targets = [], []
+    rows = 0
+    for path in paths:
+        for from_addresses, to_addresses in _read_edge_chunks(path, from_column, to_column):
+            sources.append(_digests(from_addresses, blockchain))
+            targets.append(_digests(to_addresses, blockchain))
+            rows += len(from_addresses)
+    dtype = f"S{DIGEST_SIZE}"
+    sources = np.concatenate(sources) if sources else np.empty(0, dtype=dtype)
+    targets = np.concatenate(targets) if targets else np.empty(0, dtype=dtype)
+
+    nodes = np.unique(np.concatenate([sources, targets]))
+    index_dtype = np.int32 if len(nodes) < 2**31 else np.int64
+    heads = np.searchsorted(nodes, sources).astype(np.int64)
+    tails = np.searchsorted(nodes, targets).astype(np.int64)
+    del sources, targets
+
+    # Distinct directed edges, self-transfers dropped
+    distinct = heads != tails
+    pairs = np.unique(heads[distinct] * len(nodes) + tails[distinct])
+    heads, tails = np.divmod(pairs, len(nodes))
+    del pairs, distinct
+
+    out_indptr, out_indices = _csr(heads, tails.astype(index_dtype), len(nodes))
+    in_indptr, in_indices = _csr(tails, heads.astype(index_dtype), len(nodes))
+
+    version = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    chain_dir = os.path.join(root, blockchain.value)
+    path = os.path.join(chain_dir, version)
+    os.makedirs(path)
+    arrays = {
+        "nodes": nodes,
+        "out_indptr": out_indptr,
+        "out_indices": out_indices,
+        "in_indptr": in_indptr,
+        "in_indices": in_indices,
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+
+    meta = {
+        "version": version,
+        "blockchain": blockchain.value,
+        "nodes": len(nodes),
+        "edges": len(heads),
+        "rows": rows,
+        "sources": [os.path.basename(p) for p in paths],
+        "built_at": datetime.utcnow().isoformat(),
+    }
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    # Publish: readers follow CURRENT on their next query
+    current = os.path.join(chain_dir, "CURRENT")
+    with open(f"{current}.tmp", "w") as f:
+        f.write(version)
+    os.replace(f"{current}.tmp", current)
+
+    logger.info(
+        "Transaction graph built",
+        blockchain=blockchain.value,
+        version=version,
+        nodes=meta["nodes"],
+        edges=meta["edges"],
+        elapsed_s=round(time.perf_counter() - start_time, 1)
+    )
+    return meta
@@ -0,0 +1,435 @@
+"""In-memory sanctions index snapshots."""
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from functools import cached_property
+from hashlib import blake2b
+import json
+from typing import Iterable, Iterator, Optional
+
+from ..models import BlockchainType
+from .bloom import BloomFilter
+from .canonical import EVM_CHAINS, canonical_key, chain_family, normalize_address
+from .names import NameIndex
+from .search import TrigramIndex
+from .snapshot import MappedSnapshot
+
+
+# Target false-positive rate of each generation's Bloom filter
+BLOOM_ERROR_RATE = 0.001
+
+# Record fields that do not make an entry "changed" between two lists
+_VOLATILE_FIELDS = frozenset({"address", "designation_date"})
+
+
+# Records listing one address, at most one per source
+Entries = tuple[dict, ...]
+
+
+def _empty_partitions() -> dict[BlockchainType, dict[bytes, Entries]]:
+    """One address table per chain, with the EVM chains sharing a table."""
+    evm: dict[bytes, Entries] = {}
+    return {
+        chain: evm if chain in EVM_CHAINS else {}
+        for chain in BlockchainType
+    }
+
+
+def _build_partitions(
+    records: Iterable[tuple[str, dict]]
+) -> dict[BlockchainType, dict[bytes, Entries]]:
+    """
+    Tables from ``(address, record)`` pairs, skipping unknown chains.
+
+    The record's ``address`` is set to the address's display form.
+    """
+    partitions = _empty_partitions()
+
+    for address, record in records:
+        try:
+            chain = BlockchainType(record.get("blockchain"))
+        except ValueError:
+            continue
+        record["address"] = normalize_address(address, chain)
+        table, key = partitions[chain], canonical_key(address, chain)
+        table[key] = _with(table.get(key, ()), record)
+
+    return partitions
+
+
+def _copy_partitions(
+    partitions: dict[BlockchainType, dict[bytes, Entries]]
+) -> dict[BlockchainType, dict[bytes, Entries]]:
+    """Shallow copy of the tables, keeping shared tables shared."""
+    copies: dict[int, dict[bytes, Entries]] = {}
+    return {
+        chain: copies.setdefault(id(table), dict(table))
+        for chain, table in partitions.items()
+    }
+
+
+def _bloom_for(
+    partitions: dict[BlockchainType, dict[bytes, Entries]],
+    generation: int
+) -> BloomFilter:
+    """Bloom filter over every key of the tables."""
+    tables = list({id(table): table for table in partitions.values()}.values())
+    return BloomFilter.from_keys(
+        (key for table in tables for key in table),
+        capacity=sum(len(table) for table in tables),
+        error_rate=BLOOM_ERROR_RATE,
+        generation=generation
+    )
+
+
+def _units(partitions: dict[BlockchainType, dict[bytes, Entries]]) -> list[Entries]:
+    """The entries of every table, one item per listed address."""
+    tables = {id(table): table for table in partitions.values()}.values()
+    return [entries for table in tables for entries in table.values()]
+
+
+def _content_digest(units: Iterable[Entries]) -> str:
+    """
+    Order-independent digest of every record: the sum of per-record
+    hashes, so the same lists hash alike however they were loaded.
+
+    A record is hashed as its address and fingerprint: fields that only
+    record when a node fetched the entry (``designation_date``) would
+    otherwise set apart nodes that loaded the same lists separately.
+    """
+    total = 0
+    for entries in units:
+        for record in entries:
+            blob = json.dumps([record.get("address", ""), _fingerprint(record)]).encode()
+            total += int.from_bytes(blake2b(blob, digest_size=16).digest(), "little")
+    return f"{total % (1 << 128):032x}"
+
+
+def _with(entries: Entries, record: dict) -> Entries:
+    """Entries with ``record`` replacing any record of the same source."""
+    if not entries:
+        return (record,)
+    return tuple(e for e in entries if e.get("source") != record.get("source")) + (record,)
+
+
+def _without(entries: Entries, source: str) -> Entries:
+    """Entries without the record of ``source``."""
+    return tuple(e for e in entries if e.get("source") != source)
+
+
+def _fingerprint(record: dict) -> str:
+    """Comparable form of a record, ignoring fields that churn every fetch."""
+    return json.dumps(
+        {k: v for k, v in record.items() if k not in _VOLATILE_FIELDS},
+        sort_keys=True,
+        default=str
+    )
+
+
+@dataclass
+class IndexDiff:
+    """Per-entry changes of one source between the index and a fresh fetch."""
+    source: str
+    added: list[dict] = field(default_factory=list)
+    removed: list[dict] = field(default_factory=list)
+    changed: list[dict] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> dict:
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+        }
+
+
+@dataclass(frozen=True)
+class SanctionsIndex:
+    """
+    Immutable, chain-partitioned snapshot of the sanctions lists.
+
+    A refresh builds a new index off to the side and publishes it with a
+    single reference swap, so readers never observe a half-built list.
+    Each request keeps a reference to the index it started with; the
+    previous generation is released once the last such request finishes.
+
+    Tables are keyed on canonical address bytes (see ``canonical``), so a
+    lookup is a single dict probe on a short key in the partition for
+    the requested chain. Sources are merged: a key maps to the records of
+    every source listing the address. A Bloom filter over every key is built with the
+    tables and published in the same swap, so its generation always
+    matches the snapshot it describes. So are the trigram index used by
+    search and the name index used by fuzzy name matching, except on a
+    warm start from a snapshot, where they are left out (None) so the
+    index can serve screens at once, and are added to the same
+    generation by ``with_search_indexes``.
+
+    An index may instead be backed by a memory-mapped snapshot file
+    shared with other workers; lookups then binary-search the mapping,
+    with the Bloom filter turning away clean addresses first.
+
+    Generations are counted by each refresher on its own, so anything
+    shared between processes (caches, risk assessments) is keyed on
+    ``digest`` instead, which identifies the lists by their content.
+    """
+    generation: int = 0
+    partitions: dict[BlockchainType, dict[bytes, Entries]] = field(default_factory=_empty_partitions)
+    built_at: Optional[datetime] = None
+    bloom: BloomFilter = field(default_factory=lambda: BloomFilter.for_capacity(0))
+    snapshot: Optional[MappedSnapshot] = None
+    search: Optional[TrigramIndex] = field(default_factory=lambda: TrigramIndex.build([]))
+    names: Optional[NameIndex] = field(default_factory=lambda: NameIndex.build([]))
+
+    # Per-source fetch state (e.g. HTTP validators), carried across generations
+    sources: dict[str, dict] = field(default_factory=dict)
+
+    # Digest of every record (see ``_content_digest``)
+    content_digest: str = ""
+
+    # The demo addresses served before any list is loaded: never cached
+    seed: bool = False
+
+    @classmethod
+    def build(
+        cls,
+        records: Iterable[tuple[str, dict]],
+        generation: int = 0,
+        built_at: Optional[datetime] = None,
+        sources: Optional[dict[str, dict]] = None,
+        seed: bool = False
+    ) -> "SanctionsIndex":
+        """
+        Build an index from ``(address, record)`` pairs.
+
+        Each record must carry a ``blockchain`` value naming the chain
+        the address belongs to; records for unknown chains are skipped.
+        The record's ``address`` is set to the address's display form.
+        """
+        partitions = _build_partitions(records)
+        units = _units(partitions)
+
+        return cls(
+            generation=generation,
+            partitions=partitions,
+            built_at=built_at,
+            bloom=_bloom_for(partitions, generation),
+            search=TrigramIndex.build(units),
+            names=NameIndex.build(units),
+            sources=dict(sources or {}),
+            content_digest=_content_digest(units),
+            seed=seed
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: MappedSnapshot, search_indexes: bool = True) -> "SanctionsIndex":
+        """
+        Index served straight from a mapped snapshot file.
+
+        Building the search indexes decodes every record; without
+        ``search_indexes`` mapping is near-instant whatever the list size.
+        """
+        index = cls(
+            generation=snapshot.generation,
+            built_at=snapshot.built_at,
+            bloom=snapshot.bloom,
+            snapshot=snapshot,
+            search=None,
+            names=None,
+            sources=snapshot.sources,
+            content_digest=snapshot.content_digest
+        )
+        return index.with_search_indexes() if search_indexes else index
+
+    def with_search_indexes(self) -> "SanctionsIndex":
+        """This generation with its trigram and name indexes built."""
+        if self.search is not None and self.names is not None:
+            return self
+        units = self.snapshot if self.snapshot is not None else _units(self.partitions)
+        return replace(self, search=TrigramIndex.build(units), names=NameIndex.build(units))
+
+    @staticmethod
+    def _entry_key(record: dict) -> tuple[str, bytes]:
+        """Identity of a record: its address family and canonical key."""
+        chain = BlockchainType(record["blockchain"])
+        return chain_family(chain), canonical_key(record["address"], chain)
+
+    def diff(self, source: str, records: Iterable[tuple[str, dict]]) -> IndexDiff:
+        """
+        Compare a fresh fetch of one source against this index.
+
+        Unchanged entries are not reported; changed entries keep the
+        first-seen ``designation_date`` of the record they replace.
+        """
+        current = {
+            self._entry_key(record): record
+            for record in self.records()
+            if record.get("source") == source
+        }
+
+        diff = IndexDiff(source=source)
+        seen = set()
+
+        for address, record in records:
+            try:
+                chain = BlockchainType(record.get("blockchain"))
+            except ValueError:
+                continue
+            record["address"] = normalize_address(address, chain)
+
+            entry_key = self._entry_key(record)
+            seen.add(entry_key)
+            previous = current.get(entry_key)
+
+            if previous is None:
+                diff.added.append(record)
+            elif _fingerprint(previous) != _fingerprint(record):
+                record["designation_date"] = previous.get("designation_date", record.get("designation_date"))
+                diff.changed.append(record)
+
+        diff.removed = [
+            record for entry_key, record in current.items()
+            if entry_key not in seen
+        ]
+        return diff
+
+    def apply(
+        self,
+        diff: IndexDiff,
+        generation: int,
+        built_at: Optional[datetime] = None,
+        sources: Optional[dict[str, dict]] = None
+    ) -> "SanctionsIndex":
+        """
+        Next generation with ``diff`` applied.
+
+        Tables are copied (a C-level dict copy) and only the diff's
+        entries are touched. The Bloom filter is extended in place when
+        nothing was removed and it is still within twice its target
+        false-positive rate, and rebuilt otherwise; the search and name
+        indexes are always rebuilt.
+        """
+        sources = dict(self.sources if sources is None else sources)
+
+        if self.snapshot is not None:
+            # Mapped snapshots are read-only: materialize, then apply
+            base = SanctionsIndex(
+                generation=self.generation,
+                partitions=_build_partitions((record["address"], record) for record in self.records()),
+                bloom=self.bloom
+            )
+            return base.apply(diff, generation, built_at, sources)
+
+        partitions = _copy_partitions(self.partitions)
+
+        for record in diff.removed:
+            chain = BlockchainType(record["blockchain"])
+            table, key = partitions[chain], canonical_key(record["address"], chain)
+            entries = _without(table.get(key, ()), diff.source)
+            if entries:
+                table[key] = entries
+            else:
+                table.pop(key, None)
+
+        bloom = self.bloom.copy(generation)
+
+        for record in diff.added + diff.changed:
+            chain = BlockchainType(record["blockchain"])
+            table, key = partitions[chain], canonical_key(record["address"], chain)
+            if key not in table:
+                bloom.add(key)
+            table[key] = _with(table.get(key, ()), record)
+
+        if diff.removed or bloom.false_positive_rate > 2 * BLOOM_ERROR_RATE:
+            bloom = _bloom_for(partitions, generation)
+
+        units = _units(partitions)
+
+        return SanctionsIndex(
+            generation=generation,
+            partitions=partitions,
+            built_at=built_at,
+            bloom=bloom,
+            search=TrigramIndex.build(units),
+            names=NameIndex.build(units),
+            sources=sources,
+            content_digest=_content_digest(units)
+        )
+
+    @cached_property
+    def digest(self) -> str:
+        """
+        Identity of the lists' content: the records and the sources
+        checked. Equal digests answer every screen alike, whichever
+        process or node built them.
+        """
+        blob = json.dumps([self.content_digest, sorted(self.sources)]).encode()
+        return blake2b(blob, digest_size=16).hexdigest()
+
+    def might_contain(self, key: bytes) -> bool:
+        """
+        False proves the key is not listed on any chain or source.
+
+        Only worth calling in front of lookups costlier than a dict probe
+        (about 1 µs per call against ~50 ns for the in-memory tables).
+        """
+        return key in self.bloom
+
+    def lookup(self, key: bytes, blockchain: BlockchainType) -> Entries:
+        """Records of every source listing a canonical key (empty if clean)."""
+        if self.snapshot is None:
+            return self.partitions[blockchain].get(key, ())
+
+        # A binary search over the mapping costs more than a Bloom probe
+        if key not in self.bloom:
+            return ()
+        return self.snapshot.lookup(blockchain, key)
+
+    def lookup_many(
+        self,
+        items: Iterable[tuple[bytes, BlockchainType]]
+    ) -> dict[tuple[bytes, BlockchainType], Entries]:
+        """
+        Records of the listed ``(key, chain)`` pairs of a batch; clean
+        pairs are left out.
+
+        Membership is tested per table in one C-level pass over the
+        batch's distinct keys; only hits are looked up for records.
+        """
+        by_chain: dict[BlockchainType, set[bytes]] = {}
+        for key, chain in items:
+            by_chain.setdefault(chain, set()).add(key)
+
+        listed = {}
+        for chain, keys in by_chain.items():
+            if self.snapshot is None:
+                table = self.partitions[chain]
+                for key in filter(table.__contains__, keys):
+                    listed[(key, chain)] = table[key]
+            else:
+                for key in filter(self.bloom.__contains__, keys):
+                    entries = self.snapshot.lookup(chain, key)
+                    if entries:
+                        listed[(key, chain)] = entries
+        return listed
+
+    def records(self) -> Iterator[dict]:
+        """Iterate over every record exactly once."""
+        if self.snapshot is not None:
+            yield from self.snapshot.records()
+            return
+
+        for table in self._tables():
+            for entries in table.values():
+                yield from entries
+
+    def _tables(self) -> list[dict[bytes, Entries]]:
+        """Distinct partition tables (shared EVM table counted once)."""
+        return list({id(table): table for table in self.partitions.values()}.values())
+
+    def __len__(self) -> int:
+        """Number of distinct listed addresses."""
+        if self.snapshot is not None:
+            return len(self.snapshot)
+        return sum(len(table) for table in self._tables())
@@ -0,0 +1,486 @@
+"""Bulk screening jobs: uploaded address files screened in the background.
+
+An upload is written to disk as it arrives and split into chunks of
+lines (byte ranges of the file). Chunks are screened in a process pool;
+each pool process maps the shared sanctions snapshot, so it screens
+against the same index as the API workers without rebuilding it. Every
+finished chunk writes its results file and checkpoints the job, so a
+job interrupted by a restart resumes from its first unfinished chunk.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import csv
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import fcntl
+import json
+import multiprocessing
+import os
+import time
+from typing import AsyncIterator, Iterator, Optional
+import uuid
+
+import orjson
+import structlog
+
+from ..config import Settings
+from ..models import BlockchainType
+
+logger = structlog.get_logger()
+
+JOB_FORMATS = ("csv", "ndjson")
+
+
+def _parse_lines(
+    lines: list[bytes],
+    first_line: int,
+    header: Optional[list[str]] = None
+) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """``(line number, item, error)`` for each non-blank NDJSON or CSV line."""
+    for line_no, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            if header is None:
+                item = orjson.loads(line)
+            else:
+                values = next(csv.reader([line.decode()]))
+                item = dict(zip(header, (value.strip() for value in values)))
+            address = item["address"]
+            if not isinstance(address, str):
+                raise TypeError("address must be a string")
+            blockchain = BlockchainType(item.get("blockchain") or "ethereum")
+        except (ValueError, TypeError, KeyError, AttributeError, StopIteration) as e:
+            yield line_no, None, f"Invalid request line: {e!r}"
+            continue
+        yield line_no, {"address": address, "blockchain": blockchain.value}, None
+
+
+async def screen_lines(
+    screener,
+    lines: list[bytes],
+    first_line: int,
+    header: Optional[list[str]] = None
+) -> tuple[bytes, dict[str, int]]:
+    """
+    Screen a chunk of NDJSON (or, with a CSV ``header``, CSV) request lines.
+
+    Returns NDJSON results in line order, each tagged with its 1-based
+    ``line`` number (malformed lines get an ``error``; blank lines are
+    skipped), and counts of screened, sanctioned, malformed and blank lines.
+    """
+    output: list[dict] = []
+    items = []
+    positions = []
+
+    for line_no, item, error in _parse_lines(lines, first_line, header):
+        if error is not None:
+            output.append({"line": line_no, "error": error})
+            continue
+        positions.append(len(output))
+        output.append({"line": line_no})
+        items.append(item)
+
+    sanctioned = 0
+    if items:
+        for position, result in zip(positions, await screener.batch_screen(items)):
+            sanctioned += result.is_sanctioned
+            output[position].update(
+                address=result.address,
+                blockchain=result.blockchain.value,
+                is_sanctioned=result.is_sanctioned,
+                risk_level=result.risk_level.value,
+                risk_score=result.risk_score,
+                generation=result.generation
+            )
+
+    counts = {
+        "screened": len(items),
+        "sanctioned": sanctioned,
+        "errors": len(output) - len(items),
+        "blank": len(lines) - len(output),
+    }
+    payload = b"".join([orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in output])
+    return payload, counts
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_lines(job_dir: str, start: int, end: int) -> list[bytes]:
+    """Lines of a job's input between two line-boundary offsets."""
+    with open(os.path.join(job_dir, "input"), "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = data.split(b"\n")
+    if data.endswith(b"\n"):
+        lines.pop()
+    return lines
+
+
+def _results_path(job_dir: str, chunk: int) -> str:
+    return os.path.join(job_dir, "results", f"{chunk:06d}.ndjson")
+
+
+# ============ Pool processes ============
+
+# Pool processes are spawned, not forked: a forked child would inherit the
+# API worker's screener singleton with its Redis and HTTP clients bound to
+# the parent's event loop. Each spawned process builds its own screener
+# over the mapped snapshot, and the loop it runs on.
+_POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _screen_chunk(
+    job_dir: str,
+    chunk: int,
+    start: int,
+    end: int,
+    first_line: int,
+    header: Optional[list[str]]
+) -> dict[str, int]:
+    """Screen one chunk of a job's input into its results file (runs in the pool)."""
+    global _worker_loop
+    from .screening import get_screener
+
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+
+    screener = get_screener()
+    # Cheap when already mapped; picks up generations published since
+    screener.load_snapshot(search_indexes=False)
+
+    lines = _read_lines(job_dir, start, end)
+    payload, counts = _worker_loop.run_until_complete(screen_lines(screener, lines, first_line, header))
+    _write_atomic(_results_path(job_dir, chunk), payload)
+    counts["generation"] = screener.index.generation
+    return counts
+
+
+# ============ Jobs ============
+
+@dataclass
+class ScreeningJob:
+    """State of a bulk screening job, checkpointed to ``job.json``."""
+    id: str
+    format: str
+    status: str = "uploading"  # uploading, queued, running, completed, failed
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    # CSV column names; None for NDJSON
+    header: Optional[list[str]] = None
+
+    # Chunk i covers input bytes offsets[i]:offsets[i + 1], from line first_lines[i]
+    offsets: list[int] = field(default_factory=list)
+    first_lines: list[int] = field(default_factory=list)
+    chunks_done: list[bool] = field(default_factory=list)
+
+    total_lines: int = 0
+    screened: int = 0
+    sanctioned: int = 0
+    errors: int = 0
+    blank: int = 0
+    generations: list[int] = field(default_factory=list)
+
+    # Processing time across runs (a resumed job keeps its earlier time)
+    processing_seconds: float = 0.0
+
+    @property
+    def chunks(self) -> int:
+        return len(self.chunks_done)
+
+    def progress(self) -> dict:
+        """Public status of the job."""
+        done = sum(self.chunks_done)
+        processed = self.screened + self.errors + self.blank
+        rate = self.screened / self.processing_seconds if self.processing_seconds else 0.0
+        remaining = self.total_lines - processed
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "format": self.format,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "total_lines": self.total_lines,
+            "processed_lines": processed,
+            "screened": self.screened,
+            "sanctioned": self.sanctioned,
+            "errors": self.errors,
+            "chunks_done": done,
+            "chunks_total": self.chunks,
+            "percent": round(100.0 * done / self.chunks, 1) if self.chunks else 0.0,
+            "addresses_per_second": round(rate, 1),
+            "eta_seconds": round(remaining / rate, 1) if rate and self.status == "running" else None,
+            "generations": self.generations,
+        }
+
+
+class JobManager:
+    """
+    Creates, runs, checkpoints and resumes bulk screening jobs.
+
+    Job state lives on disk under ``screening_jobs_dir``, so every API
+    worker can report on and serve results of any job. The worker running
+    a job holds a lock on its directory; on startup, jobs that are
+    unfinished and unlocked (their worker died) are resumed.
+    """
+
+    def __init__(self, settings: Settings, screener):
+        self.settings = settings
+        self.screener = screener
+        self.root = settings.screening_jobs_dir
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def _dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def load(self, job_id: str) -> Optional[ScreeningJob]:
+        """A job's last checkpoint, or None if there is no such job."""
+        try:
+            uuid.UUID(job_id)
+            with open(os.path.join(self._dir(job_id), "job.json"), "rb") as f:
+                return ScreeningJob(**json.loads(f.read()))
+        except (ValueError, FileNotFoundError):
+            return None
+
+    def _save(self, job: ScreeningJob):
+        _write_atomic(os.path.join(self._dir(job.id), "job.json"), json.dumps(asdict(job)).encode())
+
+    async def create(self, body: AsyncIterator[bytes], format: str) -> ScreeningJob:
+        """
+        Write an uploaded file to disk as it arrives, splitting it into
+        chunks of lines, and start screening it.
+
+        If the upload breaks off (e.g. the client disconnects), the job is
+        marked failed, its partial input is removed, and the error is raised.
+        """
+        job = ScreeningJob(id=str(uuid.uuid4()), format=format)
+        job_dir = self._dir(job.id)
+        os.makedirs(os.path.join(job_dir, "results"))
+        self._save(job)
+
+        chunk_size = self.settings.screening_job_chunk_size
+        csv_header = format == "csv"
+        header_line = b""
+        position = 0        # bytes written
+        line_start = 0      # offset of the line being read
+        lines = 0           # complete lines read, header included
+        in_chunk = 0        # data lines in the current chunk
+
+        if not csv_header:
+            job.offsets.append(0)
+            job.first_lines.append(1)
+
+        input_path = os.path.join(job_dir, "input")
+        try:
+            with open(input_path, "wb") as f:
+                async for piece in body:
+                    f.write(piece)
+                    newline = piece.find(b"\n")
+                    while newline >= 0:
+                        line_end = position + newline + 1
+                        lines += 1
+                        if csv_header:
+                            # The header ends; data starts on line 2
+                            header_line += piece[:newline]
+                            csv_header = False
+                            job.offsets.append(line_end)
+                            job.first_lines.append(2)
+                        else:
+                            in_chunk += 1
+                            if in_chunk == chunk_size:
+                                job.offsets.append(line_end)
+                                job.first_lines.append(lines + 1)
+                                in_chunk = 0
+                        line_start = line_end
+                        newline = piece.find(b"\n", newline + 1)
+                    if csv_header:
+                        header_line += piece
+                    position += len(piece)
+        except BaseException as e:  # client disconnects, cancellation, disk errors
+            job.status = "failed"
+            job.error = f"Upload failed: {e!r}"
+            job.finished_at = datetime.utcnow().isoformat()
+            self._save(job)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(input_path)
+            logger.warning(f"Screening job upload failed: {e!r}", job_id=job.id, bytes_received=position)
+            raise
+
+        # A last line without a trailing newline
+        trailing = position > line_start
+        if format == "csv":
+            job.header = [name.strip().lower() for name in next(csv.reader([header_line.decode()]), [])]
+            data_lines = lines - 1 + trailing if not csv_header else 0
+            if csv_header:
+                # Empty, or a header without a newline: no data
+                job.offsets.append(position)
+                job.first_lines.append(2)
+        else:
+            data_lines = lines + trailing
+
+        # Close the last chunk at the end of the file, unless it is empty
+        if job.offsets[-1] < position:
+            job.offsets.append(position)
+        else:
+            job.first_lines.pop()
+        job.total_lines = data_lines
+        job.chunks_done = [False] * (len(job.offsets) - 1)
+        job.status = "queued"
+        self._save(job)
+
+        self.start(job)
+        return job
+
+    def start(self, job: ScreeningJob):
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+
+    async def resume(self):
+        """Restart unfinished jobs no other worker is running."""
+        if not os.path.isdir(self.root):
+            return
+        for job_id in os.listdir(self.root):
+            job = self.load(job_id)
+            if job is not None and job.status in ("queued", "running"):
+                self.start(job)
+
+    def _lock(self, job: ScreeningJob):
+        lock_file = open(os.path.join(self._dir(job.id), "lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.settings.screening_job_workers,
+                mp_context=_POOL_CONTEXT
+            )
+        return self._executor
+
+    async def _run(self, job: ScreeningJob):
+        lock_file = self._lock(job)
+        if lock_file is None:
+            return
+
+        try:
+            # Re-read under the lock: another worker may have finished it
+            job = self.load(job.id)
+            if job.status not in ("queued", "running"):
+                return
+
+            job.status = "running"
+            job.started_at = job.started_at or datetime.utcnow().isoformat()
+            self._save(job)
+            logger.info("Screening job started", job_id=job.id, lines=job.total_lines, chunks=job.chunks)
+
+            await self._process(job)
+
+            job.status = "completed"
+            job.finished_at = datetime.utcnow().isoformat()
+            self._save(job)
+            logger.info("Screening job completed", **{
+                key: value for key, value in job.progress().items()
+                if key in ("job_id", "screened", "sanctioned", "errors", "addresses_per_second")
+            })
+        except asyncio.CancelledError:
+            # Shutdown: the checkpoint stays running, resumed on next start
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = repr(e)
+            job.finished_at = datetime.utcnow().isoformat()
+            self._save(job)
+            logger.error(f"Screening job failed: {e!r}", job_id=job.id)
+        finally:
+            lock_file.close()
+            self._tasks.pop(job.id, None)
+
+    async def _process(self, job: ScreeningJob):
+        """Screen the unfinished chunks, at most one per pool process at a time."""
+        job_dir = self._dir(job.id)
+        pending = [chunk for chunk, done in enumerate(job.chunks_done) if not done]
+
+        # Pool processes map the shared snapshot; without one, only this
+        # process's index is current, so screen here between requests
+        use_pool = os.path.exists(self.settings.sanctions_snapshot_path)
+        loop = asyncio.get_running_loop()
+
+        async def run_chunk(chunk: int) -> dict[str, int]:
+            start, end = job.offsets[chunk], job.offsets[chunk + 1]
+            if use_pool:
+                return await loop.run_in_executor(
+                    self._pool(), _screen_chunk,
+                    job_dir, chunk, start, end, job.first_lines[chunk], job.header
+                )
+            lines = await asyncio.to_thread(_read_lines, job_dir, start, end)
+            payload, counts = await screen_lines(self.screener, lines, job.first_lines[chunk], job.header)
+            await asyncio.to_thread(_write_atomic, _results_path(job_dir, chunk), payload)
+            counts["generation"] = self.screener.index.generation
+            return counts
+
+        in_flight: dict[asyncio.Future, int] = {}
+        limit = self.settings.screening_job_workers if use_pool else 1
+        started = time.perf_counter()
+
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < limit:
+                    chunk = pending.pop(0)
+                    in_flight[asyncio.ensure_future(run_chunk(chunk))] = chunk
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                now = time.perf_counter()
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    counts = future.result()
+
+                    # Checkpoint: this chunk's results are on disk
+                    job.chunks_done[chunk] = True
+                    job.screened += counts["screened"]
+                    job.sanctioned += counts["sanctioned"]
+                    job.errors += counts["errors"]
+                    job.blank += counts["blank"]
+                    if counts["generation"] not in job.generations:
+                        job.generations.append(counts["generation"])
+                job.processing_seconds += now - started
+                started = now
+                self._save(job)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def results(self, job: ScreeningJob) -> Iterator[bytes]:
+        """Results of the job's finished chunks, in line order, up to the first unfinished one."""
+        for chunk, done in enumerate(job.chunks_done):
+            if not done:
+                return
+            with open(_results_path(self._dir(job.id), chunk), "rb") as f:
+                while True:
+                    data = f.read(1 << 16)
+                    if not data:
+                        break
+                    yield data
+
+    async def close(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,172 @@
+"""Streaming parsers for the EU, UK HMT and UN consolidated lists.
+
+Unlike the SDN list, these lists have no dedicated identifier type for
+crypto addresses; where one is published it appears in free-text fields
+(e.g. the UK list's "Other Information"). Every text and attribute of an
+entry is therefore scanned for strings that decode as an address of a
+supported chain.
+"""
+
+from datetime import datetime
+import re
+from typing import Callable, Iterator, Optional
+import xml.etree.ElementTree as ET
+
+from .canonical import detect_chain
+from .sdn import _child_text, _children, _local
+
+
+# Candidate addresses; detect_chain() verifies checksums and length
+_ADDRESS_PATTERN = re.compile(
+    r"(?<![0-9A-Za-z])("
+    r"0x[0-9a-fA-F]{40}"
+    r"|(?:bc1|tb1|BC1|TB1)[0-9A-Za-z]{6,87}"
+    r"|[13T][1-9A-HJ-NP-Za-km-z]{25,34}"
+    r")(?![0-9A-Za-z])"
+)
+
+
+def _entry_text(entry: ET.Element) -> Iterator[str]:
+    """Every text node and attribute value of an entry."""
+    for elem in entry.iter():
+        yield from elem.attrib.values()
+        if elem.text:
+            yield elem.text
+        if elem.tail:
+            yield elem.tail
+
+
+def _join(*parts: str) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def describe_eu_entry(entry: ET.Element) -> dict:
+    """Record fields of an EU ``sanctionEntity``."""
+    names = [alias.get("wholeName") for alias in _children(entry, "nameAlias") if alias.get("wholeName")]
+    programmes = sorted({
+        regulation.get("programme")
+        for regulation in _children(entry, "regulation")
+        if regulation.get("programme")
+    })
+    subject = next(_children(entry, "subjectType"), None)
+
+    return {
+        "sdn_id": entry.get("logicalId", ""),
+        "entity_name": names[0] if names else "",
+        "aliases": names[1:],
+        "entity_type": subject.get("code", "") if subject is not None else "",
+        "program": ", ".join(programmes),
+    }
+
+
+def describe_uk_entry(entry: ET.Element) -> dict:
+    """Record fields of a UK HMT ``Designation``."""
+    names = []
+    for name_list in _children(entry, "Names"):
+        for name in _children(name_list, "Name"):
+            full_name = _join(*(_child_text(name, f"Name{i}") for i in range(1, 7)))
+            if _child_text(name, "NameType") == "Primary Name":
+                names.insert(0, full_name)
+            else:
+                names.append(full_name)
+
+    return {
+        "sdn_id": _child_text(entry, "UniqueID"),
+        "entity_name": names[0] if names else "",
+        "aliases": names[1:],
+        "entity_type": _child_text(entry, "IndividualEntityShip"),
+        "program": _child_text(entry, "RegimeName"),
+    }
+
+
+def describe_un_entry(entry: ET.Element) -> dict:
+    """Record fields of a UN ``INDIVIDUAL`` or ``ENTITY``."""
+    return {
+        "sdn_id": _child_text(entry, "REFERENCE_NUMBER") or _child_text(entry, "DATAID"),
+        "entity_name": _join(
+            _child_text(entry, "FIRST_NAME"),
+            _child_text(entry, "SECOND_NAME"),
+            _child_text(entry, "THIRD_NAME"),
+        ),
+        "aliases": [
+            _child_text(alias, "ALIAS_NAME")
+            for tag in ("INDIVIDUAL_ALIAS", "ENTITY_ALIAS")
+            for alias in _children(entry, tag)
+            if _child_text(alias, "ALIAS_NAME")
+        ],
+        "entity_type": "Individual" if _local(entry.tag) == "INDIVIDUAL" else "Entity",
+        "program": _child_text(entry, "UN_LIST_TYPE"),
+    }
+
+
+class ConsolidatedListParser:
+    """
+    Incremental parser for a list of entries scanned for crypto addresses.
+
+    Fed with raw byte chunks like ``SDNStreamParser``; each finished entry
+    is dropped from its parent once extracted, so memory stays flat
+    however deeply the entries are nested.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        entry_tags: frozenset[str],
+        describe: Callable[[ET.Element], dict]
+    ):
+        self.source = source
+        self._entry_tags = entry_tags
+        self._describe = describe
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: list[ET.Element] = []
+        self.entries_seen = 0
+
+    def feed(self, chunk: bytes) -> Iterator[tuple[str, dict]]:
+        """Feed a chunk and yield ``(address, record)`` pairs completed by it."""
+        self._parser.feed(chunk)
+        yield from self._drain()
+
+    def close(self) -> Iterator[tuple[str, dict]]:
+        """Signal end of input and yield any remaining pairs."""
+        self._parser.close()
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[tuple[str, dict]]:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+
+            self._stack.pop()
+            if _local(elem.tag) not in self._entry_tags:
+                continue
+
+            self.entries_seen += 1
+            yield from self._extract(elem)
+
+            parent: Optional[ET.Element] = self._stack[-1] if self._stack else None
+            if parent is not None:
+                parent.remove(elem)
+
+    def _extract(self, entry: ET.Element) -> Iterator[tuple[str, dict]]:
+        """Yield every distinct address mentioned anywhere in an entry."""
+        found: dict[str, str] = {}
+        for text in _entry_text(entry):
+            for match in _ADDRESS_PATTERN.finditer(text):
+                address = match.group(1)
+                if address not in found:
+                    chain = detect_chain(address)
+                    if chain is not None:
+                        found[address] = chain.value
+
+        if not found:
+            return
+
+        fields = self._describe(entry)
+        for address, chain in found.items():
+            yield address, {
+                "source": self.source,
+                "blockchain": chain,
+                **fields,
+                "designation_date": datetime.utcnow().isoformat()
+            }
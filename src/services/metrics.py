@@ -0,0 +1,170 @@
+"""In-process metrics exported in the Prometheus text format (GET /metrics)."""
+
+from bisect import bisect_left
+from time import perf_counter_ns
+from typing import Callable, Optional
+
+# Seconds, from sub-millisecond lookups to multi-minute list downloads
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+# Seconds, for request stages that take microseconds
+STAGE_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001,
+    0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+
+_registry: dict[str, "_Metric"] = {}
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        _registry[name] = self
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, key)} {value}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, set directly or read from a callback."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        callback: Optional[Callable[[], Optional[float]]] = None
+    ):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> list[str]:
+        if self._callback is not None:
+            value = self._callback()
+            return [] if value is None else [f"{self.name} {value}"]
+        return [
+            f"{self.name}{_labels(self.label_names, key)} {value}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket counts (last one is +Inf), sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total[0]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class StageTimer:
+    """
+    Durations of the consecutive stages of one operation, in nanoseconds
+    from the monotonic ``perf_counter_ns`` clock.
+    """
+
+    __slots__ = ("started", "stages", "_last")
+
+    def __init__(self):
+        self.started = self._last = perf_counter_ns()
+        self.stages: dict[str, int] = {}
+
+    def mark(self, stage: str) -> int:
+        """End the stage running since the previous mark; its duration."""
+        now = perf_counter_ns()
+        elapsed = now - self._last
+        self.stages[stage] = self.stages.get(stage, 0) + elapsed
+        self._last = now
+        return elapsed
+
+    def elapsed_ns(self) -> int:
+        """Time since the timer started."""
+        return perf_counter_ns() - self.started
+
+    def observe(self, histogram: Histogram, **labels):
+        """Record every stage in a histogram with a ``stage`` label."""
+        for stage, elapsed in self.stages.items():
+            histogram.observe(elapsed / 1e9, stage=stage, **labels)
+
+
+def render_metrics() -> str:
+    """Every registered metric, in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in _registry.values()) + "\n"
@@ -0,0 +1,249 @@
+"""Fuzzy entity-name matching for sanctions screening.
+
+Names are normalized (Unicode NFKD with accents stripped, case-folded,
+punctuation removed), then blocked: a query is only compared against
+listed names sharing a blocking key with it, either an exact token or a
+token's phonetic code. Candidates are scored with Jaro-Winkler and a
+token-sort ratio, so typos, transliteration variants and reordered
+names ("DOE, John" / "John Doe") still match.
+"""
+
+from collections import Counter
+from difflib import SequenceMatcher
+import re
+from typing import Iterator, Sequence
+import unicodedata
+
+import numpy as np
+
+from .search import _csr
+
+
+# Legal forms and fillers: too common to block on, and they say
+# nothing about identity
+_STOPWORDS = frozenset({
+    "co", "company", "corp", "corporation", "inc", "llc", "ltd", "limited",
+    "group", "gmbh", "sa", "ag", "plc", "the", "of", "and", "al", "el",
+})
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Comparable form of a name: ASCII-folded, lower-case, single-spaced."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", stripped.casefold()).replace("_", " ").split())
+
+
+def soundex(token: str) -> str:
+    """American Soundex code of a token (first letter kept, 3 digits)."""
+    if not token:
+        return ""
+
+    code = token[0]
+    previous = _SOUNDEX_CODES.get(token[0], "")
+    for char in token[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code
+        if char not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def blocking_keys(normalized: str) -> set[str]:
+    """Keys a name is filed under: its significant tokens and their Soundex codes."""
+    keys = set()
+    for token in normalized.split():
+        if len(token) < 2 or token in _STOPWORDS:
+            continue
+        keys.add("t:" + token)
+        keys.add("p:" + soundex(token))
+    return keys
+
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity in [0, 1]."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    window = max(len(a), len(b)) // 2 - 1
+    b_matched = [False] * len(b)
+    a_matches = []
+
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == char:
+                b_matched[j] = True
+                a_matches.append(char)
+                break
+
+    matches = len(a_matches)
+    if not matches:
+        return 0.0
+
+    b_matches = [char for char, matched in zip(b, b_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_matches, b_matches)) // 2
+
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def token_sort_ratio(a: str, b: str) -> float:
+    """Similarity of the names with their tokens sorted, in [0, 1]."""
+    return SequenceMatcher(None, " ".join(sorted(a.split())), " ".join(sorted(b.split()))).ratio()
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Best of Jaro-Winkler and token-sort ratio for two normalized names."""
+    return max(jaro_winkler(a, b), token_sort_ratio(a, b))
+
+
+def _similarity_bound(common: int, length_a: int, length_b: int) -> float:
+    """
+    Upper bound of ``name_similarity`` from the size of the two names'
+    character multiset intersection: both Jaro matches and matching
+    blocks only pair up equal characters.
+    """
+    jaro = (common / length_a + common / length_b + 1) / 3
+    return max(jaro + 4 * 0.1 * (1 - jaro), 2 * common / (length_a + length_b))
+
+
+def score_candidates(
+    query: str,
+    names: Sequence[str],
+    threshold: float,
+    offset: int = 0
+) -> list[tuple[int, float]]:
+    """
+    ``(offset + position, score)`` of the names scoring at least ``threshold``.
+
+    Module-level so it can run in a process pool; only the query and
+    the candidate names cross the process boundary. Names that cannot
+    reach the threshold are skipped on a cheap character-count bound
+    before either similarity is computed.
+    """
+    if not query:
+        return []
+
+    query_chars = Counter(query)
+    scored = []
+    for position, name in enumerate(names):
+        if not name:
+            continue
+        common = sum((query_chars & Counter(name)).values())
+        if _similarity_bound(common, len(query), len(name)) < threshold:
+            continue
+
+        score = name_similarity(query, name)
+        if score >= threshold:
+            scored.append((offset + position, score))
+    return scored
+
+
+class NameIndex:
+    """
+    Blocking index over the entity names and aliases of listed addresses.
+
+    Built once per index generation, like the trigram index. Each
+    distinct normalized name is stored once, with the units (the entries
+    listing one address) it belongs to in CSR arrays.
+    """
+
+    def __init__(
+        self,
+        units: Sequence[tuple[dict, ...]],
+        names: list[str],
+        blocks: dict[str, list[int]],
+        unit_offsets: np.ndarray,
+        name_units: np.ndarray
+    ):
+        self._units = units
+        self._names = names
+        self._blocks = blocks
+        self._unit_offsets = unit_offsets
+        self._name_units = name_units
+
+    @classmethod
+    def build(cls, units: Sequence[tuple[dict, ...]]) -> "NameIndex":
+        """Index the names of ``units``, a sequence of the record tuples of each address."""
+        name_ids: dict[str, int] = {}
+        names: list[str] = []
+        blocks: dict[str, list[int]] = {}
+        pair_names: list[int] = []
+        pair_units: list[int] = []
+
+        for unit_id in range(len(units)):
+            seen = set()
+            for record in units[unit_id]:
+                for raw in (record.get("entity_name", ""), *record.get("aliases", ())):
+                    name = normalize_name(raw)
+                    if not name or name in seen:
+                        continue
+                    seen.add(name)
+
+                    name_id = name_ids.get(name)
+                    if name_id is None:
+                        name_id = name_ids[name] = len(names)
+                        names.append(name)
+                        for key in blocking_keys(name):
+                            blocks.setdefault(key, []).append(name_id)
+                    pair_names.append(name_id)
+                    pair_units.append(unit_id)
+
+        unit_offsets, name_units = _csr(
+            np.array(pair_names, dtype=np.int64),
+            np.array(pair_units, dtype=np.uint32),
+            len(names)
+        )
+        return cls(units, names, blocks, unit_offsets, name_units)
+
+    def candidates(self, query: str, limit: int) -> list[int]:
+        """
+        Ids of names sharing a blocking key with a normalized query, most
+        shared keys first, at most ``limit``.
+        """
+        shared: Counter = Counter()
+        for key in blocking_keys(query):
+            shared.update(self._blocks.get(key, ()))
+        return [name_id for name_id, _ in shared.most_common(limit)]
+
+    def name(self, name_id: int) -> str:
+        return self._names[name_id]
+
+    def names(self, name_ids: Sequence[int]) -> list[str]:
+        names = self._names
+        return [names[name_id] for name_id in name_ids]
+
+    def records(self, name_id: int) -> Iterator[dict]:
+        """Records listed under a name (as entity name or alias)."""
+        name = self._names[name_id]
+        for unit_id in self._name_units[self._unit_offsets[name_id]:self._unit_offsets[name_id + 1]].tolist():
+            for record in self._units[unit_id]:
+                raw_names = (record.get("entity_name", ""), *record.get("aliases", ()))
+                if any(normalize_name(raw) == name for raw in raw_names):
+                    yield record
+
+    def __len__(self) -> int:
+        return len(self._names)
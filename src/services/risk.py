@@ -1,16 +1,108 @@
 """Risk assessment service."""
 
+import asyncio
+from bisect import bisect_right
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
-from dataclasses import dataclass, field
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from dataclasses import dataclass, field, replace
+import numpy as np
 import structlog
 
 from ..config import get_settings
 from ..models import RiskLevel, BlockchainType
+from .cache import ResultCache
+from .canonical import canonical_key
+from .graph import Exposure, TransactionGraph, get_graph_store
+from .metrics import Counter, Histogram
+from .screening import ScreeningResult, get_screener
+from .singleflight import SingleFlight
 
 logger = structlog.get_logger()
 
+# Shared by all assessors (one is created per request)
+_assessments = SingleFlight("risk_assessment")
+_sanctioned_sets = SingleFlight("sanctioned_nodes")
+
+CATEGORY_SECONDS = Histogram(
+    "risk_category_seconds", "Evaluation time of one risk category", ("category", "status")
+)
+CACHE_LOOKUPS = Counter(
+    "risk_cache_lookups_total", "Risk assessment cache lookups (hit, miss, stale)", ("result",)
+)
+
+# FATF status data (simplified - in production, use database)
+FATF_JURISDICTIONS = {
+    # Black list
+    "KP": {"status": "black_list", "risk_score": 100, "name": "North Korea"},
+    "IR": {"status": "black_list", "risk_score": 95, "name": "Iran"},
+    "MM": {"status": "black_list", "risk_score": 90, "name": "Myanmar"},
+    
+    # Grey list (examples)
+    "PK": {"status": "grey_list", "risk_score": 70, "name": "Pakistan"},
+    "SY": {"status": "grey_list", "risk_score": 75, "name": "Syria"},
+    "YE": {"status": "grey_list", "risk_score": 72, "name": "Yemen"},
+    
+    # Recently removed from grey list
+    "TR": {"status": "compliant", "risk_score": 45, "name": "Turkey"},
+    "AE": {"status": "compliant", "risk_score": 40, "name": "UAE"},
+    
+    # Standard
+    "US": {"status": "compliant", "risk_score": 20, "name": "United States"},
+    "GB": {"status": "compliant", "risk_score": 18, "name": "United Kingdom"},
+    "DE": {"status": "compliant", "risk_score": 15, "name": "Germany"},
+    "JP": {"status": "compliant", "risk_score": 12, "name": "Japan"},
+    "SG": {"status": "compliant", "risk_score": 15, "name": "Singapore"},
+}
+
+# Changes whenever the jurisdiction table does
+JURISDICTION_TABLE_VERSION = hashlib.sha256(
+    json.dumps(FATF_JURISDICTIONS, sort_keys=True).encode()
+).hexdigest()[:16]
+
+# Assessments keyed on the data versions they depend on; created on first use
+_cache: Optional[ResultCache] = None
+
+
+async def sanctioned_nodes(graph: TransactionGraph, blockchain: BlockchainType) -> np.ndarray:
+    """
+    Node ids of a graph's addresses listed by the current sanctions index.
+    
+    Resolving them decodes every listed record, so it runs in a worker
+    thread once per graph version and list content: concurrent callers
+    join the run, and a caller whose budget runs out does not cancel it.
+    ``watch_sanctioned_nodes`` keeps the sets resolved ahead of requests.
+    """
+    index = get_screener().index
+    nodes = graph.known_sanctioned_nodes(index)
+    if nodes is not None:
+        return nodes
+    return await _sanctioned_sets.do(
+        (graph.version, index.digest),
+        lambda: asyncio.to_thread(graph.sanctioned_nodes, index, blockchain)
+    )
+
+
+async def watch_sanctioned_nodes():
+    """
+    Resolve the sanctioned nodes of every chain's graph whenever the
+    graph or the lists change, so exposure searches find them ready.
+    """
+    settings = get_settings()
+    while True:
+        for blockchain in BlockchainType:
+            graph = get_graph_store().get(blockchain)
+            if graph is None:
+                continue
+            try:
+                await sanctioned_nodes(graph, blockchain)
+            except Exception as e:
+                logger.warning("Failed to resolve sanctioned graph nodes", blockchain=blockchain.value, error=str(e))
+        await asyncio.sleep(settings.snapshot_poll_seconds)
+
 
 @dataclass
 class RiskFactor:
@@ -45,9 +137,110 @@ class RiskAssessmentResult:
     # Recommendations
     recommendations: list[str] = field(default_factory=list)
     
+    # Share of the requested category weight actually evaluated (1.0
+    # unless an optional category timed out or failed), and which did not
+    confidence: float = 1.0
+    degraded_categories: list[str] = field(default_factory=list)
+    
+    # Evaluation time per category (nanoseconds, monotonic clock)
+    timings: dict[str, int] = field(default_factory=dict)
+    
     assessed_at: datetime = field(default_factory=datetime.utcnow)
 
 
+def get_risk_cache() -> ResultCache:
+    """Cache of complete risk assessments (in-process LRU, Redis if enabled)."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = ResultCache(
+            maxsize=settings.risk_cache_size,
+            ttl=settings.risk_cache_ttl,
+            redis_url=settings.redis_url if settings.result_cache_redis else None,
+            prefix="aml:risk"
+        )
+    return _cache
+
+
+def _result_to_payload(result: "RiskAssessmentResult") -> dict:
+    """
+    JSON-serializable form of an assessment, for the cache. The address
+    is left out: the entry serves every spelling of its canonical key.
+    """
+    return {
+        "blockchain": result.blockchain.value,
+        "risk_score": result.risk_score,
+        "risk_level": result.risk_level.value,
+        "sanctions_score": result.sanctions_score,
+        "jurisdiction_score": result.jurisdiction_score,
+        "behavior_score": result.behavior_score,
+        "counterparty_score": result.counterparty_score,
+        "factors": [
+            [f.name, f.category, f.score, f.weight, f.description, f.severity]
+            for f in result.factors
+        ],
+        "recommendations": list(result.recommendations),
+        "assessed_at": result.assessed_at.isoformat(),
+    }
+
+
+def _result_from_payload(payload: dict, address: str) -> "RiskAssessmentResult":
+    """Assessment of ``address`` rebuilt from a cached payload (which stays unshared)."""
+    return RiskAssessmentResult(
+        address=address,
+        blockchain=BlockchainType(payload["blockchain"]),
+        risk_score=payload["risk_score"],
+        risk_level=RiskLevel(payload["risk_level"]),
+        sanctions_score=payload["sanctions_score"],
+        jurisdiction_score=payload["jurisdiction_score"],
+        behavior_score=payload["behavior_score"],
+        counterparty_score=payload["counterparty_score"],
+        factors=[RiskFactor(*factor) for factor in payload["factors"]],
+        recommendations=list(payload["recommendations"]),
+        assessed_at=datetime.fromisoformat(payload["assessed_at"])
+    )
+
+
+class AssessmentContext:
+    """
+    Lookups shared by every step of one request.
+    
+    Whatever is looked up for an address (its screen, its counterparty
+    exposure) is computed once and reused for the rest of the request:
+    the screen returned by ``/v1/screen-and-score`` is the one the
+    sanctions category scores, and category assessors running
+    concurrently share their lookups.
+    """
+    
+    def __init__(self):
+        self._lookups: dict[Hashable, asyncio.Future] = {}
+    
+    async def once(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``compute()``, run at most once per key in this context."""
+        future = self._lookups.get(key)
+        if future is None:
+            future = self._lookups[key] = asyncio.ensure_future(compute())
+        # A step that times out must not cancel the lookup for the others
+        return await asyncio.shield(future)
+    
+    async def screen(self, address: str, blockchain: BlockchainType) -> ScreeningResult:
+        """Screening result of an address (served by the screener's cache)."""
+        key = ("screen", canonical_key(address, blockchain), blockchain)
+        return await self.once(key, lambda: get_screener().screen_address(address, blockchain))
+
+
+@dataclass
+class _CategoryOutcome:
+    """
+    Score and factors of one evaluated category (None if it was not);
+    for a batch, an array of scores and a list of factors per address.
+    """
+    score: Any
+    factors: list
+    elapsed_ns: int
+    status: str  # ok, timeout, error, cancelled
+
+
 class RiskAssessor:
     """Multi-factor risk assessment engine."""
     
@@ -59,6 +252,27 @@ class RiskAssessor:
         "counterparty": 0.15
     }
     
+    # Categories an assessment cannot be returned without; the others
+    # degrade the result's confidence when they time out or fail
+    REQUIRED_CATEGORIES = {"sanctions"}
+    
+    # Bump when weights, thresholds or category logic change: cached
+    # assessments of other model versions are never served
+    MODEL_VERSION = 1
+    
+    # Counterparty score by the fewest hops to a sanctioned address
+    # (beyond the last, or with no transaction graph, the baseline)
+    EXPOSURE_HOP_SCORES = {1: 90.0, 2: 60.0, 3: 35.0}
+    BASELINE_COUNTERPARTY_SCORE = 15.0
+    
+    # Exposure searches of a batch run this many nodes per worker thread;
+    # the batch gets the category's time budget once per chunk
+    COUNTERPARTY_CHUNK = 64
+    
+    # Lowest overall score of each level above LOW
+    LEVEL_THRESHOLDS = (30.0, 50.0, 70.0, 90.0)
+    LEVELS = (RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL, RiskLevel.PROHIBITED)
+    
     def __init__(self):
         self.settings = get_settings()
     
@@ -67,82 +281,379 @@ class RiskAssessor:
         address: str,
         blockchain: BlockchainType = BlockchainType.ETHEREUM,
         include_behavior: bool = True,
-        include_counterparty: bool = True
+        include_counterparty: bool = True,
+        context: Optional[AssessmentContext] = None
     ) -> RiskAssessmentResult:
-        """Perform comprehensive risk assessment."""
-        
-        factors = []
-        
-        # 1. Sanctions Check
-        sanctions_score, sanctions_factors = await self._assess_sanctions(address)
-        factors.extend(sanctions_factors)
-        
-        # 2. Jurisdiction Risk
-        jurisdiction_score, jurisdiction_factors = await self._assess_jurisdiction(address, blockchain)
-        factors.extend(jurisdiction_factors)
-        
-        # 3. Behavioral Analysis (optional, requires more data)
-        behavior_score = 0.0
+        """
+        Perform comprehensive risk assessment.
+        
+        Lookups already made in the request's ``context`` (such as the
+        address's screen) are reused rather than repeated.
+        
+        Complete assessments are cached with the versions of the data
+        they were computed from (see ``_data_versions``) and served for
+        as long as those versions are current, however long that is;
+        partial ones are not cached, nor are assessments against the
+        demo seed lists. Concurrent assessments of the same address with
+        the same options on the same data are coalesced into one.
+        """
+        context = context or AssessmentContext()
+        screening = await context.screen(address, blockchain)
+        versions = self._data_versions(screening, include_behavior, include_counterparty)
+        
+        cache = get_risk_cache()
+        cache_key = (
+            f"{blockchain.value}:{canonical_key(address, blockchain).hex()}:"
+            f"{include_behavior:d}{include_counterparty:d}"
+        )
+        cacheable = screening.index_digest is not None
+        if cacheable:
+            cached = await cache.get("assessment", str(self.MODEL_VERSION), cache_key)
+            if cached is not None and cached["versions"] == versions:
+                CACHE_LOOKUPS.inc(result="hit")
+                return _result_from_payload(cached["result"], address)
+            CACHE_LOOKUPS.inc(result="miss" if cached is None else "stale")
+        
+        async def assess() -> RiskAssessmentResult:
+            result = await self._assess(
+                address, blockchain, include_behavior, include_counterparty, context
+            )
+            if cacheable and not result.degraded_categories:
+                await cache.set("assessment", str(self.MODEL_VERSION), cache_key, {
+                    "versions": versions,
+                    "result": _result_to_payload(result)
+                })
+            return result
+        
+        result = await _assessments.do((cache_key, *versions.values()), assess)
+        if result.address != address:
+            # Coalesced into an assessment of another spelling of the address
+            result = replace(result, address=address)
+        return result
+    
+    def _data_versions(
+        self,
+        screening: ScreeningResult,
+        include_behavior: bool,
+        include_counterparty: bool
+    ) -> dict[str, Any]:
+        """
+        Versions of the data an assessment depends on: the sanctions
+        lists (by content digest, as generations are counted per
+        process), the jurisdiction table, (for behavior and
+        counterparty analysis) the address label set and (for
+        counterparty analysis) the chain's transaction graph.
+        """
+        versions = {
+            "sanctions": screening.index_digest,
+            "jurisdiction": JURISDICTION_TABLE_VERSION,
+        }
+        if include_behavior or include_counterparty:
+            versions["labels"] = self.settings.risk_label_set_version
+        if include_counterparty:
+            graph = get_graph_store().get(screening.blockchain)
+            versions["graph"] = graph.version if graph is not None else None
+        return versions
+    
+    async def _assess(
+        self,
+        address: str,
+        blockchain: BlockchainType,
+        include_behavior: bool,
+        include_counterparty: bool,
+        context: AssessmentContext
+    ) -> RiskAssessmentResult:
+        """
+        Evaluate the requested categories concurrently, each within its
+        own timeout, so the assessment takes as long as the slowest one
+        rather than their sum.
+        
+        A required category that times out or fails fails the whole
+        assessment (its siblings are cancelled); any other is left out
+        of the score and lowers the result's confidence instead.
+        """
+        assessors: dict[str, Awaitable[tuple[float, list[RiskFactor]]]] = {
+            "sanctions": self._assess_sanctions(address, blockchain, context),
+            "jurisdiction": self._assess_jurisdiction(address, blockchain),
+        }
+        # Behavioral analysis requires more data: optional, like counterparty risk
         if include_behavior:
-            behavior_score, behavior_factors = await self._assess_behavior(address, blockchain)
-            factors.extend(behavior_factors)
-        
-        # 4. Counterparty Risk (optional)
-        counterparty_score = 0.0
+            assessors["behavior"] = self._assess_behavior(address, blockchain)
         if include_counterparty:
-            counterparty_score, counterparty_factors = await self._assess_counterparty(address, blockchain)
-            factors.extend(counterparty_factors)
+            assessors["counterparty"] = self._assess_counterparty(address, blockchain, context)
+        
+        outcomes = await self._evaluate_all(assessors)
+        
+        factors = []
+        scores = dict.fromkeys(self.WEIGHTS, 0.0)
+        degraded = []
+        for category, outcome in outcomes.items():
+            if outcome.score is None:
+                degraded.append(category)
+                factors.append(self._unavailable_factor(category, outcome))
+                continue
+            scores[category] = outcome.score
+            factors.extend(outcome.factors)
         
         # Calculate weighted overall score
-        overall_score = (
-            sanctions_score * self.WEIGHTS["sanctions"] +
-            jurisdiction_score * self.WEIGHTS["jurisdiction"] +
-            behavior_score * self.WEIGHTS["behavior"] +
-            counterparty_score * self.WEIGHTS["counterparty"]
-        )
+        overall_score = sum(scores[category] * weight for category, weight in self.WEIGHTS.items())
+        
+        requested = sum(self.WEIGHTS[category] for category in outcomes)
+        evaluated = sum(self.WEIGHTS[category] for category in outcomes if category not in degraded)
         
         risk_level = self._score_to_level(overall_score)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(factors, risk_level)
+        if degraded:
+            recommendations.append(self._partial_recommendation(degraded))
         
         return RiskAssessmentResult(
             address=address,
             blockchain=blockchain,
             risk_score=round(overall_score, 2),
             risk_level=risk_level,
-            sanctions_score=round(sanctions_score, 2),
-            jurisdiction_score=round(jurisdiction_score, 2),
-            behavior_score=round(behavior_score, 2),
-            counterparty_score=round(counterparty_score, 2),
+            sanctions_score=round(scores["sanctions"], 2),
+            jurisdiction_score=round(scores["jurisdiction"], 2),
+            behavior_score=round(scores["behavior"], 2),
+            counterparty_score=round(scores["counterparty"], 2),
             factors=factors,
-            recommendations=recommendations
+            recommendations=recommendations,
+            confidence=round(evaluated / requested, 2),
+            degraded_categories=degraded,
+            timings={category: outcome.elapsed_ns for category, outcome in outcomes.items()}
         )
     
-    async def _assess_sanctions(self, address: str) -> tuple[float, list[RiskFactor]]:
-        """Assess sanctions-related risk."""
+    async def assess_many(
+        self,
+        items: list[tuple[str, BlockchainType]],
+        include_behavior: bool = True,
+        include_counterparty: bool = True
+    ) -> list[RiskAssessmentResult]:
+        """
+        Assess a batch of ``(address, chain)`` pairs, in order.
+        
+        Each category is evaluated for the whole batch at once (with the
+        same concurrency, timeouts and partial results as a single
+        assessment); the category scores form an address-by-category
+        matrix weighted in one matrix-vector product, and levels are
+        assigned with ``np.digitize``. Recommendations are generated once
+        per level present in the batch. Every result carries the
+        batch's confidence, degraded categories and timings.
+        """
+        screens = await get_screener().batch_screen([
+            {"address": address, "blockchain": chain.value} for address, chain in items
+        ])
+        
+        assessors = {
+            "sanctions": self._assess_sanctions_batch(screens),
+            "jurisdiction": self._assess_batch(self._assess_jurisdiction, items),
+        }
+        if include_behavior:
+            assessors["behavior"] = self._assess_batch(self._assess_behavior, items)
+        timeouts = {}
+        if include_counterparty:
+            assessors["counterparty"] = self._assess_counterparty_batch(items)
+            timeout = self.settings.risk_category_timeouts.get("counterparty")
+            if timeout is not None:
+                timeouts["counterparty"] = timeout * -(-len(items) // self.COUNTERPARTY_CHUNK)
+        
+        outcomes = await self._evaluate_all(assessors, timeouts)
+        
+        # Address-by-category scores; categories not evaluated stay 0
+        scores = np.zeros((len(items), len(self.WEIGHTS)))
+        factors: list[list[RiskFactor]] = [[] for _ in items]
+        degraded = []
+        for column, category in enumerate(self.WEIGHTS):
+            outcome = outcomes.get(category)
+            if outcome is None:
+                continue
+            if outcome.score is None:
+                degraded.append(category)
+                unavailable = self._unavailable_factor(category, outcome)
+                for address_factors in factors:
+                    address_factors.append(unavailable)
+                continue
+            scores[:, column] = outcome.score
+            for address_factors, category_factors in zip(factors, outcome.factors):
+                address_factors.extend(category_factors)
+        
+        weights = np.fromiter(self.WEIGHTS.values(), dtype=np.float64, count=len(self.WEIGHTS))
+        overall = scores @ weights
+        levels = np.digitize(overall, self.LEVEL_THRESHOLDS)
+        
+        # Generated for the levels present only, and shared by their results
+        partial = [self._partial_recommendation(degraded)] if degraded else []
+        level_recommendations = {
+            position: self._level_recommendations(self.LEVELS[position])
+            for position in np.unique(levels).tolist()
+        }
+        recommendations = {
+            position: level + partial for position, level in level_recommendations.items()
+        }
+        
+        requested = sum(self.WEIGHTS[category] for category in outcomes)
+        evaluated = sum(self.WEIGHTS[category] for category in outcomes if category not in degraded)
+        confidence = round(evaluated / requested, 2)
+        timings = {category: outcome.elapsed_ns for category, outcome in outcomes.items()}
+        
+        results = []
+        rounded = np.round(scores, 2).tolist()
+        for (address, blockchain), score, level, category_scores, address_factors in zip(
+            items, np.round(overall, 2).tolist(), levels.tolist(), rounded, factors
+        ):
+            risk_level = self.LEVELS[level]
+            address_recommendations = recommendations[level]
+            if risk_level != RiskLevel.PROHIBITED:
+                critical = self._factor_recommendations(address_factors)
+                if critical:
+                    address_recommendations = level_recommendations[level] + critical + partial
+            
+            sanctions_score, jurisdiction_score, behavior_score, counterparty_score = category_scores
+            results.append(RiskAssessmentResult(
+                address=address,
+                blockchain=blockchain,
+                risk_score=score,
+                risk_level=risk_level,
+                sanctions_score=sanctions_score,
+                jurisdiction_score=jurisdiction_score,
+                behavior_score=behavior_score,
+                counterparty_score=counterparty_score,
+                factors=address_factors,
+                recommendations=address_recommendations,
+                confidence=confidence,
+                degraded_categories=degraded,
+                timings=timings
+            ))
         
-        from .screening import get_screener
+        return results
+    
+    async def _evaluate_all(
+        self,
+        assessors: dict[str, Awaitable[tuple]],
+        timeouts: Optional[dict[str, float]] = None
+    ) -> dict[str, _CategoryOutcome]:
+        """
+        Outcome of each category, evaluated concurrently; a required
+        category's timeout or error is raised, and the other categories
+        still running are cancelled.
+        
+        ``timeouts`` overrides the budgets of ``risk_category_timeouts``
+        (a batch's categories may get a budget sized to the batch).
+        """
+        budgets = {**self.settings.risk_category_timeouts, **(timeouts or {})}
+        tasks = {
+            category: asyncio.ensure_future(self._evaluate(category, assessor, budgets.get(category)))
+            for category, assessor in assessors.items()
+        }
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return {category: task.result() for category, task in tasks.items()}
+    
+    async def _evaluate(
+        self,
+        category: str,
+        assessor: Awaitable[tuple],
+        timeout: Optional[float]
+    ) -> _CategoryOutcome:
+        """
+        Run one category assessor within its timeout budget (none if
+        ``timeout`` is None).
+        
+        A timeout or error is re-raised for a required category and
+        reported as an outcome without a score for any other.
+        """
+        start = time.perf_counter_ns()
+        status = "cancelled"
+        try:
+            score, factors = await asyncio.wait_for(assessor, timeout)
+            status = "ok"
+            return _CategoryOutcome(score, factors, time.perf_counter_ns() - start, status)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.warning("Risk category timed out", category=category, timeout=timeout)
+            if category in self.REQUIRED_CATEGORIES:
+                raise
+        except Exception as e:
+            status = "error"
+            logger.error("Risk category failed", category=category, error=str(e))
+            if category in self.REQUIRED_CATEGORIES:
+                raise
+        finally:
+            CATEGORY_SECONDS.observe((time.perf_counter_ns() - start) / 1e9, category=category, status=status)
+        return _CategoryOutcome(None, [], time.perf_counter_ns() - start, status)
+    
+    def _unavailable_factor(self, category: str, outcome: _CategoryOutcome) -> RiskFactor:
+        """Factor standing in for a category that was not evaluated."""
+        return RiskFactor(
+            name=f"{category.title()} Analysis Unavailable",
+            category=category,
+            score=0.0,
+            weight=0.0,
+            description=f"Category not evaluated ({outcome.status}); excluded from the score",
+            severity="medium"
+        )
+    
+    def _partial_recommendation(self, degraded: list[str]) -> str:
+        return f"Partial assessment ({', '.join(degraded)} unavailable): re-assess before relying on the score"
+    
+    async def _assess_sanctions(
+        self, 
+        address: str, 
+        blockchain: BlockchainType,
+        context: AssessmentContext
+    ) -> tuple[float, list[RiskFactor]]:
+        """Assess sanctions-related risk from the address's screen."""
         
-        screener = get_screener()
-        result = await screener.screen_address(address)
+        # The request's screen of the address, on the requested chain
+        return self._sanctions_risk(await context.screen(address, blockchain))
+    
+    async def _assess_sanctions_batch(
+        self,
+        screens: list[ScreeningResult]
+    ) -> tuple[np.ndarray, list[list[RiskFactor]]]:
+        """Sanctions scores and factors of a batch, from its screens."""
+        risks = [self._sanctions_risk(screening) for screening in screens]
+        scores = np.fromiter((score for score, _ in risks), dtype=np.float64, count=len(risks))
+        return scores, [factors for _, factors in risks]
+    
+    async def _assess_batch(
+        self,
+        assessor: Callable[[str, BlockchainType], Awaitable[tuple[float, list[RiskFactor]]]],
+        items: list[tuple[str, BlockchainType]]
+    ) -> tuple[np.ndarray, list[list[RiskFactor]]]:
+        """
+        Scores and factors of one category for a batch, address by
+        address. A data source with a bulk API gets a batch assessor of
+        its own instead.
+        """
+        risks = [await assessor(address, blockchain) for address, blockchain in items]
+        scores = np.fromiter((score for score, _ in risks), dtype=np.float64, count=len(risks))
+        return scores, [factors for _, factors in risks]
+    
+    def _sanctions_risk(self, screening: ScreeningResult) -> tuple[float, list[RiskFactor]]:
+        """Sanctions score and factors of a screen."""
+        matches = screening.matches
         
         factors = []
         
-        if result.is_sanctioned:
+        if screening.is_sanctioned:
             factors.append(RiskFactor(
                 name="Direct Sanctions Match",
                 category="sanctions",
                 score=100.0,
                 weight=1.0,
-                description=f"Address matches OFAC/sanctions list",
+                description=f"Address listed by {', '.join(m['source'] for m in matches)}",
                 severity="critical"
             ))
             return 100.0, factors
         
-        # Check for indirect sanctions exposure
-        # This would query blockchain analytics for exposure to sanctioned entities
-        indirect_score = 10.0  # Baseline
+        # Indirect sanctions exposure, as scored by the screen
+        indirect_score = screening.risk_score
         
         factors.append(RiskFactor(
             name="No Direct Sanctions",
@@ -150,7 +661,7 @@ class RiskAssessor:
             score=indirect_score,
             weight=1.0,
             description="No direct sanctions matches found",
-            severity="low"
+            severity=self._score_to_severity(indirect_score)
         ))
         
         return indirect_score, factors
@@ -223,42 +734,133 @@ class RiskAssessor:
     async def _assess_counterparty(
         self, 
         address: str, 
-        blockchain: BlockchainType
+        blockchain: BlockchainType,
+        context: Optional[AssessmentContext] = None
     ) -> tuple[float, list[RiskFactor]]:
-        """Assess counterparty exposure risk."""
-        
-        factors = []
-        
-        # This would analyze:
-        # - Direct counterparty risk
-        # - Hop analysis (exposure via intermediaries)
-        # - Exchange/service counterparties
-        
-        base_score = 15.0
-        
-        factors.append(RiskFactor(
+        """
+        Assess counterparty exposure risk: hops through the chain's
+        transaction graph to the nearest sanctioned address.
+        """
+        graph = get_graph_store().get(blockchain)
+        node = graph.node_id(address, blockchain) if graph is not None else None
+        if node is None:
+            # No transaction history for the address
+            return self._counterparty_risk(None)
+        
+        # Off the event loop, so the category's timeout can give up on it
+        sanctioned = await sanctioned_nodes(graph, blockchain)
+        context = context or AssessmentContext()
+        (exposure,) = await context.once(
+            ("exposure", graph.version, node),
+            lambda: asyncio.to_thread(self._exposures, graph, [node], sanctioned)
+        )
+        return self._counterparty_risk(exposure)
+    
+    async def _assess_counterparty_batch(
+        self,
+        items: list[tuple[str, BlockchainType]]
+    ) -> tuple[np.ndarray, list[list[RiskFactor]]]:
+        """
+        Counterparty scores and factors of a batch.
+        
+        Each distinct graph node is searched once; the searches run
+        ``COUNTERPARTY_CHUNK`` nodes per worker thread, the chunks
+        concurrently.
+        """
+        store = get_graph_store()
+        located: list[Optional[tuple[str, int]]] = []
+        pending: dict[str, tuple[TransactionGraph, BlockchainType, set[int]]] = {}
+        for address, blockchain in items:
+            graph = store.get(blockchain)
+            node = graph.node_id(address, blockchain) if graph is not None else None
+            if node is None:
+                located.append(None)
+                continue
+            located.append((graph.version, node))
+            pending.setdefault(graph.version, (graph, blockchain, set()))[2].add(node)
+        
+        chunks = []
+        for graph, blockchain, nodes in pending.values():
+            sanctioned = await sanctioned_nodes(graph, blockchain)
+            nodes = sorted(nodes)
+            for start in range(0, len(nodes), self.COUNTERPARTY_CHUNK):
+                chunks.append((graph, nodes[start:start + self.COUNTERPARTY_CHUNK], sanctioned))
+        
+        searched = await asyncio.gather(*(
+            asyncio.to_thread(self._exposures, graph, nodes, sanctioned)
+            for graph, nodes, sanctioned in chunks
+        ))
+        exposures = {
+            (graph.version, node): exposure
+            for (graph, nodes, _), chunk in zip(chunks, searched)
+            for node, exposure in zip(nodes, chunk)
+        }
+        
+        risks = [self._counterparty_risk(exposures[key] if key else None) for key in located]
+        scores = np.fromiter((score for score, _ in risks), dtype=np.float64, count=len(risks))
+        return scores, [factors for _, factors in risks]
+    
+    def _counterparty_risk(self, exposure: Optional[Exposure]) -> tuple[float, list[RiskFactor]]:
+        """Counterparty score and factor of an exposure (None: not in the graph)."""
+        if exposure is None:
+            return self.BASELINE_COUNTERPARTY_SCORE, [RiskFactor(
+                name="Counterparty Exposure",
+                category="counterparty",
+                score=self.BASELINE_COUNTERPARTY_SCORE,
+                weight=1.0,
+                description="Standard counterparty risk profile",
+                severity="low"
+            )]
+        
+        nearest = exposure.nearest_hop
+        depth = len(exposure.sanctioned_by_hop)
+        if nearest is None:
+            score = self.BASELINE_COUNTERPARTY_SCORE
+            description = f"No sanctioned counterparties within {depth} hops"
+        else:
+            score = self.EXPOSURE_HOP_SCORES.get(nearest, self.BASELINE_COUNTERPARTY_SCORE)
+            description = (
+                f"{exposure.sanctioned} sanctioned address(es) within {depth} hops, "
+                f"nearest at hop {nearest}"
+            )
+        if exposure.truncated:
+            description += f" (search cut short after {exposure.edges_scanned} transfers)"
+        
+        return score, [RiskFactor(
             name="Counterparty Exposure",
             category="counterparty",
-            score=base_score,
+            score=score,
             weight=1.0,
-            description="Standard counterparty risk profile",
-            severity="low"
-        ))
-        
-        return base_score, factors
+            description=description,
+            severity=self._score_to_severity(score)
+        )]
+    
+    def _exposures(
+        self,
+        graph: TransactionGraph,
+        nodes: list[int],
+        sanctioned: np.ndarray
+    ) -> list[Exposure]:
+        """Bounded searches of a graph for sanctioned addresses near each node."""
+        return [
+            graph.exposure(
+                node,
+                sanctioned,
+                max_depth=self.settings.graph_max_depth,
+                max_edges=self.settings.graph_max_edges,
+                hub_degree=self.settings.graph_hub_degree
+            )
+            for node in nodes
+        ]
+    
+    def _score_to_severity(self, score: float) -> str:
+        """Factor severity of a score (the risk level, prohibited as critical)."""
+        level = self._score_to_level(score)
+        return "critical" if level == RiskLevel.PROHIBITED else level.value
     
     def _score_to_level(self, score: float) -> RiskLevel:
         """Convert score to risk level."""
-        if score >= 90:
-            return RiskLevel.PROHIBITED
-        elif score >= 70:
-            return RiskLevel.CRITICAL
-        elif score >= 50:
-            return RiskLevel.HIGH
-        elif score >= 30:
-            return RiskLevel.MEDIUM
-        else:
-            return RiskLevel.LOW
+        return self.LEVELS[bisect_right(self.LEVEL_THRESHOLDS, score)]
     
     def _generate_recommendations(
         self, 
@@ -267,6 +869,14 @@ class RiskAssessor:
     ) -> list[str]:
         """Generate actionable recommendations based on risk factors."""
         
+        recommendations = self._level_recommendations(risk_level)
+        if risk_level != RiskLevel.PROHIBITED:
+            recommendations.extend(self._factor_recommendations(factors))
+        return recommendations
+    
+    def _level_recommendations(self, risk_level: RiskLevel) -> list[str]:
+        """Recommendations every address of a risk level gets."""
+        
         recommendations = []
         
         if risk_level == RiskLevel.PROHIBITED:
@@ -290,42 +900,21 @@ class RiskAssessor:
         if risk_level == RiskLevel.LOW:
             recommendations.append("Standard processing acceptable")
         
-        # Add factor-specific recommendations
-        for factor in factors:
-            if factor.severity == "critical":
-                recommendations.append(f"Address {factor.name}: {factor.description}")
-        
         return recommendations
+    
+    def _factor_recommendations(self, factors: list[RiskFactor]) -> list[str]:
+        """Factor-specific recommendations (for critical factors)."""
+        return [
+            f"Address {factor.name}: {factor.description}"
+            for factor in factors
+            if factor.severity == "critical"
+        ]
 
 
 async def get_jurisdiction_risk(country_code: str) -> dict:
     """Get risk profile for a jurisdiction."""
     
-    # FATF status data (simplified - in production, use database)
-    fatf_data = {
-        # Black list
-        "KP": {"status": "black_list", "risk_score": 100, "name": "North Korea"},
-        "IR": {"status": "black_list", "risk_score": 95, "name": "Iran"},
-        "MM": {"status": "black_list", "risk_score": 90, "name": "Myanmar"},
-        
-        # Grey list (examples)
-        "PK": {"status": "grey_list", "risk_score": 70, "name": "Pakistan"},
-        "SY": {"status": "grey_list", "risk_score": 75, "name": "Syria"},
-        "YE": {"status": "grey_list", "risk_score": 72, "name": "Yemen"},
-        
-        # Recently removed from grey list
-        "TR": {"status": "compliant", "risk_score": 45, "name": "Turkey"},
-        "AE": {"status": "compliant", "risk_score": 40, "name": "UAE"},
-        
-        # Standard
-        "US": {"status": "compliant", "risk_score": 20, "name": "United States"},
-        "GB": {"status": "compliant", "risk_score": 18, "name": "United Kingdom"},
-        "DE": {"status": "compliant", "risk_score": 15, "name": "Germany"},
-        "JP": {"status": "compliant", "risk_score": 12, "name": "Japan"},
-        "SG": {"status": "compliant", "risk_score": 15, "name": "Singapore"},
-    }
-    
-    return fatf_data.get(country_code.upper(), {
+    return FATF_JURISDICTIONS.get(country_code.upper(), {
         "status": "unknown",
         "risk_score": 50,
         "name": country_code
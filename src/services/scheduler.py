@@ -0,0 +1,86 @@
+"""Scheduled sanctions refresh, run by one leader process per node."""
+
+from datetime import datetime
+import fcntl
+import os
+from typing import Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+import structlog
+
+from ..config import Settings
+from .screening import SanctionsScreener
+
+logger = structlog.get_logger()
+
+
+class RefreshScheduler:
+    """
+    Refreshes every source on a jittered interval in the background.
+
+    Every worker runs the schedule, but only the one holding the lock
+    file next to the snapshot refreshes; the others follow the snapshot
+    it writes. A worker that finds the lock free on a later tick (the
+    leader exited) takes over. Jitter keeps nodes from hitting the list
+    publishers in lockstep.
+    """
+
+    def __init__(self, screener: SanctionsScreener, settings: Settings):
+        self.screener = screener
+        self.settings = settings
+        self.lock_path = f"{settings.sanctions_snapshot_path}.lock"
+        self._lock_file = None
+        self._scheduler: Optional[AsyncIOScheduler] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_file is not None
+
+    def _acquire_leadership(self) -> bool:
+        """Take the node's refresh lock if no other process holds it."""
+        if self._lock_file is not None:
+            return True
+
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        logger.info("Sanctions refresh leader", pid=os.getpid(), lock=self.lock_path)
+        return True
+
+    async def _tick(self):
+        if self._acquire_leadership():
+            await self.screener.refresh_in_background()
+
+    def start(self, run_now: bool = True):
+        """Schedule the refresh; with ``run_now``, the first one starts at once."""
+        # An explicit None would add the job paused, so leave it out
+        first_run = {"next_run_time": datetime.now()} if run_now else {}
+
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self._tick,
+            IntervalTrigger(
+                seconds=self.settings.sanctions_refresh_interval,
+                jitter=self.settings.sanctions_refresh_jitter
+            ),
+            **first_run,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=None,
+            id="sanctions_refresh"
+        )
+        self._scheduler.start()
+
+    def shutdown(self):
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
@@ -1,19 +1,53 @@
 """Sanctions screening service."""
 
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from decimal import Decimal
+import multiprocessing
+import os
+import time
 from typing import Optional
 import httpx
 import structlog
-from dataclasses import dataclass, field
-import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field, replace
 
 from ..config import get_settings
 from ..models import SanctionsSource, BlockchainType, RiskLevel
+from .cache import ResultCache
+from .canonical import canonical_key, normalize_address
+from .changelog import SanctionsChangeLog
+from .index import SanctionsIndex
+from .metrics import STAGE_BUCKETS, Counter, Gauge, Histogram, StageTimer
+from .names import normalize_name, score_candidates
+from .singleflight import SingleFlight
+from .snapshot import MappedSnapshot, write_snapshot
+from .sources import SanctionsListAdapter, build_adapters
+from .store import load_sanctioned_records, persist_sanctioned_records
 
 logger = structlog.get_logger()
 
+REFRESH_SECONDS = Histogram("sanctions_refresh_seconds", "Duration of a refresh of every source")
+FETCH_SECONDS = Histogram(
+    "sanctions_fetch_seconds", "Download and parse time of one source", ("source", "status")
+)
+PUBLISH_SECONDS = Histogram(
+    "sanctions_publish_seconds", "Diff and publish time of one changed source", ("source",)
+)
+REFRESH_FAILURES = Counter("sanctions_refresh_failures_total", "Failed source fetches", ("source",))
+SCREEN_SECONDS = Histogram(
+    "screen_seconds", "Screening time of a request", ("path",), buckets=STAGE_BUCKETS
+)
+SCREEN_STAGE_SECONDS = Histogram(
+    "screen_stage_seconds", "Time spent in each stage of a screen", ("path", "stage"),
+    buckets=STAGE_BUCKETS
+)
+
+# Name scoring processes are spawned, not forked, like the job pool's: a
+# forked child would inherit this screener with its Redis and HTTP
+# clients bound to the parent's event loop
+_NAME_POOL_CONTEXT = multiprocessing.get_context("spawn")
+
 
 @dataclass
 class ScreeningResult:
@@ -30,68 +64,151 @@ class ScreeningResult:
     # Sources checked
     sources_checked: list[str] = field(default_factory=list)
     
-    # Timing
+    # Sanctions index generation that answered the screen, and its
+    # content digest (None for the seed lists, whose results are not cached)
+    generation: int = 0
+    index_digest: Optional[str] = None
+    
+    # Timing: total and per stage (nanoseconds, monotonic clock)
     screened_at: datetime = field(default_factory=datetime.utcnow)
-    response_time_ms: int = 0
+    response_time_ms: float = 0.0
+    timings: dict[str, int] = field(default_factory=dict)
 
 
 class SanctionsScreener:
     """Screen addresses against multiple sanctions lists."""
     
-    # Known sanctioned address patterns (for demo - in production, use DB)
-    OFAC_CRYPTO_ID_TYPES = [
-        "Digital Currency Address - XBT",
-        "Digital Currency Address - ETH",
-        "Digital Currency Address - USDT",
-        "Digital Currency Address - TRX"
+    # Known sanctioned addresses served before the first refresh
+    # (for demo - in production, the SDN feed supersedes these)
+    KNOWN_OFAC_ADDRESSES = [
+        "0x8576acc5c05d6ce88f4e49bf65bdf0c62f91353c",  # Tornado Cash
+        "0x722122df12d4e14e13ac3b6895a86e84145b6967",
+        "0xd90e2f925da726b50c4ed8d0fb90ad053324f31b",
     ]
     
+    # Fewer fuzzy-match candidates than this are scored inline: cheaper
+    # than the round trip to the process pool
+    INLINE_NAME_SCORING = 32
+    
     def __init__(self):
         self.settings = get_settings()
         self.client = httpx.AsyncClient(timeout=30.0)
         
-        # In-memory cache (in production, use Redis)
-        self._sanctions_cache: dict[str, dict] = {}
-        self._last_update: Optional[datetime] = None
+        # Lists merged into the index on refresh
+        self.sources = build_adapters(self.settings)
+        
+        # Published sanctions index, replaced wholesale on each refresh
+        self._index = SanctionsIndex.build(self._known_ofac_records(), sources={"ofac": {}}, seed=True)
+        self.index_origin = "seed"
+        
+        # When the published lists were last confirmed current with every
+        # source (by this process's refresh or the refresher's snapshot)
+        self.verified_at: Optional[datetime] = None
+        self.last_refresh: Optional[dict] = None
+        
+        # Adds search indexes to a warm-started generation
+        self._search_build: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+        
+        # Diffs applied by each refresh, for consumers that process deltas
+        self.changelog = SanctionsChangeLog(self.settings.sanctions_changelog_path)
+        
+        # Concurrent screens of one address share a single execution
+        self._screens = SingleFlight("screen")
+        
+        # Screen results and indirect-risk scores, keyed by index digest
+        self.cache = ResultCache(
+            maxsize=self.settings.result_cache_size,
+            ttl=self.settings.result_cache_ttl,
+            redis_url=self.settings.redis_url if self.settings.result_cache_redis else None
+        )
+        
+        # Scores fuzzy name candidates off the event loop; started on first use
+        self._name_executor: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def index(self) -> SanctionsIndex:
+        """The currently published sanctions index."""
+        return self._index
     
     async def screen_address(
         self, 
         address: str, 
         blockchain: BlockchainType = BlockchainType.ETHEREUM
     ) -> ScreeningResult:
-        """Screen a single address against all sanctions lists."""
+        """
+        Screen a single address against all sanctions lists.
         
-        start_time = datetime.utcnow()
+        Results, negatives included, are served from the result cache
+        for as long as the lists are unchanged (the seed lists served
+        before the first load are never cached). Concurrent screens of
+        the same address on the same lists that miss the cache are
+        coalesced into one (e.g. a hot exchange wallet).
         
-        # Normalize address
-        address = address.lower().strip()
+        Stage timings are recorded to ``screen_stage_seconds``; a caller
+        coalesced into another's screen times its wait as ``coalesced``.
+        """
+        timer = StageTimer()
+        index = self._index
+        key = canonical_key(address, blockchain)
+        timer.mark("normalize")
         
-        # Check cache first
-        if address in self._sanctions_cache:
-            cached = self._sanctions_cache[address]
-            return ScreeningResult(
-                address=address,
+        cached = None
+        if not index.seed:
+            cached = await self.cache.get("screen", index.digest, self._cache_key(key, blockchain))
+            timer.mark("cache")
+        if cached is not None:
+            # The cached screen may be another spelling's: show this request's
+            result = ScreeningResult(
+                address=normalize_address(address, blockchain),
                 blockchain=blockchain,
-                is_sanctioned=True,
-                risk_level=RiskLevel.PROHIBITED,
-                risk_score=100.0,
-                matches=[cached],
-                sources_checked=["cache"],
-                response_time_ms=int((datetime.utcnow() - start_time).total_seconds() * 1000)
+                is_sanctioned=cached["is_sanctioned"],
+                risk_level=RiskLevel(cached["risk_level"]),
+                risk_score=cached["risk_score"],
+                matches=[dict(match) for match in cached["matches"]],
+                sources_checked=list(cached["sources_checked"]),
+                generation=index.generation,
+                index_digest=index.digest,
+                response_time_ms=timer.elapsed_ns() / 1e6,
+                timings=timer.stages
+            )
+        else:
+            result = await self._screens.do(
+                (key, blockchain, index.digest),
+                lambda: self._screen(address, key, blockchain, index, timer)
             )
+            if result.timings is not timer.stages:
+                # Another request's screen: report this request's own
+                # spelling of the address and its own wait
+                timer.mark("coalesced")
+                result = replace(
+                    result,
+                    address=normalize_address(address, blockchain),
+                    response_time_ms=timer.elapsed_ns() / 1e6,
+                    timings=timer.stages
+                )
         
-        # Check OFAC
-        ofac_match = await self._check_ofac(address)
+        SCREEN_SECONDS.observe(result.response_time_ms / 1e3, path="single")
+        timer.observe(SCREEN_STAGE_SECONDS, path="single")
+        return result
+    
+    async def _screen(
+        self,
+        address: str,
+        key: bytes,
+        blockchain: BlockchainType,
+        index: SanctionsIndex,
+        timer: StageTimer
+    ) -> ScreeningResult:
+        """Screen a canonical key against one pinned index generation."""
         
-        # Check other sources in parallel
-        # eu_match, uk_match = await asyncio.gather(
-        #     self._check_eu(address),
-        #     self._check_uk(address)
-        # )
+        # Display form for the response
+        address = normalize_address(address, blockchain)
+        timer.mark("normalize")
         
-        matches = []
-        if ofac_match:
-            matches.append(ofac_match)
+        # One probe covers every source merged into the index
+        matches = self._check_sanctions(key, blockchain, index)
+        timer.mark("lookup")
         
         is_sanctioned = len(matches) > 0
         
@@ -101,10 +218,19 @@ class SanctionsScreener:
             risk_score = 100.0
         else:
             # Even if not sanctioned, check for indirect risk
-            risk_score = await self._calculate_indirect_risk(address, blockchain)
+            risk_score, = await self._indirect_risk([(key, address, blockchain)], index)
             risk_level = self._score_to_level(risk_score)
+            timer.mark("indirect_risk")
         
-        response_time = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+        if not index.seed:
+            await self.cache.set("screen", index.digest, self._cache_key(key, blockchain), {
+                "is_sanctioned": is_sanctioned,
+                "risk_level": risk_level.value,
+                "risk_score": risk_score,
+                "matches": [dict(match) for match in matches],
+                "sources_checked": list(index.sources)
+            })
+            timer.mark("cache")
         
         return ScreeningResult(
             address=address,
@@ -113,55 +239,132 @@ class SanctionsScreener:
             risk_level=risk_level,
             risk_score=risk_score,
             matches=matches,
-            sources_checked=["ofac"],
-            response_time_ms=response_time
+            sources_checked=list(index.sources),
+            generation=index.generation,
+            index_digest=None if index.seed else index.digest,
+            response_time_ms=timer.elapsed_ns() / 1e6,
+            timings=timer.stages
         )
     
-    async def batch_screen(
-        self, 
-        addresses: list[dict],
-        max_concurrent: int = 10
-    ) -> list[ScreeningResult]:
-        """Screen multiple addresses concurrently."""
-        
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def screen_with_semaphore(addr_info: dict) -> ScreeningResult:
-            async with semaphore:
-                return await self.screen_address(
-                    addr_info["address"],
-                    BlockchainType(addr_info.get("blockchain", "ethereum"))
-                )
+    async def batch_screen(self, addresses: list[dict]) -> list[ScreeningResult]:
+        """
+        Screen multiple addresses against one pinned index generation.
         
-        tasks = [screen_with_semaphore(addr) for addr in addresses]
-        results = await asyncio.gather(*tasks)
+        A screen is a lookup with no I/O, so the batch is not fanned out
+        into coroutines: it is canonicalized in one pass, membership is
+        checked in bulk, and only the hits are given match records.
         
-        return results
-    
-    async def _check_ofac(self, address: str) -> Optional[dict]:
-        """Check address against OFAC SDN list."""
+        Every result carries the timings of the whole batch.
+        """
+        timer = StageTimer()
         
-        # In production, this would query a database or Redis cache
-        # that's populated by a background job fetching OFAC data
+        # Answer the whole batch from one generation
+        index = self._index
         
-        # For now, check against known addresses (demo)
-        known_ofac_addresses = [
-            # Example sanctioned addresses (use actual OFAC data in production)
-            "0x8576acc5c05d6ce88f4e49bf65bdf0c62f91353c",  # Tornado Cash
-            "0x722122df12d4e14e13ac3b6895a86e84145b6967",
-            "0xd90e2f925da726b50c4ed8d0fb90ad053324f31b",
+        items = [
+            (addr_info["address"], BlockchainType(addr_info.get("blockchain", "ethereum")))
+            for addr_info in addresses
         ]
+        keys = [(canonical_key(address, chain), chain) for address, chain in items]
+        displayed = [normalize_address(address, chain) for address, chain in items]
+        timer.mark("normalize")
+        listed = index.lookup_many(keys)
+        timer.mark("lookup")
+        
+        clean = [
+            (key, address, chain)
+            for address, (key, chain) in zip(displayed, keys)
+            if (key, chain) not in listed
+        ]
+        indirect = iter(await self._indirect_risk(clean, index))
+        timer.mark("indirect_risk")
+        
+        # Shared by every result of the batch
+        sources_checked = list(index.sources)
+        response_time = timer.elapsed_ns() / 1e6
+        
+        results = []
+        for address, (_, chain), key in zip(displayed, items, keys):
+            entries = listed.get(key)
+            if entries:
+                risk_level, risk_score = RiskLevel.PROHIBITED, 100.0
+                matches = [dict(record) for record in entries]
+            else:
+                risk_score = next(indirect)
+                risk_level = self._score_to_level(risk_score)
+                matches = []
+            
+            results.append(ScreeningResult(
+                address=address,
+                blockchain=chain,
+                is_sanctioned=bool(entries),
+                risk_level=risk_level,
+                risk_score=risk_score,
+                matches=matches,
+                sources_checked=sources_checked,
+                generation=index.generation,
+                index_digest=None if index.seed else index.digest,
+                response_time_ms=response_time,
+                timings=timer.stages
+            ))
+        timer.mark("assemble")
         
-        if address.lower() in [a.lower() for a in known_ofac_addresses]:
-            return {
+        SCREEN_SECONDS.observe(timer.elapsed_ns() / 1e9, path="batch")
+        timer.observe(SCREEN_STAGE_SECONDS, path="batch")
+        return results
+    
+    def _check_sanctions(
+        self,
+        key: bytes,
+        blockchain: BlockchainType,
+        index: SanctionsIndex
+    ) -> list[dict]:
+        """Records of every source in an index listing a canonical key."""
+        return [dict(record) for record in index.lookup(key, blockchain)]
+    
+    def _known_ofac_records(self) -> list[tuple[str, dict]]:
+        """Seed records for the generation served before the first refresh."""
+        return [
+            (address, {
                 "source": "OFAC",
+                "blockchain": BlockchainType.ETHEREUM.value,
                 "sdn_id": "EXAMPLE",
                 "entity_name": "Sanctioned Entity",
                 "program": "CYBER2",
                 "designation_date": "2022-08-08"
-            }
+            })
+            for address in self.KNOWN_OFAC_ADDRESSES
+        ]
+    
+    @staticmethod
+    def _cache_key(key: bytes, blockchain: BlockchainType) -> str:
+        """Result cache key of a canonical address on one chain."""
+        return f"{blockchain.value}:{key.hex()}"
+    
+    async def _indirect_risk(
+        self,
+        items: list[tuple[bytes, str, BlockchainType]],
+        index: SanctionsIndex
+    ) -> list[float]:
+        """
+        Indirect risk of clean ``(canonical key, display address, chain)``
+        items, in order, through the result cache. Only the items missing
+        from both tiers are computed, in one batch, and then stored.
+        """
+        cache_keys = [self._cache_key(key, chain) for key, _, chain in items]
+        scores = {} if index.seed else await self.cache.get_many("indirect", index.digest, cache_keys)
+        
+        missing = [i for i, cache_key in enumerate(cache_keys) if cache_key not in scores]
+        if missing:
+            computed = await self._calculate_indirect_risk_batch(
+                [(items[i][1], items[i][2]) for i in missing]
+            )
+            computed = {cache_keys[i]: score for i, score in zip(missing, computed)}
+            if not index.seed:
+                await self.cache.set_many("indirect", index.digest, computed)
+            scores.update(computed)
         
-        return None
+        return [scores[cache_key] for cache_key in cache_keys]
     
     async def _calculate_indirect_risk(
         self, 
@@ -174,6 +377,21 @@ class SanctionsScreener:
         # For now, return low risk for unknown addresses
         return 10.0
     
+    async def _calculate_indirect_risk_batch(
+        self,
+        items: list[tuple[str, BlockchainType]]
+    ) -> list[float]:
+        """
+        Indirect risk for many clean (display-form) addresses, in order.
+        
+        An analytics backend with a bulk endpoint should answer the batch
+        in one call here instead of one request per address.
+        """
+        return [
+            await self._calculate_indirect_risk(address, chain)
+            for address, chain in items
+        ]
+    
     def _score_to_level(self, score: float) -> RiskLevel:
         """Convert numeric score to risk level."""
         if score >= 90:
@@ -187,75 +405,466 @@ class SanctionsScreener:
         else:
             return RiskLevel.LOW
     
-    async def refresh_sanctions_cache(self):
-        """Refresh the sanctions cache from all sources."""
-        logger.info("Refreshing sanctions cache...")
+    async def refresh_sanctions_cache(self) -> Optional[SanctionsIndex]:
+        """
+        Refresh the sanctions cache from all sources.
         
-        try:
-            # Fetch OFAC SDN list
-            response = await self.client.get(self.settings.ofac_sdn_url)
-            response.raise_for_status()
+        Every source is fetched concurrently and conditionally, and
+        skipped when unchanged. As each source completes, only its
+        per-entry diff against the current index is applied and published
+        as a new generation, so a slow or failing source never holds back
+        the others; it keeps serving its entries from the last successful
+        fetch. Each diff is appended to the change log.
+        
+        Returns the published index, or None if every source failed.
+        """
+        async with self._refresh_lock:
+            logger.info("Refreshing sanctions cache...", sources=[a.name for a in self.sources])
+            start_time = time.perf_counter()
+            started_at = datetime.utcnow()
+            current = self._index
             
-            # Parse and extract crypto addresses
-            root = ET.fromstring(response.text)
-            ns = {"sdn": "http://www.un.org/sanctions/1.0"}
+            pending = {
+                asyncio.create_task(self._fetch_source(adapter, current.sources.get(adapter.name, {}))): adapter
+                for adapter in self.sources
+            }
+            failed = []
             
-            count = 0
-            for entry in root.findall(".//sdnEntry", ns):
-                id_list = entry.find("idList", ns)
-                if id_list is None:
-                    continue
-                
-                for id_entry in id_list.findall("id", ns):
-                    id_type = id_entry.find("idType", ns)
-                    id_number = id_entry.find("idNumber", ns)
-                    
-                    if id_type is not None and id_type.text in self.OFAC_CRYPTO_ID_TYPES:
-                        addr = id_number.text.lower() if id_number is not None else ""
-                        if addr:
-                            uid = entry.find("uid", ns)
-                            name = entry.find("lastName", ns) or entry.find("firstName", ns)
-                            
-                            self._sanctions_cache[addr] = {
-                                "source": "OFAC",
-                                "sdn_id": uid.text if uid is not None else "",
-                                "entity_name": name.text if name is not None else "",
-                                "designation_date": datetime.utcnow().isoformat()
-                            }
-                            count += 1
+            try:
+                while pending:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        adapter = pending.pop(task)
+                        error = task.exception()
+                        if error is not None:
+                            failed.append(adapter.name)
+                            REFRESH_FAILURES.inc(source=adapter.name)
+                            logger.error(f"Failed to refresh sanctions source: {error!r}", source=adapter.name)
+                            continue
+                        await self._publish_source(adapter, task.result())
+            finally:
+                for task in pending:
+                    task.cancel()
             
-            self._last_update = datetime.utcnow()
-            logger.info(f"Sanctions cache refreshed: {count} crypto addresses")
+            duration = time.perf_counter() - start_time
+            REFRESH_SECONDS.observe(duration)
+            self.last_refresh = {
+                "started_at": started_at,
+                "duration_seconds": round(duration, 3),
+                "failed_sources": failed,
+                "generation": self._index.generation,
+            }
+            if not failed:
+                self.verified_at = started_at
             
+            if self.sources and len(failed) == len(self.sources):
+                return None
+            return self._index
+    
+    async def _fetch_source(
+        self,
+        adapter: SanctionsListAdapter,
+        state: dict
+    ) -> Optional[tuple[dict[str, dict], dict]]:
+        """Fetch one source, bounded by the per-source timeout."""
+        start_time = time.perf_counter()
+        status = "failed"
+        try:
+            fetched = await asyncio.wait_for(
+                adapter.fetch(self.client, state),
+                timeout=self.settings.sanctions_source_timeout
+            )
+            status = "not_modified" if fetched is None else "fetched"
+            return fetched
+        finally:
+            FETCH_SECONDS.observe(time.perf_counter() - start_time, source=adapter.name, status=status)
+    
+    async def _publish_source(
+        self,
+        adapter: SanctionsListAdapter,
+        fetched: Optional[tuple[dict[str, dict], dict]]
+    ):
+        """
+        Apply one source's fetch to the current index and publish it.
+        
+        Diffing and building the next generation (tables, Bloom filter,
+        search index) run in a worker thread so requests keep flowing.
+        
+        The seed's demo addresses were never published by any source, so
+        the first fetch replacing them is diffed against an empty index:
+        the change log starts with the full list as additions instead of
+        reporting the demo entries as delisted.
+        """
+        current = self._index
+        
+        if fetched is None:
+            logger.info(f"{adapter.label} list not modified", generation=current.generation)
+            return
+        
+        start_time = time.perf_counter()
+        entries, state = fetched
+        sources = {**current.sources, adapter.name: state}
+        base = SanctionsIndex(generation=current.generation, sources=current.sources) if current.seed else current
+        diff = await asyncio.to_thread(base.diff, adapter.label, entries.items())
+        
+        if not diff:
+            # Same content: keep the generation, remember the new validators
+            self._index = replace(current, sources=sources)
+            logger.info(f"{adapter.label} list unchanged", generation=current.generation)
+            return
+        
+        index = await asyncio.to_thread(
+            base.apply,
+            diff,
+            generation=current.generation + 1,
+            built_at=datetime.utcnow(),
+            sources=sources
+        )
+        self._index = index
+        self.index_origin = "refresh"
+        self.changelog.append(index.generation, current.generation, diff)
+        PUBLISH_SECONDS.observe(time.perf_counter() - start_time, source=adapter.name)
+        
+        logger.info(
+            f"Sanctions cache refreshed: {len(index)} crypto addresses",
+            generation=index.generation,
+            source=adapter.name,
+            **diff.summary()
+        )
+    
+    def load_snapshot(
+        self,
+        path: Optional[str] = None,
+        search_indexes: bool = True
+    ) -> Optional[SanctionsIndex]:
+        """
+        Map the shared snapshot file and publish it if it is newer.
+        
+        Returns the published index, or None when there is no snapshot,
+        it is already mapped, or it is not newer than the current index.
+        Without ``search_indexes`` the index serves screens only until
+        its search indexes are added (see ``warm_start``).
+        """
+        path = path or self.settings.sanctions_snapshot_path
+        current = self._index.snapshot
+        if current is not None and current.path == path and current.is_current():
+            return None
+        
+        try:
+            snapshot = MappedSnapshot.open_if_exists(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to map sanctions snapshot: {e}", path=path)
+            return None
+        
+        if snapshot is None:
+            return None
+        
+        if snapshot.generation <= self._index.generation:
+            logger.debug(
+                "Ignoring sanctions snapshot that is not newer",
+                path=path,
+                snapshot_generation=snapshot.generation,
+                current_generation=self._index.generation
+            )
+            return None
+        
+        index = SanctionsIndex.from_snapshot(snapshot, search_indexes)
+        self._index = index
+        self.index_origin = "snapshot"
+        self._note_snapshot_verified(path)
+        
+        logger.info(
+            f"Sanctions snapshot mapped: {len(index)} crypto addresses",
+            generation=index.generation,
+            path=path
+        )
+        return index
+    
+    async def warm_start(self, path: Optional[str] = None) -> SanctionsIndex:
+        """
+        Publish the last persisted lists without touching the network.
+        
+        The local snapshot is mapped first; screens are served from it
+        at once while its search indexes are built in the background.
+        Without a snapshot, the active rows of the ``sanctioned_addresses``
+        table are loaded instead. If neither is available the seed index
+        stays published. A network refresh should follow in the background.
+        """
+        start_time = time.perf_counter()
+        
+        index = self.load_snapshot(path, search_indexes=False)
+        if index is not None:
+            self._search_build = asyncio.create_task(self._build_search_indexes(index))
+        else:
+            index = await self._load_database()
+        
+        logger.info(
+            "Sanctions warm start",
+            origin=self.index_origin,
+            generation=self._index.generation,
+            digest=self._index.digest,
+            addresses=len(self._index),
+            elapsed_ms=round((time.perf_counter() - start_time) * 1000, 1)
+        )
+        return self._index
+    
+    async def _load_database(self) -> Optional[SanctionsIndex]:
+        """Publish the lists persisted in Postgres, or None if unavailable."""
+        try:
+            records, updated = await load_sanctioned_records(
+                self.settings.database_url,
+                timeout=self.settings.warm_start_timeout
+            )
+        except Exception as e:  # asyncpg.PostgresError, OSError, timeouts
+            logger.warning(f"Sanctions table unavailable for warm start: {e!r}")
+            return None
+        
+        if not records:
+            return None
+        
+        # Generation 0, so any snapshot or refresh supersedes it; unlike the
+        # seed it is identified (and cached) by the digest of its rows
+        index = await asyncio.to_thread(SanctionsIndex.build, records, built_at=updated)
+        self._index = index
+        self.index_origin = "database"
+        return index
+    
+    async def _build_search_indexes(self, index: SanctionsIndex) -> SanctionsIndex:
+        """Add search indexes to a generation published without them."""
+        built = await asyncio.to_thread(index.with_search_indexes)
+        
+        # Refreshes may have re-published the same lists with new validators
+        current = self._index
+        if current.content_digest == built.content_digest and current.search is None:
+            self._index = replace(current, search=built.search, names=built.names)
+        return built
+    
+    async def _searchable_index(self) -> SanctionsIndex:
+        """The published index, waiting for its search indexes if still building."""
+        index = self._index
+        if index.search is None:
+            if self._search_build is None or self._search_build.done():
+                self._search_build = asyncio.create_task(self._build_search_indexes(index))
+            index = await asyncio.shield(self._search_build)
+        return index
+    
+    async def refresh_in_background(self):
+        """
+        Refresh while the current generation keeps serving, and persist
+        the result for the other workers.
+        
+        A new generation is written as the snapshot. When every source
+        was confirmed unchanged, the snapshot's modification time is
+        bumped instead, which followers read as its verification time.
+        On failure the last good lists keep serving; ``index_status``
+        reports them stale once past ``sanctions_max_staleness``.
+        """
+        previous = self._index
+        try:
+            index = await self.refresh_sanctions_cache()
+            if index is None:
+                return
+            if index.generation > previous.generation:
+                await asyncio.to_thread(self.write_snapshot)
+                if self.settings.sanctions_persist_database:
+                    await self.persist_to_database()
+            elif not self.last_refresh["failed_sources"]:
+                path = self.settings.sanctions_snapshot_path
+                if os.path.exists(path):
+                    os.utime(path)
         except Exception as e:
-            logger.error(f"Failed to refresh sanctions cache: {e}")
+            logger.error(f"Background sanctions refresh failed: {e!r}")
+        
+        if self.is_stale():
+            logger.error(
+                "Serving sanctions lists past the staleness budget",
+                verified_at=self.verified_at,
+                max_staleness_seconds=self.settings.sanctions_max_staleness
+            )
+    
+    async def persist_to_database(self) -> dict[str, int]:
+        """
+        Write the published lists to the ``sanctioned_addresses`` table
+        (bulk COPY, upsert, deactivate missing rows; one transaction).
+        """
+        index = self._index
+        start_time = time.perf_counter()
+        records = await asyncio.to_thread(lambda: list(index.records()))
+        counts = await persist_sanctioned_records(self.settings.database_url, records)
+        logger.info(
+            "Sanctions lists persisted to database",
+            generation=index.generation,
+            elapsed_ms=round((time.perf_counter() - start_time) * 1000, 1),
+            **counts
+        )
+        return counts
+    
+    def _note_snapshot_verified(self, path: Optional[str] = None):
+        """Take the snapshot's modification time as its last verification."""
+        try:
+            mtime = os.stat(path or self.settings.sanctions_snapshot_path).st_mtime
+        except OSError:
+            return
+        verified_at = datetime.utcfromtimestamp(mtime)
+        if self.verified_at is None or verified_at > self.verified_at:
+            self.verified_at = verified_at
+    
+    def staleness(self) -> Optional[float]:
+        """Seconds since the lists were last verified, or None if never."""
+        if self.verified_at is None:
+            return None
+        return (datetime.utcnow() - self.verified_at).total_seconds()
+    
+    def is_stale(self) -> bool:
+        """Whether the lists are past the maximum-staleness budget (or never verified)."""
+        staleness = self.staleness()
+        return staleness is None or staleness > self.settings.sanctions_max_staleness
+    
+    def index_status(self) -> dict:
+        """Generation, origin and age of the published index, for health checks."""
+        index = self._index
+        age = (datetime.utcnow() - index.built_at).total_seconds() if index.built_at else None
+        staleness = self.staleness()
+        return {
+            "generation": index.generation,
+            "digest": index.digest,
+            "origin": self.index_origin,
+            "built_at": index.built_at,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "verified_at": self.verified_at,
+            "staleness_seconds": round(staleness, 1) if staleness is not None else None,
+            "stale": self.is_stale(),
+            "addresses": len(index),
+            "search_ready": index.search is not None,
+            "last_refresh": self.last_refresh,
+        }
+    
+    async def watch_snapshot(self, path: Optional[str] = None):
+        """Re-map the snapshot whenever a new file is renamed into place."""
+        while True:
+            await asyncio.sleep(self.settings.snapshot_poll_seconds)
+            # Mapping a new generation builds its search index; keep it off the loop
+            await asyncio.to_thread(self.load_snapshot, path)
+            self._note_snapshot_verified(path)
+    
+    def write_snapshot(self, path: Optional[str] = None) -> str:
+        """Persist the current index as the shared snapshot file."""
+        path = path or self.settings.sanctions_snapshot_path
+        write_snapshot(self._index, path)
+        logger.info("Sanctions snapshot written", generation=self._index.generation, path=path)
+        return path
     
     async def search_sanctions(
         self,
         query: str,
         source: Optional[SanctionsSource] = None,
-        limit: int = 50
+        limit: int = 50,
+        program: Optional[str] = None,
+        fuzzy: bool = False,
+        threshold: Optional[float] = None
     ) -> list[dict]:
-        """Search sanctions lists by name or address."""
+        """
+        Search sanctions lists by name, alias or address.
         
+        Exact address hits come first, then the index's trigram search
+        ranks substring matches. With ``fuzzy``, names are matched
+        instead with typo and transliteration tolerance; those results
+        carry ``match_score`` and ``matched_name``.
+        """
+        
+        index = await self._searchable_index()
         results = []
-        query_lower = query.lower()
-        
-        for addr, data in self._sanctions_cache.items():
-            if query_lower in addr or query_lower in data.get("entity_name", "").lower():
-                if source is None or data.get("source") == source.value.upper():
-                    results.append({
-                        "address": addr,
-                        **data
-                    })
-                    
-                    if len(results) >= limit:
-                        break
+        seen: set[tuple] = set()
+        
+        def add(data: dict) -> bool:
+            # Snapshot lookups decode fresh dicts: identify records by content
+            identity = (data.get("source"), data.get("blockchain"), data["address"])
+            if identity in seen:
+                return False
+            if source is not None and data.get("source") != source.value.upper():
+                return False
+            if program is not None and program.lower() not in data.get("program", "").lower():
+                return False
+            seen.add(identity)
+            results.append(dict(data))
+            return len(results) >= limit
+        
+        # Exact address hits first, by canonical key on every chain
+        for chain in BlockchainType:
+            for data in index.lookup(canonical_key(query, chain), chain):
+                if add(data):
+                    return results
+        
+        if fuzzy:
+            for name_id, score in await self._match_names(index, query, threshold):
+                name = index.names.name(name_id)
+                for data in index.names.records(name_id):
+                    if add({**data, "match_score": round(score, 4), "matched_name": name}):
+                        return results
+            return results
+        
+        matches = index.search.search(
+            query,
+            limit=limit,
+            source=source.value.upper() if source is not None else None,
+            program=program
+        )
+        for data in matches:
+            if add(data):
+                break
         
         return results
     
+    async def _match_names(
+        self,
+        index: SanctionsIndex,
+        query: str,
+        threshold: Optional[float] = None
+    ) -> list[tuple[int, float]]:
+        """
+        ``(name_id, score)`` of the listed names matching ``query``, best first.
+        
+        Blocking narrows the list to a few candidates here; scoring them
+        runs in the process pool so the event loop stays free.
+        """
+        if threshold is None:
+            threshold = self.settings.fuzzy_match_threshold
+        
+        normalized = normalize_name(query)
+        candidates = index.names.candidates(normalized, self.settings.fuzzy_max_candidates)
+        names = index.names.names(candidates)
+        
+        if len(names) < self.INLINE_NAME_SCORING:
+            scored = score_candidates(normalized, names, threshold)
+        else:
+            # One slice of the candidates per pool process
+            loop = asyncio.get_running_loop()
+            step = -(-len(names) // self.settings.fuzzy_match_workers)
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(
+                    self._name_pool(), score_candidates,
+                    normalized, names[start:start + step], threshold, start
+                )
+                for start in range(0, len(names), step)
+            ))
+            scored = [item for part in parts for item in part]
+        
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return [(candidates[position], score) for position, score in scored]
+    
+    def _name_pool(self) -> ProcessPoolExecutor:
+        if self._name_executor is None:
+            self._name_executor = ProcessPoolExecutor(
+                max_workers=self.settings.fuzzy_match_workers,
+                mp_context=_NAME_POOL_CONTEXT
+            )
+        return self._name_executor
+    
     async def close(self):
         await self.client.aclose()
+        await self.cache.close()
+        if self._name_executor is not None:
+            self._name_executor.shutdown(wait=False, cancel_futures=True)
 
 
 # Singleton instance
@@ -268,3 +877,11 @@ def get_screener() -> SanctionsScreener:
     if _screener is None:
         _screener = SanctionsScreener()
     return _screener
+
+
+Gauge("sanctions_index_generation", "Generation of the published sanctions index",
+      callback=lambda: get_screener().index.generation)
+Gauge("sanctions_index_addresses", "Addresses in the published sanctions index",
+      callback=lambda: len(get_screener().index))
+Gauge("sanctions_staleness_seconds", "Seconds since the sanctions lists were last verified",
+      callback=lambda: get_screener().staleness())
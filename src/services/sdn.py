@@ -0,0 +1,124 @@
+"""Streaming parser for the OFAC SDN XML list."""
+
+from datetime import datetime
+from typing import Iterator, Mapping, Optional
+import xml.etree.ElementTree as ET
+
+from ..models import BlockchainType
+
+
+def _local(tag: str) -> str:
+    """Strip the XML namespace from a tag name."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(elem: ET.Element, name: str) -> str:
+    """Text of the first direct child with the given local name."""
+    for child in elem:
+        if _local(child.tag) == name:
+            return (child.text or "").strip()
+    return ""
+
+
+def _infer_chain(address: str) -> BlockchainType:
+    """Chain for multi-chain tokens (e.g. USDT), inferred from address format."""
+    return BlockchainType.ETHEREUM if address[:2].lower() == "0x" else BlockchainType.TRON
+
+
+def _children(elem: ET.Element, name: str) -> Iterator[ET.Element]:
+    """Direct children with the given local name."""
+    for child in elem:
+        if _local(child.tag) == name:
+            yield child
+
+
+class SDNStreamParser:
+    """
+    Incremental SDN parser fed with raw byte chunks.
+
+    Each ``sdnEntry`` is detached from the tree as soon as its crypto
+    identifiers have been extracted, so only the entry currently being
+    parsed is held in memory and peak usage does not grow with the size
+    of the list.
+    """
+
+    def __init__(self, id_types: Mapping[str, Optional[BlockchainType]]):
+        # idType -> chain; None means the chain is inferred from the address
+        self._id_types = dict(id_types)
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self.entries_seen = 0
+
+    def feed(self, chunk: bytes) -> Iterator[tuple[str, dict]]:
+        """Feed a chunk and yield ``(address, record)`` pairs completed by it."""
+        self._parser.feed(chunk)
+        yield from self._drain()
+
+    def close(self) -> Iterator[tuple[str, dict]]:
+        """Signal end of input and yield any remaining pairs."""
+        self._parser.close()
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[tuple[str, dict]]:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+
+            if not elem.tag.endswith("sdnEntry"):
+                continue
+
+            self.entries_seen += 1
+            yield from self._extract(elem)
+
+            # Clearing only the entry would leave an empty shell per entry
+            # attached to the root; dropping them keeps memory flat
+            elem.clear()
+            self._root.clear()
+
+    def _extract(self, entry: ET.Element) -> Iterator[tuple[str, dict]]:
+        """Yield crypto addresses listed in an entry's ``idList``."""
+        for id_list in _children(entry, "idList"):
+            for id_entry in _children(id_list, "id"):
+                id_type = _child_text(id_entry, "idType")
+                if id_type not in self._id_types:
+                    continue
+
+                # Keep the original case: base58 addresses are case-sensitive
+                addr = _child_text(id_entry, "idNumber")
+                if not addr:
+                    continue
+
+                chain = self._id_types[id_type] or _infer_chain(addr)
+
+                name = " ".join(
+                    part for part in (
+                        _child_text(entry, "firstName"),
+                        _child_text(entry, "lastName"),
+                    ) if part
+                )
+                aliases = [
+                    " ".join(part for part in (
+                        _child_text(aka, "firstName"),
+                        _child_text(aka, "lastName"),
+                    ) if part)
+                    for aka_list in _children(entry, "akaList")
+                    for aka in _children(aka_list, "aka")
+                ]
+                programs = [
+                    (program.text or "").strip()
+                    for program_list in _children(entry, "programList")
+                    for program in _children(program_list, "program")
+                ]
+
+                yield addr, {
+                    "source": "OFAC",
+                    "blockchain": chain.value,
+                    "sdn_id": _child_text(entry, "uid"),
+                    "entity_name": name,
+                    "aliases": [alias for alias in aliases if alias],
+                    "entity_type": _child_text(entry, "sdnType"),
+                    "program": ", ".join(p for p in programs if p),
+                    "designation_date": datetime.utcnow().isoformat()
+                }
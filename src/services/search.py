@@ -0,0 +1,235 @@
+"""Trigram inverted index for sanctions search."""
+
+import heapq
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+# Terminates each indexed string; trigrams spanning it are not indexed
+_SEP = b"\x00"
+
+# Stop intersecting postings once this few candidates are left; checking
+# them against the text directly is cheaper than more intersections
+_VERIFY_BELOW = 64
+
+
+def _fields(record: dict) -> list[str]:
+    """Lower-cased searchable text of a record: address, name and aliases."""
+    fields = [record.get("address", ""), record.get("entity_name", "")]
+    fields.extend(record.get("aliases", ()))
+    return [field.lower() for field in fields if field]
+
+
+def _trigrams(data: np.ndarray) -> np.ndarray:
+    """Byte-trigram codes (24-bit) at every position of a UTF-8 buffer."""
+    data = data.astype(np.uint32)
+    return (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """Sorted distinct values (a sort and a mask; faster than np.unique here)."""
+    values = np.sort(values)
+    if len(values):
+        keep = np.empty(len(values), dtype=bool)
+        keep[0] = True
+        np.not_equal(values[1:], values[:-1], out=keep[1:])
+        values = values[keep]
+    return values
+
+
+def _csr(rows: np.ndarray, values: np.ndarray, num_rows: int) -> tuple[np.ndarray, np.ndarray]:
+    """Offsets and row-sorted values, so row i is values[offsets[i]:offsets[i + 1]]."""
+    order = np.argsort(rows, kind="stable")
+    offsets = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=offsets[1:])
+    return offsets, values[order]
+
+
+class TrigramIndex:
+    """
+    Inverted index from byte trigrams to listed addresses.
+
+    Built once per index generation. Every distinct searchable string
+    (address display forms, entity names, aliases; lower-cased UTF-8,
+    so substring matches in bytes are substring matches in text) is a
+    document, stored once in a single buffer however many addresses
+    share it. Postings are stored CSR style: sorted trigram codes,
+    offsets, and one array of document ids; a second CSR maps each
+    document to the units (the entries listing one address) it came from.
+
+    A query intersects the postings of its trigrams, rarest first, until
+    few candidates are left; candidates are then checked against the
+    buffer (trigrams are necessary, not sufficient), ranked, and only
+    the best documents are expanded into records.
+    """
+
+    def __init__(
+        self,
+        units: Sequence[tuple[dict, ...]],
+        text: bytes,
+        doc_offsets: np.ndarray,
+        keys: np.ndarray,
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        unit_offsets: np.ndarray,
+        doc_units: np.ndarray
+    ):
+        self._units = units
+        self._text = text
+        self._doc_offsets = doc_offsets
+        self._keys = keys
+        self._offsets = offsets
+        self._postings = postings
+        self._unit_offsets = unit_offsets
+        self._doc_units = doc_units
+
+    @classmethod
+    def build(cls, units: Sequence[tuple[dict, ...]]) -> "TrigramIndex":
+        """Index ``units``, a sequence of the record tuples of each address."""
+        doc_ids: dict[str, int] = {}
+        chunks: list[bytes] = []
+        pair_docs: list[int] = []
+        pair_units: list[int] = []
+
+        for unit_id in range(len(units)):
+            for field in {field for record in units[unit_id] for field in _fields(record)}:
+                doc_id = doc_ids.get(field)
+                if doc_id is None:
+                    doc_id = doc_ids[field] = len(chunks)
+                    chunks.append(field.encode() + _SEP)
+                pair_docs.append(doc_id)
+                pair_units.append(unit_id)
+
+        num_docs = len(chunks)
+        text = b"".join(chunks)
+        lengths = np.fromiter((len(chunk) for chunk in chunks), dtype=np.int64, count=num_docs)
+        doc_offsets = np.zeros(num_docs + 1, dtype=np.int64)
+        np.cumsum(lengths, out=doc_offsets[1:])
+        del doc_ids, chunks
+
+        unit_offsets, doc_units = _csr(
+            np.array(pair_docs, dtype=np.int64),
+            np.array(pair_units, dtype=np.uint32),
+            num_docs
+        )
+
+        data = np.frombuffer(text, dtype=np.uint8)
+        if len(data) < 3:
+            empty = np.empty(0, dtype=np.uint32)
+            return cls(units, text, doc_offsets, empty, np.zeros(1, dtype=np.int64),
+                       empty, unit_offsets, doc_units)
+
+        doc_of = np.repeat(np.arange(num_docs, dtype=np.uint64), lengths)
+        sep = _SEP[0]
+        valid = (data[:-2] != sep) & (data[1:-1] != sep) & (data[2:] != sep)
+
+        # One (trigram, document) pair per distinct occurrence, sorted by trigram
+        pairs = (_trigrams(data)[valid].astype(np.uint64) << np.uint64(32)) | doc_of[:-2][valid]
+        pairs = _sorted_unique(pairs)
+
+        codes = (pairs >> np.uint64(32)).astype(np.uint32)
+        postings = (pairs & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+        # Postings of keys[i] are postings[offsets[i]:offsets[i + 1]]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        keys = codes[starts]
+        offsets = np.append(starts, len(postings)).astype(np.int64)
+
+        return cls(units, text, doc_offsets, keys, offsets, postings, unit_offsets, doc_units)
+
+    def _candidates(self, query: bytes) -> np.ndarray:
+        """Ids of documents that may contain ``query``, in ascending order."""
+        if len(query) < 3:
+            return np.arange(len(self._doc_offsets) - 1)
+
+        codes = _sorted_unique(_trigrams(np.frombuffer(query, dtype=np.uint8)))
+        slots = np.searchsorted(self._keys, codes)
+        if (slots >= len(self._keys)).any() or (self._keys[slots] != codes).any():
+            return np.empty(0, dtype=np.uint32)
+
+        starts, ends = self._offsets[slots], self._offsets[slots + 1]
+        order = np.argsort(ends - starts)
+
+        result = self._postings[starts[order[0]]:ends[order[0]]]
+        for i in order[1:]:
+            if len(result) <= _VERIFY_BELOW:
+                break
+            postings = self._postings[starts[i]:ends[i]]
+            found = np.minimum(np.searchsorted(postings, result), len(postings) - 1)
+            result = result[postings[found] == result]
+        return result
+
+    def _matches(self, query: bytes) -> list[tuple[tuple[int, int], int]]:
+        """
+        ``(rank, doc)`` for each document containing ``query``. Rank is
+        best first: exact match, then prefix, then substring; shorter
+        documents first within a class.
+        """
+        candidates = self._candidates(query)
+        starts = self._doc_offsets[candidates].tolist()
+        ends = (self._doc_offsets[candidates + 1] - 1).tolist()
+
+        text = self._text
+        matches = []
+        for doc, start, end in zip(candidates.tolist(), starts, ends):
+            position = text.find(query, start, end)
+            if position < 0:
+                continue
+            if position != start:
+                match_class = 2
+            elif end - start == len(query):
+                match_class = 0
+            else:
+                match_class = 1
+            matches.append(((match_class, end - start), doc))
+        return matches
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        source: Optional[str] = None,
+        program: Optional[str] = None
+    ) -> list[dict]:
+        """
+        Top ``limit`` records whose address, name or an alias contains
+        ``query`` (case-insensitive), optionally filtered by source and
+        by program (substring of the record's programs).
+        """
+        query = query.lower()
+        program = program.lower() if program else None
+
+        heap = self._matches(query.encode())
+        heapq.heapify(heap)
+
+        results = []
+        seen: set[tuple[int, int]] = set()
+
+        while heap and len(results) < limit:
+            _, doc = heapq.heappop(heap)
+            for unit_id in self._doc_units[self._unit_offsets[doc]:self._unit_offsets[doc + 1]].tolist():
+                for position, record in enumerate(self._units[unit_id]):
+                    if (unit_id, position) in seen:
+                        continue
+                    if source is not None and record.get("source") != source:
+                        continue
+                    if program is not None and program not in record.get("program", "").lower():
+                        continue
+                    if not any(query in field for field in _fields(record)):
+                        continue
+                    seen.add((unit_id, position))
+                    results.append(record)
+                    if len(results) >= limit:
+                        return results
+
+        return results
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the text buffer and postings arrays in bytes."""
+        arrays = (
+            self._doc_offsets, self._keys, self._offsets,
+            self._postings, self._unit_offsets, self._doc_units
+        )
+        return len(self._text) + sum(array.nbytes for array in arrays)
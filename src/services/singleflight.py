@@ -0,0 +1,68 @@
+"""Single-flight coalescing of concurrent identical calls."""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+# Every group, for the stats endpoint
+_groups: dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one in-flight execution.
+
+    The first caller starts the call as a task; callers arriving while
+    it runs await the same task instead of starting their own. The key
+    is dropped as soon as the call finishes, so later callers run it
+    again (results are not cached here). Every caller receives the same
+    result object, which must therefore be treated as read-only.
+
+    Callers are shielded from each other: a caller that is cancelled
+    (e.g. its client disconnected) does not cancel the shared call.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+        _groups[name] = self
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call()``, or join the in-flight run for ``key``."""
+        task = self._in_flight.get(key)
+
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the error retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """Counters for the stats endpoint."""
+        total = self.executed + self.coalesced
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": self.coalesced / total if total else 0.0,
+        }
+
+
+def singleflight_stats() -> dict[str, dict]:
+    """Counters of every single-flight group, by name."""
+    return {name: group.stats() for name, group in _groups.items()}
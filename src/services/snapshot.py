@@ -0,0 +1,213 @@
+"""Binary sanctions snapshot shared across worker processes.
+
+``main.py refresh`` writes the consolidated index to a single file that
+every worker maps read-only, so N workers share one physical copy of the
+list instead of building N private dicts. Layout (little-endian):
+
+    header   fixed-size, see ``_HEADER``
+    slots    ``count`` fixed-width slots sorted by key:
+             family tag (1) | key length (1) | key, zero-padded (41)
+             | metadata offset (u32) | metadata length (u32)
+    metadata concatenated JSON arrays of the records listing each key
+             (one per source), addressed by the slots
+    bloom    bit array of the generation's Bloom filter
+    info     JSON object with per-source fetch state (HTTP validators)
+
+New snapshots are written to a temporary file and moved into place with
+an atomic rename; workers notice the new inode and re-map.
+"""
+
+from datetime import datetime
+from hashlib import blake2b
+import json
+import mmap
+import os
+import struct
+from typing import Iterator, Optional
+
+from ..models import BlockchainType
+from .bloom import BloomFilter
+from .canonical import EVM_CHAINS, canonical_key
+
+
+MAGIC = b"AMLSNAP1"
+FORMAT_VERSION = 4
+
+# magic, version, generation, built_at, count, meta offset, meta size,
+# bloom offset, bloom bits, bloom hashes, bloom entries, info offset,
+# info size, content digest
+_HEADER = struct.Struct("<8sIQdQQQQQIIQQ16s")
+
+# Longest decoded key is a tagged 40-byte witness program
+KEY_WIDTH = 41
+_SORT_WIDTH = 2 + KEY_WIDTH
+_SLOT = struct.Struct(f"<{_SORT_WIDTH}sII")
+
+# Keys too long for a slot (undecodable raw input) are stored hashed
+_HASHED_KEY_TAG = b"\xfe"
+
+
+def family_tag(blockchain: BlockchainType) -> int:
+    """Slot tag for a chain; EVM chains share a tag as they share keys."""
+    if blockchain in EVM_CHAINS:
+        return 0
+    return {
+        BlockchainType.BITCOIN: 1,
+        BlockchainType.TRON: 2,
+        BlockchainType.SOLANA: 3,
+    }[blockchain]
+
+
+def _sort_key(tag: int, key: bytes) -> bytes:
+    """Fixed-width, lexicographically comparable slot key."""
+    if len(key) > KEY_WIDTH:
+        key = _HASHED_KEY_TAG + blake2b(key, digest_size=32).digest()
+    return bytes((tag, len(key))) + key.ljust(KEY_WIDTH, b"\x00")
+
+
+def write_snapshot(index, path: str) -> None:
+    """
+    Write a ``SanctionsIndex`` to ``path`` atomically.
+
+    The file is fully written and fsynced under a temporary name, then
+    renamed over the previous snapshot, so readers only ever map a
+    complete file.
+    """
+    slots: dict[bytes, list[dict]] = {}
+    for record in index.records():
+        chain = BlockchainType(record["blockchain"])
+        key = canonical_key(record["address"], chain)
+        slots.setdefault(_sort_key(family_tag(chain), key), []).append(record)
+
+    meta = bytearray()
+    slot_bytes = bytearray()
+    for sort_key in sorted(slots):
+        blob = json.dumps(slots[sort_key], separators=(",", ":")).encode()
+        slot_bytes += _SLOT.pack(sort_key, len(meta), len(blob))
+        meta += blob
+
+    bloom = index.bloom
+    bloom_bytes = bloom.to_bytes()
+    info = json.dumps({"sources": index.sources}, default=str).encode()
+
+    meta_offset = _HEADER.size + len(slot_bytes)
+    bloom_offset = meta_offset + len(meta)
+    info_offset = bloom_offset + len(bloom_bytes)
+    built_at = index.built_at.timestamp() if index.built_at else 0.0
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, index.generation, built_at, len(slots),
+        meta_offset, len(meta), bloom_offset,
+        bloom.num_bits, bloom.num_hashes, bloom.count,
+        info_offset, len(info), bytes.fromhex(index.content_digest or "00" * 16)
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(slot_bytes)
+        f.write(meta)
+        f.write(bloom_bytes)
+        f.write(info)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+class MappedSnapshot:
+    """
+    Read-only view of a snapshot file.
+
+    Lookups binary-search the mapped slots in place; the file contents
+    are shared through the page cache by every process mapping it. The
+    mapping is released when the last reference to the view goes away.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.path = path
+        self.inode = (stat.st_dev, stat.st_ino)
+
+        (
+            magic, version, self.generation, built_at, self.count,
+            self._meta_offset, meta_size, bloom_offset,
+            bloom_bits, bloom_hashes, bloom_count, info_offset, info_size,
+            content_digest
+        ) = self._read_header(path)
+        self.content_digest = content_digest.hex()
+
+        self.built_at = datetime.utcfromtimestamp(built_at) if built_at else None
+        self.bloom = BloomFilter.from_buffer(
+            memoryview(self._mm)[bloom_offset:bloom_offset + (bloom_bits + 7) // 8],
+            num_bits=bloom_bits,
+            num_hashes=bloom_hashes,
+            count=bloom_count,
+            generation=self.generation
+        )
+
+        info = json.loads(self._mm[info_offset:info_offset + info_size])
+        self.sources: dict[str, dict] = info.get("sources", {})
+
+    def _read_header(self, path: str) -> tuple:
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"Truncated sanctions snapshot: {path}")
+
+        header = _HEADER.unpack_from(self._mm, 0)
+        magic, version = header[0], header[1]
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a sanctions snapshot (v{FORMAT_VERSION}): {path}")
+        return header
+
+    @classmethod
+    def open_if_exists(cls, path: str) -> Optional["MappedSnapshot"]:
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def is_current(self) -> bool:
+        """Whether ``path`` still names the mapped file (no newer rename)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return (stat.st_dev, stat.st_ino) == self.inode
+
+    def __getitem__(self, slot: int) -> tuple[dict, ...]:
+        """Records listing the key of a slot (decoded on each access)."""
+        _, offset, length = _SLOT.unpack_from(self._mm, _HEADER.size + slot * _SLOT.size)
+        start = self._meta_offset + offset
+        return tuple(json.loads(self._mm[start:start + length]))
+
+    def lookup(self, blockchain: BlockchainType, key: bytes) -> tuple[dict, ...]:
+        """Binary-search the slots for a canonical key."""
+        target = _sort_key(family_tag(blockchain), key)
+        mm, base, size = self._mm, _HEADER.size, _SLOT.size
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = base + mid * size
+            if mm[start:start + _SORT_WIDTH] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        start = base + lo * size
+        if lo < self.count and mm[start:start + _SORT_WIDTH] == target:
+            return self[lo]
+        return ()
+
+    def records(self) -> Iterator[dict]:
+        """Iterate over every record in key order."""
+        for slot in range(self.count):
+            yield from self[slot]
+
+    def __len__(self) -> int:
+        return self.count
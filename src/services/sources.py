@@ -0,0 +1,178 @@
+"""Sanctions list sources.
+
+Each source adapter knows where its list lives and how to parse it. The
+screener fetches every configured source concurrently at refresh time
+and merges them into one consolidated index; screening itself never
+calls out to a source.
+"""
+
+import asyncio
+from datetime import datetime
+import time
+from typing import Optional
+import httpx
+import structlog
+
+from ..config import Settings
+from ..models import BlockchainType, SanctionsSource
+from .lists import (
+    ConsolidatedListParser,
+    describe_eu_entry,
+    describe_uk_entry,
+    describe_un_entry,
+)
+from .metrics import Gauge, Histogram
+from .sdn import SDNStreamParser
+
+logger = structlog.get_logger()
+
+PARSE_SECONDS = Histogram("sanctions_parse_seconds", "Time spent parsing one list download", ("source",))
+LIST_ENTRIES = Gauge("sanctions_list_entries", "Entries in the last parsed list", ("source",))
+LIST_ADDRESSES = Gauge("sanctions_list_addresses", "Crypto addresses in the last parsed list", ("source",))
+
+
+class SanctionsListAdapter:
+    """
+    Fetches and parses one sanctions list.
+
+    Subclasses set ``source`` and build a streaming parser; fetching is
+    shared: a conditional GET with the validators of the previous fetch,
+    parsed chunk by chunk as the body arrives.
+    """
+
+    source: SanctionsSource
+
+    def __init__(self, url: str):
+        self.url = url
+
+    @property
+    def name(self) -> str:
+        """Key of the source in index metadata (``SanctionsSource`` value)."""
+        return self.source.value
+
+    @property
+    def label(self) -> str:
+        """Value of the ``source`` field of the records it produces."""
+        return self.source.value.upper()
+
+    def parser(self):
+        """A fresh streaming parser with ``feed``, ``close`` and ``entries_seen``."""
+        raise NotImplementedError
+
+    async def fetch(
+        self,
+        client: httpx.AsyncClient,
+        state: dict
+    ) -> Optional[tuple[dict[str, dict], dict]]:
+        """
+        Stream the list and parse it incrementally.
+
+        Sends the validators from the previous fetch; returns None on a
+        304, otherwise the parsed entries and the new fetch state.
+        """
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        parser = self.parser()
+        entries: dict[str, dict] = {}
+        parse_time = 0.0
+
+        async with client.stream("GET", self.url, headers=headers) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+
+            async for chunk in response.aiter_bytes():
+                start = time.perf_counter()
+                entries.update(parser.feed(chunk))
+                parse_time += time.perf_counter() - start
+
+                # Let requests run between chunks even if the body is buffered
+                await asyncio.sleep(0)
+
+            state = {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "fetched_at": datetime.utcnow().isoformat(),
+            }
+
+        start = time.perf_counter()
+        entries.update(parser.close())
+        parse_time += time.perf_counter() - start
+
+        PARSE_SECONDS.observe(parse_time, source=self.name)
+        LIST_ENTRIES.set(parser.entries_seen, source=self.name)
+        LIST_ADDRESSES.set(len(entries), source=self.name)
+        logger.info(
+            f"{self.label} sanctions list parsed",
+            entries=parser.entries_seen,
+            addresses=len(entries),
+            parse_seconds=round(parse_time, 3)
+        )
+        return entries, state
+
+
+class OFACAdapter(SanctionsListAdapter):
+    """OFAC Specially Designated Nationals list."""
+
+    source = SanctionsSource.OFAC
+
+    # SDN idTypes holding crypto addresses, mapped to their chain
+    # (None: token issued on several chains, inferred from the address)
+    CRYPTO_ID_TYPES = {
+        "Digital Currency Address - XBT": BlockchainType.BITCOIN,
+        "Digital Currency Address - ETH": BlockchainType.ETHEREUM,
+        "Digital Currency Address - USDT": None,
+        "Digital Currency Address - TRX": BlockchainType.TRON
+    }
+
+    def parser(self) -> SDNStreamParser:
+        return SDNStreamParser(self.CRYPTO_ID_TYPES)
+
+
+class EUAdapter(SanctionsListAdapter):
+    """EU consolidated financial sanctions list."""
+
+    source = SanctionsSource.EU
+
+    def parser(self) -> ConsolidatedListParser:
+        return ConsolidatedListParser(self.label, frozenset({"sanctionEntity"}), describe_eu_entry)
+
+
+class UKAdapter(SanctionsListAdapter):
+    """UK HM Treasury (OFSI) consolidated list."""
+
+    source = SanctionsSource.UK
+
+    def parser(self) -> ConsolidatedListParser:
+        return ConsolidatedListParser(self.label, frozenset({"Designation"}), describe_uk_entry)
+
+
+class UNAdapter(SanctionsListAdapter):
+    """UN Security Council consolidated list."""
+
+    source = SanctionsSource.UN
+
+    def parser(self) -> ConsolidatedListParser:
+        return ConsolidatedListParser(self.label, frozenset({"INDIVIDUAL", "ENTITY"}), describe_un_entry)
+
+
+def build_adapters(settings: Settings) -> list[SanctionsListAdapter]:
+    """Adapters for the sources enabled in settings, in configured order."""
+    available = {
+        SanctionsSource.OFAC: lambda: OFACAdapter(settings.ofac_sdn_url),
+        SanctionsSource.EU: lambda: EUAdapter(settings.eu_sanctions_url),
+        SanctionsSource.UK: lambda: UKAdapter(settings.uk_sanctions_url),
+        SanctionsSource.UN: lambda: UNAdapter(settings.un_sanctions_url),
+    }
+
+    adapters = []
+    for name in settings.sanctions_sources:
+        factory = available.get(SanctionsSource(name))
+        if factory is None:
+            raise ValueError(f"No list adapter for sanctions source: {name}")
+        adapters.append(factory())
+    return adapters
@@ -0,0 +1,197 @@
+"""Postgres persistence of the sanctions lists (the ``sanctioned_addresses`` table)."""
+
+from datetime import datetime
+import json
+from typing import Iterable, Optional
+
+from ..models import BlockchainType, SanctionedAddress, SanctionsSource
+
+TABLE = SanctionedAddress.__tablename__
+
+# Postgres enum types SQLAlchemy creates for the model's enum columns
+_BLOCKCHAIN_TYPE = SanctionedAddress.__table__.c.blockchain.type.name
+_SOURCE_TYPE = SanctionedAddress.__table__.c.source.type.name
+
+# Columns loaded through the staging table, in COPY order
+_COLUMNS = (
+    "address", "blockchain", "source", "source_id", "entity_name",
+    "entity_type", "program", "country", "designation_date", "metadata",
+)
+
+# Record keys with a column of their own; the rest go to metadata
+_RECORD_COLUMNS = {
+    "address", "blockchain", "source", "sdn_id", "entity_name",
+    "entity_type", "program", "country", "designation_date",
+}
+
+
+def _dsn(database_url: str) -> str:
+    """asyncpg DSN from a SQLAlchemy URL (``postgresql+asyncpg://...``)."""
+    scheme, _, rest = database_url.partition("://")
+    return f"{scheme.split('+')[0]}://{rest}"
+
+
+def _row_to_record(row) -> Optional[tuple[str, dict]]:
+    """
+    ``(address, record)`` of a table row, in the shape the index takes.
+
+    Enum columns hold the enum *names* (SQLAlchemy's default), so the
+    source is already the upper-case label records carry.
+    """
+    if row["blockchain"] is None:
+        return None
+
+    metadata = row["metadata"] or {}
+    if isinstance(metadata, str):
+        metadata = json.loads(metadata)
+
+    designated = row["designation_date"]
+    record = {
+        **metadata,
+        "source": row["source"],
+        "blockchain": BlockchainType[row["blockchain"]].value,
+        "sdn_id": row["source_id"] or "",
+        "entity_name": row["entity_name"] or "",
+        "entity_type": row["entity_type"] or "",
+        "program": row["program"] or "",
+        "designation_date": designated.isoformat() if designated else "",
+    }
+    if row["country"]:
+        record["country"] = row["country"]
+    return row["address"], record
+
+
+def _record_to_row(record: dict) -> tuple:
+    """Staging-table row of an index record (the inverse of ``_row_to_record``)."""
+    designated = record.get("designation_date")
+    try:
+        designated = datetime.fromisoformat(designated) if designated else None
+    except ValueError:
+        designated = None
+
+    metadata = {key: value for key, value in record.items() if key not in _RECORD_COLUMNS}
+    return (
+        record["address"],
+        BlockchainType(record["blockchain"]).name,
+        SanctionsSource(record["source"].lower()).name,
+        record.get("sdn_id") or None,
+        record.get("entity_name") or None,
+        record.get("entity_type") or None,
+        record.get("program") or None,
+        record.get("country") or None,
+        designated,
+        json.dumps(metadata),
+    )
+
+
+async def persist_sanctioned_records(
+    database_url: str,
+    records: Iterable[dict],
+    timeout: float = 60.0
+) -> dict[str, int]:
+    """
+    Make the table match a consolidated list, in one transaction.
+
+    The records are bulk-loaded with COPY into a temporary staging table,
+    then merged with two set-based statements: an upsert of every staged
+    row (rows whose values did not change are left alone, keeping their
+    ``updated_at``) and a pass marking active rows missing from the list
+    inactive. Readers never see a half-applied list.
+
+    Returns the number of rows staged, upserted and deactivated.
+    """
+    import asyncpg
+
+    rows = [_record_to_row(record) for record in records]
+    staging = f"{TABLE}_staging"
+    assignments = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in _COLUMNS if column not in ("address", "source")
+    )
+    current = ", ".join(f"{TABLE}.{column}" for column in _COLUMNS[1:])
+    excluded = ", ".join(f"EXCLUDED.{column}" for column in _COLUMNS[1:])
+
+    connection = await asyncpg.connect(_dsn(database_url), timeout=timeout)
+    try:
+        async with connection.transaction():
+            await connection.execute(f"""
+                CREATE TEMPORARY TABLE {staging} (
+                    address text NOT NULL,
+                    blockchain text NOT NULL,
+                    source text NOT NULL,
+                    source_id text,
+                    entity_name text,
+                    entity_type text,
+                    program text,
+                    country text,
+                    designation_date timestamp,
+                    metadata text
+                ) ON COMMIT DROP
+            """)
+            await connection.copy_records_to_table(
+                staging, records=rows, columns=_COLUMNS, timeout=timeout
+            )
+            # Temporary tables are never auto-analyzed; give the planner row counts
+            await connection.execute(f"ANALYZE {staging}")
+
+            upserted = await connection.execute(f"""
+                INSERT INTO {TABLE} ({", ".join(_COLUMNS)}, is_active, created_at, updated_at)
+                SELECT DISTINCT ON (address, source)
+                       address, blockchain::{_BLOCKCHAIN_TYPE}, source::{_SOURCE_TYPE},
+                       source_id, entity_name, entity_type, program, country,
+                       designation_date, metadata::jsonb, true,
+                       now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+                FROM {staging}
+                ON CONFLICT (address, source) DO UPDATE SET
+                    {assignments}, is_active = true, updated_at = EXCLUDED.updated_at
+                WHERE ({current}, {TABLE}.is_active) IS DISTINCT FROM ({excluded}, true)
+            """, timeout=timeout)
+
+            deactivated = await connection.execute(f"""
+                UPDATE {TABLE} AS listed
+                SET is_active = false, updated_at = now() AT TIME ZONE 'utc'
+                WHERE listed.is_active
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {staging} AS staged
+                      WHERE staged.address = listed.address
+                        AND staged.source = listed.source::text
+                  )
+            """, timeout=timeout)
+    finally:
+        await connection.close()
+
+    # Command tags: "INSERT 0 <rows>", "UPDATE <rows>"
+    return {
+        "staged": len(rows),
+        "upserted": int(upserted.split()[-1]),
+        "deactivated": int(deactivated.split()[-1]),
+    }
+
+
+async def load_sanctioned_records(
+    database_url: str,
+    timeout: float = 5.0
+) -> tuple[list[tuple[str, dict]], Optional[datetime]]:
+    """
+    Active listed addresses as ``(address, record)`` pairs, and the time
+    of the most recent change to them (None for an empty table).
+    """
+    import asyncpg
+
+    connection = await asyncpg.connect(_dsn(database_url), timeout=timeout)
+    try:
+        rows = await connection.fetch(
+            f"""
+            SELECT address, blockchain::text AS blockchain, source::text AS source,
+                   source_id, entity_name, entity_type, program, country,
+                   designation_date, metadata, updated_at
+            FROM {TABLE}
+            WHERE is_active
+            """,
+            timeout=timeout
+        )
+    finally:
+        await connection.close()
+
+    records = [record for record in map(_row_to_record, rows) if record is not None]
+    updated = max((row["updated_at"] for row in rows if row["updated_at"]), default=None)
+    return records, updated
@@ -0,0 +1,234 @@
+"""Tests for the two-tier result cache."""
+
+import asyncio
+import hashlib
+
+import fakeredis
+import pytest
+from structlog.testing import capture_logs
+
+from src.models import BlockchainType
+from src.services import cache as cache_module
+from src.services.cache import ResultCache
+from src.services.index import SanctionsIndex
+from src.services.canonical import canonical_key
+from src.services.screening import SanctionsScreener
+
+
+ADDRESS = "0x8576acc5c05d6ce88f4e49bf65bdf0c62f91353c"
+
+
+def b58check_encode(payload: bytes) -> str:
+    data = payload + hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    number, encoded = int.from_bytes(data, "big"), ""
+    while number:
+        number, digit = divmod(number, 58)
+        encoded = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"[digit] + encoded
+    return "1" * (len(data) - len(data.lstrip(b"\x00"))) + encoded
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_cache(server, **kwargs) -> ResultCache:
+    """A cache whose L2 is the fake server (one per worker)."""
+    return ResultCache(
+        maxsize=kwargs.pop("maxsize", 100),
+        ttl=kwargs.pop("ttl", 60.0),
+        redis=fakeredis.FakeAsyncRedis(server=server),
+        **kwargs
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock of the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+async def test_miss_then_l1_hit(server):
+    cache = make_cache(server)
+
+    assert await cache.get("screen", "v1", "a") is None
+    await cache.set("screen", "v1", "a", {"score": 10.0})
+    assert await cache.get("screen", "v1", "a") == {"score": 10.0}
+
+    assert (cache.l1_hits, cache.l2_hits, cache.misses) == (1, 0, 1)
+
+
+async def test_l2_hit_is_copied_into_l1(server):
+    writer, reader = make_cache(server), make_cache(server)
+
+    await writer.set_many("screen", "v1", {"a": 1, "b": 2})
+    assert await reader.get_many("screen", "v1", ["a", "b", "c"]) == {"a": 1, "b": 2}
+    assert (reader.l1_hits, reader.l2_hits, reader.misses) == (0, 2, 1)
+
+    assert await reader.get("screen", "v1", "a") == 1
+    assert reader.l1_hits == 1
+
+
+async def test_version_change_invalidates(server):
+    cache = make_cache(server)
+    await cache.set("screen", "v1", "a", True)
+
+    assert await cache.get("screen", "v2", "a") is None
+    assert await make_cache(server).get("screen", "v2", "a") is None
+
+
+async def test_l1_entries_expire(server, clock):
+    cache = ResultCache(maxsize=10, ttl=5.0)
+    await cache.set("screen", "v1", "a", 1)
+
+    clock[0] += 4.9
+    assert await cache.get("screen", "v1", "a") == 1
+    clock[0] += 0.2
+    assert await cache.get("screen", "v1", "a") is None
+
+
+async def test_l2_entries_carry_ttl(server):
+    cache = make_cache(server, ttl=30.0)
+    await cache.set("screen", "v1", "a", 1)
+
+    redis = fakeredis.FakeAsyncRedis(server=server)
+    assert 0 < await redis.ttl("aml:result:screen:v1:a") <= 30
+
+
+async def test_l1_evicts_least_recently_used(server):
+    cache = ResultCache(maxsize=2, ttl=60.0)
+    await cache.set("screen", "v1", "a", 1)
+    await cache.set("screen", "v1", "b", 2)
+    await cache.get("screen", "v1", "a")
+    await cache.set("screen", "v1", "c", 3)
+
+    assert await cache.get_many("screen", "v1", ["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+async def test_redis_down_falls_back_to_l1(server, clock):
+    cache = make_cache(server)
+    server.connected = False
+
+    await cache.set("screen", "v1", "a", 1)
+    assert await cache.get("screen", "v1", "a") == 1
+    assert await cache.get("screen", "v1", "b") is None
+    assert cache._l2() is None
+
+    # Retried once the back-off has passed
+    server.connected = True
+    clock[0] += cache_module._L2_RETRY_SECONDS + 1
+    await cache.set("screen", "v1", "b", 2)
+    assert await make_cache(server).get("screen", "v1", "b") == 2
+
+
+async def test_redis_outage_is_logged_once_and_on_recovery(server, clock):
+    cache = make_cache(server)
+    server.connected = False
+
+    with capture_logs() as logs:
+        for _ in range(3):
+            await cache.get("screen", "v1", "a")
+            clock[0] += cache_module._L2_RETRY_SECONDS + 1
+        server.connected = True
+        await cache.get("screen", "v1", "a")
+        await cache.get("screen", "v1", "b")
+
+    assert [(log["log_level"], log["event"][:29]) for log in logs] == [
+        ("warning", "Result cache L2 unavailable: "),
+        ("info", "Result cache L2 available aga"),
+    ]
+
+
+async def test_screens_are_keyed_on_list_content(server):
+    """A worker publishing other lists at the same generation misses the cache."""
+    full = SanctionsScreener()
+    full.cache = make_cache(server)
+    full._index = SanctionsIndex.build(full._known_ofac_records(), sources={"ofac": {}})
+    assert (await full.screen_address(ADDRESS)).is_sanctioned
+
+    empty = SanctionsScreener()
+    empty.cache = make_cache(server)
+    empty._index = SanctionsIndex.build([], sources={"ofac": {}})
+    assert empty.index.generation == full.index.generation
+
+    result = await empty.screen_address(ADDRESS)
+    assert not result.is_sanctioned
+    assert empty.cache.l2_hits == 0
+
+    await full.close()
+    await empty.close()
+
+
+def test_digest_ignores_fetch_dates():
+    """Nodes loading the same lists at different times share cache entries."""
+    def listing(address: str, designated: str) -> SanctionsIndex:
+        return SanctionsIndex.build([(address, {
+            "source": "OFAC",
+            "blockchain": "ethereum",
+            "sdn_id": "1",
+            "entity_name": "Listed Entity",
+            "program": "CYBER2",
+            "designation_date": designated,
+        })], generation=1)
+
+    first = listing(ADDRESS, "2024-01-01T00:00:00")
+    later = listing(ADDRESS, "2024-03-05T12:34:56")
+    assert first.digest == later.digest
+
+    other = listing("0x" + "0" * 39 + "1", "2024-01-01T00:00:00")
+    assert other.digest != first.digest
+
+
+async def test_seed_screens_are_not_cached(server):
+    screener = SanctionsScreener()
+    screener.cache = make_cache(server)
+    assert screener.index.seed
+
+    await screener.screen_address(ADDRESS, BlockchainType.ETHEREUM)
+    await screener.screen_address("0x" + "0" * 40, BlockchainType.ETHEREUM)
+
+    assert await fakeredis.FakeAsyncRedis(server=server).keys("*") == []
+    assert len(screener.cache._local) == 0
+    await screener.close()
+
+
+async def test_cached_screens_show_the_requested_spelling(server):
+    """Spellings sharing a canonical key share the screen, not the address."""
+    payload = b"\x41" + bytes(range(1, 21))
+    hex_form, base58_form = payload.hex(), b58check_encode(payload)
+    assert canonical_key(hex_form, BlockchainType.TRON) == canonical_key(base58_form, BlockchainType.TRON)
+
+    writer, reader = SanctionsScreener(), SanctionsScreener()
+    for screener in (writer, reader):
+        screener.cache = make_cache(server)
+        screener._index = SanctionsIndex.build([], sources={"ofac": {}})
+
+    assert (await writer.screen_address(hex_form, BlockchainType.TRON)).address == hex_form
+    assert (await writer.screen_address(base58_form, BlockchainType.TRON)).address == base58_form
+    assert writer.cache.l1_hits == 1
+
+    assert (await reader.screen_address(base58_form, BlockchainType.TRON)).address == base58_form
+    assert reader.cache.l2_hits == 1
+
+    await writer.close()
+    await reader.close()
+
+
+async def test_coalesced_screens_show_the_requested_spelling(server):
+    payload = b"\x41" + bytes(range(1, 21))
+    hex_form, base58_form = payload.hex(), b58check_encode(payload)
+
+    screener = SanctionsScreener()
+    screener.cache = make_cache(server)
+    screener._index = SanctionsIndex.build([], sources={"ofac": {}})
+
+    first, second = await asyncio.gather(
+        screener.screen_address(hex_form, BlockchainType.TRON),
+        screener.screen_address(base58_form, BlockchainType.TRON)
+    )
+
+    assert screener._screens.coalesced == 1
+    assert (first.address, second.address) == (hex_form, base58_form)
+    await screener.close()
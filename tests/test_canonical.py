@@ -0,0 +1,56 @@
+"""Tests for chain-aware address canonicalization."""
+
+from src.models import BlockchainType
+from src.services.canonical import (
+    _BECH32_CHARSET, _bech32_polymod, canonical_key, segwit_decode
+)
+from src.services.index import SanctionsIndex
+
+
+BTC = BlockchainType.BITCOIN
+
+MAINNET = "bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq"
+
+
+def segwit_encode(hrp: str, version: int, program: bytes) -> str:
+    """Bech32 (v0) or bech32m (v1+) address of a witness program."""
+    acc, bits, words = 0, 0, [version]
+    for byte in program:
+        acc, bits = (acc << 8) | byte, bits + 8
+        while bits >= 5:
+            bits -= 5
+            words.append((acc >> bits) & 31)
+    if bits:
+        words.append((acc << (5 - bits)) & 31)
+
+    constant = 1 if version == 0 else 0x2BC830A3
+    expanded = [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+    polymod = _bech32_polymod(expanded + words + [0] * 6) ^ constant
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + "".join(_BECH32_CHARSET[w] for w in words + checksum)
+
+
+def test_segwit_decode_returns_the_network():
+    hrp, version, program = segwit_decode(MAINNET)
+
+    assert (hrp, version, len(program)) == ("bc", 0, 20)
+    assert segwit_encode(hrp, version, program) == MAINNET
+
+
+def test_mainnet_and_testnet_programs_do_not_collide():
+    _, version, program = segwit_decode(MAINNET)
+    testnet = segwit_encode("tb", version, program)
+
+    assert canonical_key(testnet, BTC) != canonical_key(MAINNET, BTC)
+    assert canonical_key(MAINNET.upper(), BTC) == canonical_key(MAINNET, BTC)
+
+    index = SanctionsIndex.build([(MAINNET, {"source": "OFAC", "blockchain": BTC.value})])
+    assert index.lookup(canonical_key(MAINNET, BTC), BTC)
+    assert not index.lookup(canonical_key(testnet, BTC), BTC)
+
+
+def test_other_networks_are_not_decoded():
+    _, version, program = segwit_decode(MAINNET)
+    regtest = segwit_encode("bcrt", version, program)
+
+    assert canonical_key(regtest, BTC).startswith(b"\xff")
@@ -0,0 +1,134 @@
+"""Tests for counterparty exposure scoring over a transaction graph."""
+
+import asyncio
+
+import pytest
+
+from src.models import BlockchainType
+from src.services import risk as risk_module
+from src.services.graph import GraphStore, build_graph
+from src.services.index import SanctionsIndex
+from src.services.risk import RiskAssessor, sanctioned_nodes
+from src.services.screening import SanctionsScreener
+
+
+ETH = BlockchainType.ETHEREUM
+
+
+def address(i: int) -> str:
+    return f"0x{i:040x}"
+
+
+LISTED = address(1)
+
+# A chain of transfers ending at the listed address: address(2) is one
+# hop away, address(3) two, address(4) three; address(5) is unrelated
+EDGES = [(2, 1), (3, 2), (4, 3), (5, 6)]
+
+
+def listing(*addresses: str) -> SanctionsIndex:
+    return SanctionsIndex.build(
+        [
+            (listed, {
+                "source": "OFAC",
+                "blockchain": ETH.value,
+                "sdn_id": "1",
+                "entity_name": "Listed Entity",
+                "program": "CYBER2",
+                "designation_date": "2024-01-01",
+            })
+            for listed in addresses
+        ],
+        generation=1
+    )
+
+
+@pytest.fixture
+async def screener(tmp_path, monkeypatch):
+    edges = tmp_path / "edges.csv"
+    edges.write_text("from,to\n" + "".join(f"{address(a)},{address(b)}\n" for a, b in EDGES))
+    build_graph([str(edges)], ETH, root=str(tmp_path / "graph"))
+    store = GraphStore(str(tmp_path / "graph"))
+
+    screener = SanctionsScreener()
+    screener._index = listing(LISTED)
+    monkeypatch.setattr(risk_module, "get_graph_store", lambda: store)
+    monkeypatch.setattr(risk_module, "get_screener", lambda: screener)
+    yield screener
+    await screener.close()
+
+
+@pytest.fixture
+def resolutions(monkeypatch):
+    """Index digests the graph's sanctioned nodes were resolved for."""
+    digests = []
+    resolve = risk_module.TransactionGraph.sanctioned_nodes
+
+    def counted(graph, index, blockchain):
+        digests.append(index.digest)
+        return resolve(graph, index, blockchain)
+
+    monkeypatch.setattr(risk_module.TransactionGraph, "sanctioned_nodes", counted)
+    return digests
+
+
+async def test_sanctioned_nodes_resolved_once_per_lists(screener, resolutions):
+    graph = risk_module.get_graph_store().get(ETH)
+
+    first = await asyncio.gather(*(sanctioned_nodes(graph, ETH) for _ in range(10)))
+    assert len(resolutions) == 1
+    assert all(nodes.tolist() == [graph.node_id(LISTED, ETH)] for nodes in first)
+
+    await sanctioned_nodes(graph, ETH)
+    assert len(resolutions) == 1
+
+    # Same content at a new generation: nothing to resolve again
+    screener._index = listing(LISTED)
+    await sanctioned_nodes(graph, ETH)
+    assert len(resolutions) == 1
+
+    screener._index = listing(LISTED, address(3))
+    nodes = await sanctioned_nodes(graph, ETH)
+    assert len(resolutions) == 2
+    assert len(nodes) == 2
+
+
+async def test_counterparty_scores_by_nearest_hop(screener):
+    assessor = RiskAssessor()
+
+    scores = [
+        (await assessor._assess_counterparty(address(i), ETH))[0]
+        for i in (2, 3, 4, 5, 9)
+    ]
+
+    assert scores == [90.0, 60.0, 35.0, 15.0, 15.0]
+
+
+async def test_batch_matches_single_assessments(screener, monkeypatch):
+    monkeypatch.setattr(RiskAssessor, "COUNTERPARTY_CHUNK", 2)
+    assessor = RiskAssessor()
+    items = [(address(i), ETH) for i in (2, 3, 4, 5, 9, 2, 4)]
+
+    scores, factors = await assessor._assess_counterparty_batch(items)
+
+    singles = [await assessor._assess_counterparty(a, chain) for a, chain in items]
+    assert scores.tolist() == [score for score, _ in singles]
+    assert [f[0].description for f in factors] == [f[0].description for _, f in singles]
+
+
+async def test_batch_budget_is_sized_to_the_batch(screener, monkeypatch):
+    monkeypatch.setattr(RiskAssessor, "COUNTERPARTY_CHUNK", 2)
+    assessor = RiskAssessor()
+    budgets = {}
+    evaluate = assessor._evaluate
+
+    async def recorded(category, assessor_call, timeout):
+        budgets[category] = timeout
+        return await evaluate(category, assessor_call, timeout)
+
+    monkeypatch.setattr(assessor, "_evaluate", recorded)
+    await assessor.assess_many([(address(i), ETH) for i in range(2, 7)], include_behavior=False)
+
+    single = assessor.settings.risk_category_timeouts["counterparty"]
+    assert budgets["counterparty"] == single * 3
+    assert budgets["jurisdiction"] == assessor.settings.risk_category_timeouts["jurisdiction"]
@@ -0,0 +1,86 @@
+"""Tests for bulk screening jobs."""
+
+import asyncio
+import os
+
+import orjson
+import pytest
+
+from src.config import Settings
+from src.services.index import SanctionsIndex
+from src.services.jobs import JobManager
+from src.services.screening import SanctionsScreener
+from src.services.snapshot import write_snapshot
+
+
+SANCTIONED = SanctionsScreener.KNOWN_OFAC_ADDRESSES[0]
+
+
+@pytest.fixture
+async def manager(tmp_path, monkeypatch):
+    snapshot_path = str(tmp_path / "sanctions.snapshot")
+    # Pool processes read their settings from the environment
+    monkeypatch.setenv("SANCTIONS_SNAPSHOT_PATH", snapshot_path)
+    monkeypatch.setenv("RESULT_CACHE_REDIS", "false")
+
+    settings = Settings(
+        screening_jobs_dir=str(tmp_path / "jobs"),
+        screening_job_chunk_size=2,
+        screening_job_workers=2,
+        sanctions_snapshot_path=snapshot_path,
+        result_cache_redis=False,
+    )
+    screener = SanctionsScreener()
+    manager = JobManager(settings, screener)
+    yield manager
+    await manager.close()
+    await screener.close()
+
+
+async def upload(*pieces: bytes, fail: bool = False):
+    for piece in pieces:
+        yield piece
+    if fail:
+        raise ConnectionResetError("client went away")
+
+
+async def wait_for(manager: JobManager, job_id: str, timeout: float = 60.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = manager.load(job_id)
+        if job.status in ("completed", "failed"):
+            return job
+        assert asyncio.get_running_loop().time() < deadline, job.progress()
+        await asyncio.sleep(0.05)
+
+
+async def test_broken_upload_fails_the_job(manager):
+    with pytest.raises(ConnectionResetError):
+        await manager.create(upload(b'{"address": "0x1"}\n{"addr', fail=True), "ndjson")
+
+    job, = (manager.load(job_id) for job_id in os.listdir(manager.root))
+    assert job.status == "failed"
+    assert "client went away" in job.error
+    assert not os.path.exists(os.path.join(manager.root, job.id, "input"))
+
+    # Not picked up again on restart
+    await manager.resume()
+    assert manager.load(job.id).status == "failed"
+
+
+async def test_pool_screens_against_the_snapshot(manager):
+    index = SanctionsIndex.build(manager.screener._known_ofac_records(), generation=7, sources={"ofac": {}})
+    write_snapshot(index, manager.settings.sanctions_snapshot_path)
+
+    lines = [f'{{"address": "0x{i:040x}"}}\n'.encode() for i in range(5)]
+    lines.insert(2, f'{{"address": "{SANCTIONED.upper()}"}}\n'.encode())
+    job = await manager.create(upload(*lines), "ndjson")
+
+    job = await wait_for(manager, job.id)
+    assert job.status == "completed", job.error
+    assert (job.screened, job.sanctioned, job.chunks) == (6, 1, 3)
+    assert job.generations == [7]
+
+    results = [orjson.loads(line) for line in b"".join(manager.results(job)).splitlines()]
+    assert [r["line"] for r in results] == list(range(1, 7))
+    assert [r["is_sanctioned"] for r in results] == [False, False, True, False, False, False]
@@ -0,0 +1,78 @@
+"""Tests for incremental sanctions refreshes and their change log."""
+
+import pytest
+
+from src.services.changelog import SanctionsChangeLog
+from src.services.screening import SanctionsScreener
+
+
+class StubAdapter:
+    """A source whose next fetch returns ``entries`` (None: not modified)."""
+
+    def __init__(self, name: str, entries):
+        self.name = name
+        self.label = name.upper()
+        self.entries = entries
+
+    async def fetch(self, client, state):
+        if self.entries is None:
+            return None
+        return dict(self.entries), {"etag": "v1"}
+
+
+def record(address: str, source: str = "OFAC") -> tuple[str, dict]:
+    return address, {
+        "source": source,
+        "blockchain": "ethereum",
+        "sdn_id": "1",
+        "entity_name": f"Entity {address[-4:]}",
+        "program": "CYBER2",
+        "designation_date": "2024-01-01",
+    }
+
+
+ADDRESSES = [f"0x{i:040x}" for i in range(1, 4)]
+
+
+@pytest.fixture
+async def screener(tmp_path):
+    screener = SanctionsScreener()
+    screener.changelog = SanctionsChangeLog(str(tmp_path / "changes.jsonl"))
+    yield screener
+    await screener.close()
+
+
+async def test_first_refresh_is_a_baseline_not_a_delisting(screener):
+    screener.sources = [StubAdapter("ofac", map(record, ADDRESSES))]
+
+    index = await screener.refresh_sanctions_cache()
+
+    assert not index.seed
+    assert len(index) == len(ADDRESSES)
+    for address in SanctionsScreener.KNOWN_OFAC_ADDRESSES:
+        assert not (await screener.screen_address(address)).is_sanctioned
+
+    entry, = screener.changelog.since(0)
+    assert entry["summary"] == {"added": 3, "removed": 0, "changed": 0}
+
+
+async def test_later_refreshes_log_deltas(screener):
+    screener.sources = [StubAdapter("ofac", map(record, ADDRESSES))]
+    await screener.refresh_sanctions_cache()
+
+    screener.sources = [StubAdapter("ofac", map(record, ADDRESSES[1:]))]
+    index = await screener.refresh_sanctions_cache()
+
+    entry = screener.changelog.since(1)[-1]
+    assert entry["generation"] == index.generation == 2
+    assert entry["summary"] == {"added": 0, "removed": 1, "changed": 0}
+    assert entry["removed"][0]["address"] == ADDRESSES[0]
+
+
+async def test_seed_is_replaced_by_any_first_source(screener):
+    screener.sources = [StubAdapter("eu", [record(ADDRESSES[0], "EU")]), StubAdapter("ofac", None)]
+
+    index = await screener.refresh_sanctions_cache()
+
+    assert [r["source"] for r in index.records()] == ["EU"]
+    assert [e["summary"]["removed"] for e in screener.changelog.since(0)] == [0]
@@ -0,0 +1,53 @@
+"""Tests for cached and coalesced risk assessments."""
+
+import asyncio
+
+import pytest
+
+from src.models import BlockchainType
+from src.services import risk as risk_module
+from src.services.cache import ResultCache
+from src.services.index import SanctionsIndex
+from src.services.risk import RiskAssessor
+from src.services.screening import SanctionsScreener
+
+
+ETH = BlockchainType.ETHEREUM
+
+LOWER = "0x" + "ab" * 20
+UPPER = "0x" + "AB" * 20
+
+
+@pytest.fixture
+async def screener(monkeypatch):
+    screener = SanctionsScreener()
+    screener.cache = ResultCache(maxsize=100, ttl=60.0)
+    screener._index = SanctionsIndex.build([], sources={"ofac": {}})
+    monkeypatch.setattr(risk_module, "get_screener", lambda: screener)
+    monkeypatch.setattr(risk_module, "_cache", ResultCache(maxsize=100, ttl=60.0))
+    yield screener
+    await screener.close()
+
+
+async def test_cached_assessments_show_the_requested_spelling(screener):
+    assessor = RiskAssessor()
+
+    first = await assessor.assess_address(LOWER, ETH, include_counterparty=False)
+    second = await assessor.assess_address(UPPER, ETH, include_counterparty=False)
+
+    assert risk_module._cache.l1_hits == 1
+    assert (first.address, second.address) == (LOWER, UPPER)
+    assert second.risk_score == first.risk_score
+
+
+async def test_coalesced_assessments_show_the_requested_spelling(screener):
+    assessor = RiskAssessor()
+    coalesced = risk_module._assessments.coalesced
+
+    first, second = await asyncio.gather(
+        assessor.assess_address(LOWER, ETH, include_counterparty=False),
+        assessor.assess_address(UPPER, ETH, include_counterparty=False)
+    )
+
+    assert risk_module._assessments.coalesced == coalesced + 1
+    assert (first.address, second.address) == (LOWER, UPPER)
@@ -0,0 +1,36 @@
+"""Tests for sanctions search and fuzzy name matching."""
+
+import pytest
+
+from src.services.index import SanctionsIndex
+from src.services.screening import SanctionsScreener
+
+
+def record(i: int, name: str) -> tuple[str, dict]:
+    return f"0x{i:040x}", {
+        "source": "OFAC",
+        "blockchain": "ethereum",
+        "sdn_id": str(i),
+        "entity_name": name,
+        "program": "CYBER2",
+        "designation_date": "2024-01-01",
+    }
+
+
+@pytest.fixture
+async def screener():
+    screener = SanctionsScreener()
+    # Enough names sharing blocking keys with the query to use the pool
+    names = [f"Garantex Trading {i}" for i in range(SanctionsScreener.INLINE_NAME_SCORING * 2)]
+    screener._index = SanctionsIndex.build(
+        [record(i, name) for i, name in enumerate(names)], generation=1
+    )
+    yield screener
+    await screener.close()
+
+
+async def test_fuzzy_names_are_scored_in_spawned_processes(screener):
+    results = await screener.search_sanctions("Garantx Trading 7", fuzzy=True)
+
+    assert results[0]["matched_name"] == "garantex trading 7"
+    assert screener._name_executor._mp_context.get_start_method() == "spawn"
@@ -0,0 +1,154 @@
+"""
+Tests for the Postgres persistence of the sanctions lists.
+
+They run against a live server: set ``TEST_DATABASE_URL`` to a scratch
+database (e.g. ``postgresql+asyncpg://postgres@localhost/aml_test``),
+whose ``sanctioned_addresses`` table is dropped and recreated. Skipped
+when it is not set.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.models import Base, SanctionedAddress
+from src.services.store import (
+    _BLOCKCHAIN_TYPE, _SOURCE_TYPE, _dsn, load_sanctioned_records, persist_sanctioned_records
+)
+
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+MIGRATION = Path(__file__).parent.parent / "migrations" / "001_sanctioned_addresses_address_source.sql"
+
+TABLE = SanctionedAddress.__table__
+
+
+def record(address: str, source: str = "OFAC", **fields) -> dict:
+    """An index record as refreshes produce them."""
+    return {
+        "address": address,
+        "blockchain": "ethereum",
+        "source": source,
+        "sdn_id": "1234",
+        "entity_name": "Sanctioned Entity",
+        "entity_type": "Entity",
+        "program": "CYBER2",
+        "designation_date": "2022-08-08T00:00:00",
+        **fields,
+    }
+
+
+ADDRESSES = [f"0x{i:040x}" for i in range(1, 4)]
+
+
+DROP = f"""
+    DROP TABLE IF EXISTS {TABLE.name};
+    DROP TYPE IF EXISTS {_BLOCKCHAIN_TYPE};
+    DROP TYPE IF EXISTS {_SOURCE_TYPE};
+"""
+
+
+def create_ddl() -> str:
+    """The model's DDL (enum types, table, indexes) as SQLAlchemy emits it."""
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.dialects.postgresql.named_types import CreateEnumType
+    from sqlalchemy.schema import CreateIndex, CreateTable
+
+    dialect = postgresql.dialect()
+    statements = [
+        CreateEnumType(TABLE.c.blockchain.type),
+        CreateEnumType(TABLE.c.source.type),
+        CreateTable(TABLE),
+        *(CreateIndex(index) for index in TABLE.indexes),
+    ]
+    return ";\n".join(str(statement.compile(dialect=dialect)) for statement in statements)
+
+
+@pytest.fixture
+async def database():
+    await execute(DATABASE_URL, DROP + create_ddl())
+    yield DATABASE_URL
+    await execute(DATABASE_URL, DROP)
+
+
+async def execute(database_url: str, sql: str):
+    import asyncpg
+
+    connection = await asyncpg.connect(_dsn(database_url))
+    try:
+        return await connection.execute(sql)
+    finally:
+        await connection.close()
+
+
+async def loaded(database_url: str) -> dict[tuple[str, str], dict]:
+    records, _ = await load_sanctioned_records(database_url)
+    return {(address, data["source"]): data for address, data in records}
+
+
+async def test_persist_round_trips(database):
+    records = [record(address) for address in ADDRESSES]
+    records.append(record(ADDRESSES[0], source="EU", entity_name="Other Name", listing="EU-1"))
+
+    counts = await persist_sanctioned_records(database, records)
+    assert counts == {"staged": 4, "upserted": 4, "deactivated": 0}
+
+    rows = await loaded(database)
+    assert set(rows) == {(a, "OFAC") for a in ADDRESSES} | {(ADDRESSES[0], "EU")}
+    assert rows[(ADDRESSES[0], "EU")]["entity_name"] == "Other Name"
+    assert rows[(ADDRESSES[0], "EU")]["listing"] == "EU-1"
+    assert rows[(ADDRESSES[1], "OFAC")]["designation_date"] == "2022-08-08T00:00:00"
+
+
+async def test_unchanged_rows_are_left_alone(database):
+    records = [record(address) for address in ADDRESSES]
+    await persist_sanctioned_records(database, records)
+    _, updated = await load_sanctioned_records(database)
+
+    counts = await persist_sanctioned_records(database, records)
+    assert counts == {"staged": 3, "upserted": 0, "deactivated": 0}
+    assert (await load_sanctioned_records(database))[1] == updated
+
+
+async def test_changes_upsert_and_delistings_deactivate(database):
+    await persist_sanctioned_records(database, [record(address) for address in ADDRESSES])
+
+    counts = await persist_sanctioned_records(database, [
+        record(ADDRESSES[0], program="CYBER3"),
+        record(ADDRESSES[1]),
+    ])
+    assert counts == {"staged": 2, "upserted": 1, "deactivated": 1}
+
+    rows = await loaded(database)
+    assert set(rows) == {(ADDRESSES[0], "OFAC"), (ADDRESSES[1], "OFAC")}
+    assert rows[(ADDRESSES[0], "OFAC")]["program"] == "CYBER3"
+
+    # Relisting reactivates the row rather than inserting a second one
+    counts = await persist_sanctioned_records(database, [record(address) for address in ADDRESSES])
+    assert counts["upserted"] == 2
+    assert len(await loaded(database)) == 3
+    assert await execute(database, "SELECT 1 FROM sanctioned_addresses") == "SELECT 3"
+
+
+async def test_migration_upgrades_legacy_unique_address(database):
+    # The schema before lists were keyed per source: address unique on its own
+    await execute(database, """
+        DROP INDEX ix_sanctioned_address_source;
+        DROP INDEX ix_sanctioned_addresses_address;
+        CREATE UNIQUE INDEX ix_sanctioned_addresses_address ON sanctioned_addresses (address);
+    """)
+    records = [record(ADDRESSES[0]), record(ADDRESSES[0], source="UN")]
+
+    import asyncpg
+    with pytest.raises(asyncpg.InvalidColumnReferenceError):
+        await persist_sanctioned_records(database, records)
+
+    await execute(database, MIGRATION.read_text())
+    await execute(database, MIGRATION.read_text())
+
+    counts = await persist_sanctioned_records(database, records)
+    assert counts == {"staged": 2, "upserted": 2, "deactivated": 0}